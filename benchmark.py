@@ -0,0 +1,7 @@
+import unittest
+
+if __name__ == "__main__":
+    benchmarks = unittest.defaultTestLoader.discover(
+        start_dir="skybaks", pattern="*_bench.py"
+    )
+    unittest.TextTestRunner(verbosity=2).run(benchmarks)
@@ -7,6 +7,7 @@ from .setup import SetupCupManager
 from .payouts import PayoutCupManager
 from .active import ActiveCupManager
 from .config import CupConfiguration
+from .schema import ensure_indexes
 
 logger = logging.getLogger(__name__)
 
@@ -26,8 +27,17 @@ class CupManagerApp(AppConfig):
         self.active = ActiveCupManager(self)
 
     async def on_start(self):
+        try:
+            with self.instance.db.allow_sync():
+                ensure_indexes()
+        except Exception as e:
+            logger.error(f"Exception while adding the database indexes: {str(e)}")
+
         await self.config.on_start()
         await self.results.on_start()
         await self.setup.on_start()
         await self.payout.on_start()
         await self.active.on_start()
+
+    async def on_stop(self):
+        await self.results.on_stop()
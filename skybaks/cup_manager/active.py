@@ -4,6 +4,7 @@ from datetime import datetime
 import uuid
 from argparse import Namespace
 
+from peewee import fn
 from pyplanet.apps.core.maniaplanet import callbacks as mp_signals
 from pyplanet.apps.core.trackmania import callbacks as tm_signals
 from pyplanet.contrib.command import Command
@@ -16,7 +17,13 @@ from .views import (
     CupResultsView,
     ScoreModeView,
 )
-from .app_types import TeamPlayerScore
+from .app_types import (
+    CupSummary,
+    GenericPlayerScore,
+    GenericTeamScore,
+    TeamPlayerScore,
+)
+from .live_standings import LiveStandings
 from .models import CupInfo, CupMatch, MatchInfo
 from .utils import placements
 from .score_mode import ScoreModeBase, SCORE_MODE
@@ -35,6 +42,7 @@ class ActiveCupManager:
         self.score_sorting: ScoreModeBase = None
         self.cached_scores_lock = asyncio.Lock()
         self.cached_scores: "list[TeamPlayerScore]" = []
+        self.live_standings: LiveStandings = None
         self.cup_key_name: str = ""
         self.cup_name: str = ""
         self.cup_edition_num: int = 0
@@ -42,7 +50,9 @@ class ActiveCupManager:
         self.cup_start_time: int = 0
         self.cup_host: str = None
         self._view_cache_cup_info: "list[CupInfo]" = []
-        self._view_cache_cup_maps: "list[CupMatch]" = []
+        self._view_cache_cup_maps: "dict[int, list[int]]" = {}
+        # (map count, first and last map_start_time) of each cup with maps
+        self._view_cache_cup_map_stats: "dict[int, tuple[int, int, int]] | None" = None
 
     @property
     def cup_name_fmt(self) -> str:
@@ -180,7 +190,7 @@ class ActiveCupManager:
                     logger.error(
                         f"Error adding cup map to database with id {str(selected_match)}"
                     )
-                await self._invalidate_view_cache_cup_maps()
+                await self._invalidate_view_cache_cup_maps(self.cup_start_time)
             else:
                 logger.debug("map already exists")
 
@@ -199,15 +209,16 @@ class ActiveCupManager:
                 logger.error(
                     f"Error deleting selected match with id {str(selected_match)} from cup with id {str(self.cup_start_time)}"
                 )
-            await self._invalidate_view_cache_cup_maps()
+            await self._invalidate_view_cache_cup_maps(self.cup_start_time)
 
     async def _mp_signals_flow_podium_start(self, *args, **kwargs) -> None:
         if await self._current_match_in_cup():
+            await self.app.results.flush_scores()
             scoremode = await self.get_cup_scoremode()
             scores = await self.app.results.get_data_scores(
                 self.match_start_times, scoremode
             )  # type: list[TeamPlayerScore]
-            score_ties = scoremode.get_ties(scores)
+            tie_groups = scoremode.get_tie_groups(scores)
             podium_text = []
             for player_score in scores:
                 if player_score.placement > 10:
@@ -228,7 +239,7 @@ class ActiveCupManager:
 
             for player_score in scores:
                 placed_text = "placed"
-                if player_score.login in score_ties:
+                if player_score.login in tie_groups:
                     placed_text = "tied for"
                 await self.instance.chat(
                     f"$ff0You {player_prefix}{placed_text} $<$fff{placements.pretty_placement(player_score.placement)}$> in the {self.cup_name_fmt}",
@@ -268,15 +279,13 @@ class ActiveCupManager:
                 scores = await self.app.results.get_data_scores(
                     self.match_start_times, scoremode
                 )  # type: list[TeamPlayerScore]
-                score_ties = scoremode.get_ties(scores)
+                tie_groups = scoremode.get_tie_groups(scores)
                 for score_index in range(0, len(scores) - 1):
                     current_score = scores[score_index]
-                    if (
-                        current_score.login in score_ties
-                        and len(score_ties[current_score.login]) > 0
-                    ):
+                    tied_scores = tie_groups.others(current_score.login)
+                    if tied_scores:
                         await self.instance.chat(
-                            f"$ff0You are tied with {placements.pretty_list([f'$<$fff{style.style_strip(tie_score.nickname)}$>' for tie_score in score_ties[current_score.login]])} in the {self.cup_name_fmt}",
+                            f"$ff0You are tied with {placements.pretty_list([f'$<$fff{style.style_strip(tie_score.nickname)}$>' for tie_score in tied_scores])} in the {self.cup_name_fmt}",
                             current_score.login,
                         )
                     elif score_index - 1 >= 0:
@@ -299,33 +308,129 @@ class ActiveCupManager:
             ):
                 await self._command_stop(self.cup_host, None)
 
-    async def _notify_scores_update(self, match_start_time: int, **kwargs) -> None:
+    async def _notify_scores_update(
+        self,
+        match_start_time: int,
+        team_scores: "list[GenericTeamScore]" = None,
+        player_scores: "list[GenericPlayerScore]" = None,
+        **kwargs,
+    ) -> None:
         if match_start_time in self.match_start_times:
             async with self.cached_scores_lock:
-                new_scores = await self.app.results.get_data_scores(
-                    self.match_start_times, await self.get_cup_scoremode()
-                )  # type: list[TeamPlayerScore]
-                if self.cached_scores and new_scores != self.cached_scores:
-                    for new_score in new_scores:
-                        prev_score = next(
-                            (
-                                s
-                                for s in self.cached_scores
-                                if s.login == new_score.login
-                            ),
-                            None,
-                        )  # type: TeamPlayerScore
-                        if prev_score and new_score.placement < prev_score.placement:
-                            await self.instance.chat(
-                                f"$ff0You gained $<$fff{str(abs(prev_score.placement - new_score.placement))}$> positions in the {self.cup_name_fmt}. $fff[{placements.pretty_placement(prev_score.placement)} ➙ {placements.pretty_placement(new_score.placement)}]",
-                                new_score.login,
-                            )
-                        elif prev_score and new_score.placement > prev_score.placement:
-                            await self.instance.chat(
-                                f"$ff0You lost $<$fff{str(abs(prev_score.placement - new_score.placement))}$> positions in the {self.cup_name_fmt}. $fff[{placements.pretty_placement(prev_score.placement)} ➙ {placements.pretty_placement(new_score.placement)}]",
-                                new_score.login,
-                            )
-                self.cached_scores = new_scores
+                scoremode = await self.get_cup_scoremode()
+                if LiveStandings.supports(scoremode) and player_scores is not None:
+                    placement_changes = await self._update_live_standings(
+                        match_start_time, scoremode, team_scores or [], player_scores
+                    )
+                else:
+                    if self.live_standings:
+                        # Compare against the placements of the live standings
+                        self.cached_scores = self.live_standings.get_scores()
+                        self.live_standings = None
+                    placement_changes = await self._update_cached_scores(scoremode)
+
+                for login, (
+                    prev_placement,
+                    new_placement,
+                ) in placement_changes.items():
+                    if not prev_placement:
+                        # New to the standings
+                        continue
+                    if new_placement < prev_placement:
+                        await self.instance.chat(
+                            f"$ff0You gained $<$fff{str(abs(prev_placement - new_placement))}$> positions in the {self.cup_name_fmt}. $fff[{placements.pretty_placement(prev_placement)} ➙ {placements.pretty_placement(new_placement)}]",
+                            login,
+                        )
+                    elif new_placement > prev_placement:
+                        await self.instance.chat(
+                            f"$ff0You lost $<$fff{str(abs(prev_placement - new_placement))}$> positions in the {self.cup_name_fmt}. $fff[{placements.pretty_placement(prev_placement)} ➙ {placements.pretty_placement(new_placement)}]",
+                            login,
+                        )
+
+    async def _update_cached_scores(
+        self, scoremode: ScoreModeBase
+    ) -> "dict[str, tuple[int, int]]":
+        """
+        Combine the standings from every map of the cup and compare them to
+        the previous ones. Returns the previous and new placement of the players
+        whose placement changed.
+        """
+        placement_changes = {}  # type: dict[str, tuple[int, int]]
+        new_scores = await self.app.results.get_data_scores(
+            self.match_start_times, scoremode
+        )  # type: list[TeamPlayerScore]
+        if self.cached_scores and new_scores != self.cached_scores:
+            prev_placements = {
+                prev_score.login: prev_score.placement
+                for prev_score in self.cached_scores
+            }
+            for new_score in new_scores:
+                prev_placement = prev_placements.get(new_score.login)
+                if prev_placement and new_score.placement != prev_placement:
+                    placement_changes[new_score.login] = (
+                        prev_placement,
+                        new_score.placement,
+                    )
+        self.cached_scores = new_scores
+        return placement_changes
+
+    async def _update_live_standings(
+        self,
+        match_start_time: int,
+        scoremode: ScoreModeBase,
+        team_scores: "list[GenericTeamScore]",
+        player_scores: "list[GenericPlayerScore]",
+    ) -> "dict[str, tuple[int, int]]":
+        """
+        Apply the changed scores of the current map to the live standings, which
+        are only built again from all maps when the maps or the score mode of
+        the cup changed. Returns the previous and new placement of the players
+        whose placement changed.
+        """
+        finished_match_start_times = [
+            start_time
+            for start_time in self.match_start_times
+            if start_time != match_start_time
+        ]
+        live_standings = self.live_standings
+        if (
+            live_standings
+            and finished_match_start_times
+            and live_standings.matches(
+                scoremode,
+                finished_match_start_times[:-1],
+                finished_match_start_times[-1],
+            )
+        ):
+            live_standings.next_map(match_start_time)
+        if live_standings and live_standings.matches(
+            scoremode, finished_match_start_times, match_start_time
+        ):
+            return live_standings.update(team_scores, player_scores)
+
+        if live_standings:
+            prev_placements = live_standings.placements
+        else:
+            prev_placements = {
+                prev_score.login: prev_score.placement
+                for prev_score in self.cached_scores
+            }
+        matches_scores = await self.app.results.get_data_team_player_scores(
+            finished_match_start_times + [match_start_time]
+        )
+        live_standings = LiveStandings(
+            scoremode, finished_match_start_times, match_start_time
+        )
+        live_standings.load(matches_scores[:-1], matches_scores[-1])
+        self.live_standings = live_standings
+        self.cached_scores = []
+
+        placement_changes = {}  # type: dict[str, tuple[int, int]]
+        for login, new_placement in live_standings.placements.items():
+            prev_placement = prev_placements.get(login)
+            if prev_placement and new_placement != prev_placement:
+                placement_changes[login] = (prev_placement, new_placement)
+        return placement_changes
 
     async def _command_start(self, player, data, **kwargs) -> None:
         new_cup_name = None
@@ -389,6 +494,7 @@ class ActiveCupManager:
                 self.cup_start_time = int(datetime.now().timestamp())
                 async with self.cached_scores_lock:
                     self.cached_scores = []
+                    self.live_standings = None
                 await self.instance.chat(
                     f"$z$s$0cfThe {self.cup_name_fmt} will start on the next map"
                 )
@@ -559,13 +665,15 @@ class ActiveCupManager:
             logger.debug(
                 f"looking up previous edition from key name: {str(self.cup_key_name)}"
             )
+            # Served by the (cup_key, cup_start_time) index
             cup_query = await CupInfo.execute(
-                CupInfo.select()
+                CupInfo.select(CupInfo.cup_edition)
                 .where(
                     (CupInfo.cup_key == self.cup_key_name)
                     & (CupInfo.cup_start_time != self.cup_start_time)
                 )
                 .order_by(CupInfo.cup_start_time.desc())
+                .limit(1)
             )
             if len(cup_query) > 0:
                 previous_edition_num = cup_query[0].cup_edition
@@ -584,8 +692,19 @@ class ActiveCupManager:
         self._view_cache_cup_info = []
         logger.debug("_invalidate_view_cache_cup_info")
 
-    async def _invalidate_view_cache_cup_maps(self) -> None:
-        self._view_cache_cup_maps = []
+    async def _invalidate_view_cache_cup_maps(self, cup_start_time: int = 0) -> None:
+        if cup_start_time == 0:
+            self._view_cache_cup_maps = {}
+            self._view_cache_cup_map_stats = None
+            logger.debug("_invalidate_view_cache_cup_maps")
+            return
+        self._view_cache_cup_maps.pop(cup_start_time, None)
+        if self._view_cache_cup_map_stats is not None:
+            # Only the stats of the changed cup are read again
+            self._view_cache_cup_map_stats.pop(cup_start_time, None)
+            self._view_cache_cup_map_stats.update(
+                await self._query_cup_map_stats(cup_start_time)
+            )
         logger.debug("_invalidate_view_cache_cup_maps")
 
     async def open_view_cups(self, player) -> None:
@@ -623,6 +742,48 @@ class ActiveCupManager:
                 self._view_cache_cup_info = list(cups_query)
         return self._view_cache_cup_info
 
+    async def _query_cup_map_stats(
+        self, cup_start_time: int = 0
+    ) -> "dict[int, tuple[int, int, int]]":
+        """
+        Map count, first and last map_start_time per cup in one grouped query,
+        for a single cup or for all cups when cup_start_time is 0
+        """
+        stats_query = CupMatch.select(
+            CupMatch.cup_start_time,
+            fn.COUNT(CupMatch.id).alias("map_count"),
+            fn.MIN(CupMatch.map_start_time).alias("first_map_start_time"),
+            fn.MAX(CupMatch.map_start_time).alias("last_map_start_time"),
+        )
+        if cup_start_time:
+            stats_query = stats_query.where(CupMatch.cup_start_time == cup_start_time)
+        stats_rows = await CupMatch.execute(
+            stats_query.group_by(CupMatch.cup_start_time).dicts()
+        )
+        return {
+            int(row["cup_start_time"]): (
+                int(row["map_count"]),
+                int(row["first_map_start_time"]),
+                int(row["last_map_start_time"]),
+            )
+            for row in stats_rows
+        }
+
+    async def get_data_cup_summaries(self) -> "list[CupSummary]":
+        """
+        All cups, most recent first, with the map count and the first and last
+        map of each cup
+        """
+        if self._view_cache_cup_map_stats is None:
+            self._view_cache_cup_map_stats = await self._query_cup_map_stats()
+        return [
+            CupSummary(
+                cup_info,
+                *self._view_cache_cup_map_stats.get(cup_info.cup_start_time, ()),
+            )
+            for cup_info in await self.get_data_cup_info()
+        ]
+
     async def get_data_specific_cup_info(self, cup_start_time: int) -> CupInfo:
         all_cups = await self.get_data_cup_info()
         for cup_info in all_cups:
@@ -632,17 +793,16 @@ class ActiveCupManager:
             return None
 
     async def get_data_cup_match_times(self, cup_start_time: int) -> "list[int]":
-        if not self._view_cache_cup_maps:
+        if cup_start_time not in self._view_cache_cup_maps:
             cup_maps_query = await CupMatch.execute(
-                CupMatch.select().order_by(CupMatch.cup_start_time.desc())
+                CupMatch.select(CupMatch.map_start_time)
+                .where(CupMatch.cup_start_time == cup_start_time)
+                .order_by(CupMatch.id)
             )
-            if len(cup_maps_query) > 0:
-                self._view_cache_cup_maps = list(cup_maps_query)
-        return [
-            int(map_time.map_start_time)
-            for map_time in self._view_cache_cup_maps
-            if map_time.cup_start_time == cup_start_time
-        ]
+            self._view_cache_cup_maps[cup_start_time] = [
+                int(cup_map.map_start_time) for cup_map in cup_maps_query
+            ]
+        return list(self._view_cache_cup_maps[cup_start_time])
 
     async def determine_cup_score_sorting(
         self, cup_start_time: int, matches: "list[int]"
@@ -1,9 +1,12 @@
+from array import array
 from enum import Enum
 import logging
+from operator import attrgetter
+import sys
 
 from pyplanet.utils import times
 
-from .models import PlayerScore
+from .models import CupInfo, PlayerScore
 
 logger = logging.getLogger(__name__)
 
@@ -47,6 +50,18 @@ class GenericPlayerScore:
     def __repr__(self) -> str:
         return f"<GenericPlayerScore login:{self.login} nickname:{self.nickname} country:{self.country} score:{self.score} score2:{self.score2} team:{self.team}>"
 
+    def __eq__(self, __o: "GenericPlayerScore") -> bool:
+        if not isinstance(__o, GenericPlayerScore):
+            return NotImplemented
+        return (
+            self.login == __o.login
+            and self.nickname == __o.nickname
+            and self.country == __o.country
+            and self.score == __o.score
+            and self.score2 == __o.score2
+            and self.team == __o.team
+        )
+
 
 class GenericTeamScore:
     id = 0
@@ -61,6 +76,25 @@ class GenericTeamScore:
     def __repr__(self) -> str:
         return f"<GenericTeamScore id:{self.id} name:{self.name} score:{self.score}>"
 
+    def __eq__(self, __o: "GenericTeamScore") -> bool:
+        if not isinstance(__o, GenericTeamScore):
+            return NotImplemented
+        return self.id == __o.id and self.name == __o.name and self.score == __o.score
+
+
+class ScoreIngestStats:
+    """
+    Counters of the scores callbacks handled by ResultsCupManager
+    """
+
+    received = 0
+    skipped_non_live = 0
+    dropped_duplicate = 0
+    processed = 0
+
+    def __repr__(self) -> str:
+        return f"<ScoreIngestStats received:{self.received} skipped_non_live:{self.skipped_non_live} dropped_duplicate:{self.dropped_duplicate} processed:{self.processed}>"
+
 
 class TeamPlayerScore:
     login = ""
@@ -100,6 +134,19 @@ class TeamPlayerScore:
     def __repr__(self) -> str:
         return f"<TeamPlayerScore login:{self.login} nickname:{self.nickname} country:{self.country} team_id:{self.team_id} team_name:{self.team_name} team_score:{self.team_score_str} player_score:{self.player_score_str} player_score2:{self.player_score2_str}>"
 
+    def __setattr__(self, name: str, value) -> None:
+        if self.__dict__.get("_frozen"):
+            raise AttributeError(f"TeamPlayerScore of {self.login} is read-only")
+        super().__setattr__(name, value)
+
+    def freeze(self) -> "TeamPlayerScore":
+        """
+        Make the score read-only, used for results which are shared through a
+        cache.
+        """
+        self.__dict__["_frozen"] = True
+        return self
+
     def __eq__(self, __o: "TeamPlayerScore") -> bool:
         return (
             self.login == __o.login
@@ -155,6 +202,252 @@ class TeamPlayerScore:
         )
 
 
+# Fields of a TeamPlayerScore in the order ScoreMatrix.add_map takes them
+_score_fields = attrgetter(
+    "login",
+    "nickname",
+    "country",
+    "team_id",
+    "team_name",
+    "team_score",
+    "player_score",
+    "player_score2",
+)
+
+
+def _score_column(values: list) -> "array | list":
+    """
+    Signed 64-bit array of the values, or the list itself when they are not
+    all integers
+    """
+    try:
+        return array("q", values)
+    except (TypeError, OverflowError):
+        return values
+
+
+class ScoreMatrix:
+    """
+    Columnar scores of a sequence of maps, the common input of the score modes.
+
+    Logins are interned into rows shared by every map. Each map holds the rows
+    of its scores in the order they were added with aligned array columns of
+    team_score, player_score and player_score2, the interned nickname,
+    country and team of each score, and a presence mask by row. Selecting a
+    subset of the maps shares these columns instead of copying them.
+    """
+
+    COLUMNS = ("team_score", "player_score", "player_score2")
+
+    def __init__(self) -> None:
+        # Interned logins and the row of each login
+        self.logins = []  # type: list[str]
+        self.rows = {}  # type: dict[str, int]
+        # Interned (nickname, country, team_id, team_name) of the scores
+        self.players = []  # type: list[tuple]
+        self._player_ids = {}  # type: dict[tuple, int]
+        # Per map columns, aligned with the rows of the map
+        self.map_rows = []  # type: list[array]
+        self.map_players = []  # type: list[array]
+        self.columns = {
+            name: [] for name in ScoreMatrix.COLUMNS
+        }  # type: dict[str, list[array | list]]
+        # Per map, nonzero at the rows which have a score on the map
+        self.presence = []  # type: list[bytearray]
+
+    def __repr__(self) -> str:
+        return f"<ScoreMatrix maps:{str(len(self))} players:{str(len(self.logins))} scores:{str(self.score_count())}>"
+
+    def __len__(self) -> int:
+        return len(self.map_rows)
+
+    def __getitem__(self, maps: slice) -> "ScoreMatrix":
+        """
+        Matrix of a slice of the maps, e.g. matrix[:k] for the standings after
+        map k
+        """
+        return self.select_maps(range(len(self))[maps])
+
+    @staticmethod
+    def from_scores(
+        scores: "ScoreMatrix | list[list[TeamPlayerScore]]",
+    ) -> "ScoreMatrix":
+        """
+        Matrix of the scores of each map, a matrix is returned as is
+        """
+        if isinstance(scores, ScoreMatrix):
+            return scores
+        matrix = ScoreMatrix()
+        for map_scores in scores:
+            matrix.add_map(map(_score_fields, map_scores))
+        return matrix
+
+    def add_map(self, scores) -> None:
+        """
+        Append a map from (login, nickname, country, team_id, team_name,
+        team_score, player_score, player_score2) tuples, in the order of the
+        TeamPlayerScore arguments
+        """
+        map_rows = []  # type: list[int]
+        map_players = []  # type: list[int]
+        team_scores = []  # type: list[int]
+        player_scores = []  # type: list[int]
+        player_scores2 = []  # type: list[int]
+        for (
+            login,
+            nickname,
+            country,
+            team_id,
+            team_name,
+            team_score,
+            player_score,
+            player_score2,
+        ) in scores:
+            row = self.rows.get(login)
+            if row is None:
+                login = sys.intern(login)
+                row = self.rows[login] = len(self.logins)
+                self.logins.append(login)
+            player = (nickname, country, team_id, team_name)
+            player_id = self._player_ids.get(player)
+            if player_id is None:
+                player_id = self._player_ids[player] = len(self.players)
+                self.players.append(player)
+            map_rows.append(row)
+            map_players.append(player_id)
+            team_scores.append(team_score)
+            player_scores.append(player_score)
+            player_scores2.append(player_score2)
+
+        presence = bytearray(len(self.logins))
+        for row in map_rows:
+            presence[row] = 1
+        self.map_rows.append(array("q", map_rows))
+        self.map_players.append(array("q", map_players))
+        self.columns["team_score"].append(_score_column(team_scores))
+        self.columns["player_score"].append(_score_column(player_scores))
+        self.columns["player_score2"].append(_score_column(player_scores2))
+        self.presence.append(presence)
+
+    def select_maps(self, map_indexes) -> "ScoreMatrix":
+        """
+        Matrix of the given maps which shares the login index and the columns
+        of this one
+        """
+        matrix = ScoreMatrix()
+        matrix.logins = self.logins
+        matrix.rows = self.rows
+        matrix.players = self.players
+        matrix._player_ids = self._player_ids
+        for map_index in map_indexes:
+            matrix.map_rows.append(self.map_rows[map_index])
+            matrix.map_players.append(self.map_players[map_index])
+            for name in ScoreMatrix.COLUMNS:
+                matrix.columns[name].append(self.columns[name][map_index])
+            matrix.presence.append(self.presence[map_index])
+        return matrix
+
+    def score_count(self) -> int:
+        return sum(len(map_rows) for map_rows in self.map_rows)
+
+    def has_score(self, map_index: int, login: str) -> bool:
+        row = self.rows.get(login)
+        presence = self.presence[map_index]
+        return row is not None and row < len(presence) and presence[row] != 0
+
+    def get_score(self, map_index: int, index: int) -> "TeamPlayerScore":
+        """
+        New TeamPlayerScore of the index-th score of a map
+        """
+        nickname, country, team_id, team_name = self.players[
+            self.map_players[map_index][index]
+        ]
+        return TeamPlayerScore(
+            self.logins[self.map_rows[map_index][index]],
+            nickname,
+            country,
+            team_id,
+            team_name,
+            self.columns["team_score"][map_index][index],
+            self.columns["player_score"][map_index][index],
+            self.columns["player_score2"][map_index][index],
+        )
+
+    def map_scores(self, map_index: int) -> "list[TeamPlayerScore]":
+        return [
+            self.get_score(map_index, index)
+            for index in range(len(self.map_rows[map_index]))
+        ]
+
+
+class TieGroups:
+    """
+    Players sharing a placement, found in one pass over placed scores.
+    by_placement holds the scores of each shared placement and by_login the
+    same group for each tied login. Players without a tie are in neither.
+    """
+
+    def __init__(self, scores: "list[TeamPlayerScore]") -> None:
+        self.by_placement = {}  # type: dict[int, list[TeamPlayerScore]]
+        self.by_login = {}  # type: dict[str, list[TeamPlayerScore]]
+        groups = {}  # type: dict[int, list[TeamPlayerScore]]
+        for score in scores:
+            groups.setdefault(score.placement, []).append(score)
+        for placement, group in groups.items():
+            if len(group) > 1:
+                self.by_placement[placement] = group
+                for score in group:
+                    self.by_login[score.login] = group
+
+    def __repr__(self) -> str:
+        return f"<TieGroups groups:{str(len(self.by_placement))} players:{str(len(self.by_login))}>"
+
+    def __contains__(self, login: str) -> bool:
+        return login in self.by_login
+
+    def logins(self, placement: int) -> "list[str]":
+        return [score.login for score in self.by_placement.get(placement, [])]
+
+    def size(self, login: str) -> int:
+        """
+        Number of players sharing the placement of login, 1 without a tie
+        """
+        return len(self.by_login.get(login, ())) or 1
+
+    def others(self, login: str) -> "list[TeamPlayerScore]":
+        """
+        Scores of the other players tied with login
+        """
+        return [score for score in self.by_login.get(login, []) if score.login != login]
+
+
+class CupSummary:
+    """
+    CupInfo of a cup with its number of maps and the start times of its first
+    and last map
+    """
+
+    info = None
+    map_count = 0
+    first_map_start_time = 0
+    last_map_start_time = 0
+
+    def __init__(
+        self,
+        info: CupInfo,
+        map_count: int = 0,
+        first_map_start_time: int = 0,
+        last_map_start_time: int = 0,
+    ) -> None:
+        self.info = info
+        self.map_count = map_count
+        self.first_map_start_time = first_map_start_time
+        self.last_map_start_time = last_map_start_time
+
+    def __repr__(self) -> str:
+        return f"<CupSummary cup_start_time:{str(self.info.cup_start_time)} map_count:{str(self.map_count)}>"
+
+
 class PaymentScore:
     score = None
     payment = 0
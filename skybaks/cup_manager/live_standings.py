@@ -0,0 +1,261 @@
+import logging
+from bisect import bisect_left, insort
+
+from .app_types import GenericPlayerScore, GenericTeamScore, TeamPlayerScore
+from .score_mode import ScoreModeBase
+
+logger = logging.getLogger(__name__)
+
+
+class LiveStandings:
+    """
+    Standings of a running cup which are updated from the score changes of the
+    current map instead of being combined again from every map of the cup.
+
+    The scores of the finished maps are summed once per player. Each scores
+    callback only replaces the current map contribution of the players that
+    changed and moves them in a sorted list of (sort key, login), so an update
+    costs O(changed players * log n) plus the players whose placement shifted.
+
+    Only score modes which declare sum_fields are supported, the results match
+    ScoreModeBase.combine_scores, sort_scores and update_placements.
+    """
+
+    def __init__(
+        self,
+        sorting: ScoreModeBase,
+        finished_match_start_times: "list[int]",
+        map_start_time: int,
+    ) -> None:
+        self.sorting = sorting
+        self.finished_match_start_times = tuple(finished_match_start_times)
+        self.map_start_time = map_start_time
+        self.placements = {}  # type: dict[str, int]
+        # Summed scores of the finished maps
+        self._finished = {}  # type: dict[str, TeamPlayerScore]
+        # Scores of the current map
+        self._current = {}  # type: dict[str, TeamPlayerScore]
+        self._team_scores = {}  # type: dict[int, int]
+        self._team_members = {}  # type: dict[int, set[str]]
+        # Combined scores, their sort key and the standings ordered by key
+        self._totals = {}  # type: dict[str, TeamPlayerScore]
+        self._keys = {}  # type: dict[str, tuple]
+        self._order = []  # type: list[tuple[tuple, str]]
+
+    @staticmethod
+    def supports(sorting: ScoreModeBase) -> bool:
+        return bool(sorting and sorting.sum_fields)
+
+    def matches(
+        self,
+        sorting: ScoreModeBase,
+        finished_match_start_times: "list[int]",
+        map_start_time: int,
+    ) -> bool:
+        """
+        Whether the standings were built for this score mode and these maps
+        """
+        return (
+            self.sorting.name == sorting.name
+            and self.map_start_time == map_start_time
+            and self.finished_match_start_times == tuple(finished_match_start_times)
+        )
+
+    def load(
+        self,
+        finished_scores: "list[list[TeamPlayerScore]]",
+        current_scores: "list[TeamPlayerScore]",
+    ) -> None:
+        """
+        Build the standings from the scores of the finished maps and the
+        scores recorded so far on the current map.
+        """
+        for map_scores in finished_scores:
+            for map_score in map_scores:
+                self._add_finished(map_score)
+
+        for map_score in current_scores:
+            self._set_current(map_score)
+            self._team_scores[map_score.team_id] = map_score.team_score
+
+        self._order = []
+        for login in set(self._finished) | set(self._current):
+            self._totals[login] = self._combine(login)
+            self._keys[login] = tuple(self.sorting.sort_key(self._totals[login]))
+            self._order.append((self._keys[login], login))
+        self._order.sort()
+        self._update_placements(0, len(self._order) - 1)
+
+    def update(
+        self,
+        team_scores: "list[GenericTeamScore]",
+        player_scores: "list[GenericPlayerScore]",
+    ) -> "dict[str, tuple[int, int]]":
+        """
+        Apply the changed scores of the current map. Returns the previous and
+        new placement of every player whose placement changed, players new to
+        the standings have a previous placement of 0.
+        """
+        changed_logins = set()  # type: set[str]
+        for player_score in player_scores:
+            self._set_current(
+                TeamPlayerScore(
+                    player_score.login,
+                    player_score.nickname,
+                    player_score.country,
+                    player_score.team,
+                    None,
+                    self._team_scores.get(player_score.team, 0),
+                    player_score.score,
+                    player_score.score2,
+                )
+            )
+            changed_logins.add(player_score.login)
+
+        for team_score in team_scores:
+            self._team_scores[team_score.id] = team_score.score
+            for login in self._team_members.get(team_score.id, set()):
+                self._current[login].team_name = team_score.name
+                self._current[login].team_score = team_score.score
+                changed_logins.add(login)
+
+        return self._reorder(changed_logins)
+
+    def next_map(self, map_start_time: int) -> None:
+        """
+        Count the current map as finished and continue on a new one. The
+        standings do not change until the new map has scores.
+        """
+        for map_score in self._current.values():
+            self._add_finished(map_score)
+        self.finished_match_start_times += (self.map_start_time,)
+        self.map_start_time = map_start_time
+        self._current = {}
+        self._team_scores = {}
+        self._team_members = {}
+
+    def get_scores(self) -> "list[TeamPlayerScore]":
+        """
+        Returns the combined scores in standings order with their placement
+        """
+        scores = []  # type: list[TeamPlayerScore]
+        for _, login in self._order:
+            self._totals[login].placement = self.placements[login]
+            scores.append(self._totals[login])
+        return scores
+
+    def _add_finished(self, map_score: TeamPlayerScore) -> None:
+        finished_score = self._finished.get(map_score.login)
+        if finished_score is None:
+            finished_score = TeamPlayerScore(
+                map_score.login,
+                map_score.nickname,
+                map_score.country,
+                map_score.team_id,
+                map_score.team_name,
+                0,
+                0,
+                0,
+            )
+            finished_score.count = 0
+            self._finished[map_score.login] = finished_score
+        for field in self.sorting.sum_fields:
+            setattr(
+                finished_score,
+                field,
+                getattr(finished_score, field) + getattr(map_score, field),
+            )
+        finished_score.count += 1
+
+    def _set_current(self, map_score: TeamPlayerScore) -> None:
+        previous_score = self._current.get(map_score.login)
+        if previous_score is not None:
+            self._team_members[previous_score.team_id].discard(map_score.login)
+        self._current[map_score.login] = map_score
+        self._team_members.setdefault(map_score.team_id, set()).add(map_score.login)
+
+    def _combine(self, login: str) -> TeamPlayerScore:
+        finished_score = self._finished.get(login)
+        current_score = self._current.get(login)
+        base_score = finished_score or current_score
+        combined_score = TeamPlayerScore(
+            login,
+            base_score.nickname,
+            base_score.country,
+            base_score.team_id,
+            base_score.team_name,
+            0,
+            0,
+            0,
+        )
+        combined_score.count = 0
+        for map_score in (finished_score, current_score):
+            if map_score is None:
+                continue
+            for field in self.sorting.sum_fields:
+                setattr(
+                    combined_score,
+                    field,
+                    getattr(combined_score, field) + getattr(map_score, field),
+                )
+        if finished_score is not None:
+            combined_score.count += finished_score.count
+        if current_score is not None:
+            combined_score.count += 1
+        if not self.sorting.count_maps:
+            combined_score.count = 1
+        return combined_score
+
+    def _reorder(self, changed_logins: "set[str]") -> "dict[str, tuple[int, int]]":
+        if not changed_logins:
+            return {}
+        size_before = len(self._order)
+        first_index = size_before
+        last_index = 0
+        removed_indexes = sorted(
+            bisect_left(self._order, (self._keys[login], login))
+            for login in changed_logins
+            if login in self._keys
+        )
+        for index in reversed(removed_indexes):
+            del self._order[index]
+        if removed_indexes:
+            first_index = removed_indexes[0]
+            last_index = removed_indexes[-1]
+        for login in changed_logins:
+            self._totals[login] = self._combine(login)
+            self._keys[login] = tuple(self.sorting.sort_key(self._totals[login]))
+            insort(self._order, (self._keys[login], login))
+        for login in changed_logins:
+            index = bisect_left(self._order, (self._keys[login], login))
+            first_index = min(first_index, index)
+            last_index = max(last_index, index)
+        if len(self._order) != size_before:
+            # Everyone below a new player moved down
+            last_index = len(self._order) - 1
+        return self._update_placements(first_index, last_index)
+
+    def _update_placements(
+        self, first_index: int, last_index: int
+    ) -> "dict[str, tuple[int, int]]":
+        """
+        Recompute the placements from first_index on. Players below last_index
+        kept their position, they only change while they are or were tied with
+        a player above it.
+        """
+        changes = {}  # type: dict[str, tuple[int, int]]
+        index = first_index
+        while index < len(self._order):
+            key, login = self._order[index]
+            if index > 0 and self._order[index - 1][0] == key:
+                placement = self.placements[self._order[index - 1][1]]
+            elif index > last_index and self.placements.get(login) == index + 1:
+                break
+            else:
+                placement = index + 1
+            previous_placement = self.placements.get(login, 0)
+            if placement != previous_placement:
+                self.placements[login] = placement
+                changes[login] = (previous_placement, placement)
+            index += 1
+        return changes
@@ -0,0 +1,13 @@
+from playhouse.migrate import SchemaMigrator
+
+from ..models import PlayerScore, TeamScore
+from ..schema import ensure_indexes
+
+
+def upgrade(migrator: SchemaMigrator) -> None:
+    # Removes the duplicate scores, keeping the most recently written row
+    ensure_indexes([PlayerScore, TeamScore])
+
+
+def downgrade(migrator: SchemaMigrator) -> None:
+    pass
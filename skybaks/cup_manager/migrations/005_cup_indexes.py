@@ -0,0 +1,13 @@
+from playhouse.migrate import SchemaMigrator
+
+from ..models import CupInfo, CupMatch
+from ..schema import ensure_indexes
+
+
+def upgrade(migrator: SchemaMigrator) -> None:
+    # Removes the duplicate cup matches, keeping the first row added
+    ensure_indexes([CupMatch, CupInfo])
+
+
+def downgrade(migrator: SchemaMigrator) -> None:
+    pass
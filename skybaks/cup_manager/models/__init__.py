@@ -2,6 +2,8 @@ from .player_score import PlayerScore
 from .team_score import TeamScore
 from .match_info import MatchInfo
 from .cup_model import CupInfo, CupMatch
+from .map_mx_id import MapMxId
+from .match_result import MatchResult
 
 __all__ = [
     "PlayerScore",
@@ -9,4 +11,6 @@ __all__ = [
     "MatchInfo",
     "CupInfo",
     "CupMatch",
+    "MapMxId",
+    "MatchResult",
 ]
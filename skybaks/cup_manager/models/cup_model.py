@@ -40,6 +40,7 @@ class CupInfo(TimedModel):
 
     class Meta:
         db_table = "cup_manager_cupinfo"
+        indexes = ((("cup_key", "cup_start_time"), False),)
 
 
 class CupMatch(TimedModel):
@@ -55,3 +56,4 @@ class CupMatch(TimedModel):
 
     class Meta:
         db_table = "cup_manager_cupmatch"
+        indexes = ((("cup_start_time", "map_start_time"), True),)
@@ -0,0 +1,17 @@
+from peewee import *
+from pyplanet.core.db import TimedModel
+
+
+class MapMxId(TimedModel):
+    map_uid = CharField(null=False, unique=True, max_length=50)
+    """
+	The unique UID of the map file
+	"""
+
+    mx_id = CharField(null=True, max_length=50)
+    """
+	The id of the map on (T)MX. Empty when the map was not found on (T)MX
+	"""
+
+    class Meta:
+        db_table = "cup_manager_mapmxid"
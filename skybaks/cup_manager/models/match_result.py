@@ -0,0 +1,48 @@
+from peewee import *
+from pyplanet.core.db import TimedModel
+
+
+class MatchResult(TimedModel):
+    map_start_time = IntegerField(null=False)
+    """
+	Server start time for a map. Identifies what match a result belongs to
+	"""
+
+    login = CharField(null=False, max_length=150)
+    """
+	Player login who the result belongs to
+	"""
+
+    score_mode = CharField(null=False, max_length=50)
+    """
+	Name of the default score mode of the match which the placement is based on
+	"""
+
+    placement = IntegerField(null=False)
+    """
+	Final placement of the player on the map
+	"""
+
+    player_count = IntegerField(null=False)
+    """
+	Number of players with a score on the map
+	"""
+
+    score = IntegerField(null=False)
+    """
+	Score value for the player as combined by the score mode
+	"""
+
+    score2 = IntegerField(null=False)
+    """
+	Additional score value for the player as combined by the score mode
+	"""
+
+    team_score = IntegerField(null=False)
+    """
+	Score value for the player's team
+	"""
+
+    class Meta:
+        db_table = "cup_manager_matchresult"
+        indexes = ((("map_start_time", "login"), True),)
@@ -40,3 +40,4 @@ class PlayerScore(TimedModel):
 
     class Meta:
         db_table = "cup_manager_playerscore"
+        indexes = ((("map_start_time", "login"), True),)
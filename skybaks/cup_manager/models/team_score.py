@@ -25,3 +25,4 @@ class TeamScore(TimedModel):
 
     class Meta:
         db_table = "cup_manager_teamscore"
+        indexes = ((("map_start_time", "team_id"), True),)
@@ -0,0 +1,109 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+
+from .models import MapMxId
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait for the (T)MX API before giving up on a lookup
+MX_LOOKUP_TIMEOUT = 10
+
+# Maps which were not found on (T)MX are looked up again after this long, in
+# case they have been uploaded in the meantime
+MX_NOT_FOUND_RETRY_AFTER = timedelta(days=1)
+
+
+class MxIdResolver:
+    """
+    Resolves the (T)MX id of a map by UID. Results are kept in memory and in
+    the MapMxId table so a map is only looked up once, maps that are not on
+    (T)MX are cached as an empty id. Concurrent lookups of the same UID share
+    one request.
+
+    get_api returns the object providing map_info(uid), normally the api of
+    the mx app, or None when no such app is loaded.
+    """
+
+    def __init__(self, get_api, timeout: float = MX_LOOKUP_TIMEOUT) -> None:
+        self._get_api = get_api
+        self._timeout = timeout
+        self._cache = {}  # type: dict[str, str]
+        self._lookups = {}  # type: dict[str, asyncio.Future]
+
+    async def get_cached(self, map_uid: str) -> "str | None":
+        """
+        Returns the cached id of the map, an empty string if the map is known
+        to not be on (T)MX, or None if the map has to be looked up.
+        """
+        if map_uid in self._cache:
+            return self._cache[map_uid]
+
+        try:
+            cached_rows = list(
+                await MapMxId.execute(
+                    MapMxId.select().where(MapMxId.map_uid == map_uid)
+                )
+            )
+        except Exception as e:
+            logger.error(f"Exception reading cached (T)MX id for {map_uid}: {str(e)}")
+            return None
+
+        for cached_row in cached_rows:
+            if cached_row.mx_id or (
+                cached_row.updated_at
+                and datetime.now() - cached_row.updated_at < MX_NOT_FOUND_RETRY_AFTER
+            ):
+                self._cache[map_uid] = cached_row.mx_id or ""
+                return self._cache[map_uid]
+        return None
+
+    async def resolve(self, map_uid: str) -> str:
+        """
+        Returns the (T)MX id of the map or an empty string if it could not be
+        found. Lookups which time out or fail are not cached.
+        """
+        cached_id = await self.get_cached(map_uid)
+        if cached_id is not None:
+            return cached_id
+
+        if map_uid not in self._lookups:
+            self._lookups[map_uid] = asyncio.ensure_future(self._lookup(map_uid))
+        try:
+            return await asyncio.shield(self._lookups[map_uid])
+        finally:
+            if map_uid in self._lookups and self._lookups[map_uid].done():
+                del self._lookups[map_uid]
+
+    async def _lookup(self, map_uid: str) -> str:
+        api = self._get_api()
+        if not api:
+            return ""
+
+        try:
+            mx_info = await asyncio.wait_for(api.map_info(map_uid), self._timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"Timed out retrieving the map info from (T)MX for {map_uid}")
+            return ""
+        except Exception as e:
+            logger.error(
+                f"Could not retrieve the map info from (T)MX API for {map_uid}: {str(e)}"
+            )
+            return ""
+
+        mx_id = str(mx_info[0][0]) if mx_info and len(mx_info) >= 1 else ""
+        self._cache[map_uid] = mx_id
+        await self._store(map_uid, mx_id)
+        return mx_id
+
+    async def _store(self, map_uid: str, mx_id: str) -> None:
+        try:
+            updated = await MapMxId.execute(
+                MapMxId.update(mx_id=mx_id, updated_at=datetime.now()).where(
+                    MapMxId.map_uid == map_uid
+                )
+            )
+            if not updated:
+                await MapMxId.execute(MapMxId.insert(map_uid=map_uid, mx_id=mx_id))
+        except Exception as e:
+            logger.error(f"Exception caching (T)MX id for {map_uid}: {str(e)}")
@@ -50,17 +50,19 @@ class PayoutCupManager:
         payout_key: str,
         sorted_results: "list[TeamPlayerScore]",
         score_sorting: ScoreModeBase,
+        tie_groups: "TieGroups | None" = None,
     ) -> "list[PaymentScore]":
         payouts = await self.app.config.get_cup_payouts()
         selected_payout = []  # type: list[int]
         if payout_key in payouts:
             selected_payout = payouts[payout_key]
         payout_score = []  # type: list[PaymentScore]
-        score_ties = score_sorting.get_ties(sorted_results)
+        if tie_groups is None:
+            tie_groups = score_sorting.get_tie_groups(sorted_results)
         for player_score in sorted_results:
             if 0 <= player_score.placement - 1 < len(selected_payout):
-                if player_score.login in score_ties:
-                    tied_players_count = len(score_ties[player_score.login]) + 1
+                if player_score.login in tie_groups:
+                    tied_players_count = tie_groups.size(player_score.login)
                     tied_payment_pool = 0
                     for index in range(0, tied_players_count):
                         if player_score.placement - 1 + index < len(selected_payout):
@@ -91,6 +93,7 @@ class PayoutCupManager:
             return
 
         if view.scores_query:
+            await self.app.results.flush_scores()
             scores_data = await self.app.results.get_data_scores(
                 view.scores_query, view.scores_sorting
             )
@@ -1,14 +1,18 @@
+import asyncio
+import bisect
 import logging
 from datetime import datetime
 from peewee import *
+from playhouse.shortcuts import case
 
 from pyplanet.apps.core.maniaplanet import callbacks as mp_signals
 from pyplanet.apps.core.trackmania import callbacks as tm_signals
 from pyplanet.apps.core.shootmania import callbacks as sm_signals
 from pyplanet.contrib.command import Command
+from pyplanet.contrib.setting import Setting
 from pyplanet.utils import style
 
-from .models import PlayerScore, TeamScore, MatchInfo, CupInfo
+from .models import PlayerScore, TeamScore, MatchInfo, MatchResult, CupInfo
 from .views import (
     MatchHistoryView,
     TextResultsView,
@@ -17,12 +21,41 @@ from .views import (
     GeneralResultsView,
     ScoreModeView,
 )
-from .app_types import GenericPlayerScore, GenericTeamScore, TeamPlayerScore
+from .app_types import (
+    GenericPlayerScore,
+    GenericTeamScore,
+    ScoreIngestStats,
+    ScoreMatrix,
+    TeamPlayerScore,
+)
+from .score_extractor import ScoreExtractorBase, get_score_extractor
+from .mx_id_resolver import MxIdResolver
+from .standings_cache import StandingsCache
+from .utils.lru_cache import LRUCache
 from .score_mode import ScoreModeBase, SCORE_MODE
 from .score_mode.mode_logic import get_sorting_from_mode
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of rows written by a single INSERT or UPDATE statement. Keeps
+# the amount of bound parameters well below the limits of the database drivers.
+SCORE_WRITE_BATCH_SIZE = 250
+
+# Maximum number of matches loaded by a single SELECT ... IN query
+SCORE_READ_BATCH_SIZE = 500
+
+# Standings over at least this many matches are summed inside the database when
+# the score mode supports it, instead of loading every score row
+SQL_AGGREGATION_MIN_MATCHES = 50
+
+# Columns of the aggregation query holding the sum of each TeamPlayerScore field
+SQL_AGGREGATION_COLUMNS = {
+    "player_score": "sum_score",
+    "player_score2": "sum_score2",
+    "team_score": "sum_team_score",
+    "count": "map_count",
+}
+
 
 class ResultsCupManager:
     def __init__(self, app) -> None:
@@ -33,18 +66,80 @@ class ResultsCupManager:
         self._match_start_time = 0
         self._match_map_name = ""
         self._match_mx_id = ""
-        self._match_players_scored = []
-        self._match_teams_scored = []
+        self._match_mode_script = ""
+        self._score_extractor = None  # type: ScoreExtractorBase
+        self._mx_id_resolver = MxIdResolver(self._get_mx_api)
+        self._mx_id_backfill_tasks = set()  # type: set[asyncio.Task]
         self._match_info_created = False
-        self._view_cache_matches = []
-        self._view_cache_scores = {}
-        self._view_cache_team_scores = {}
+        self._warmup_active = False
+        self._last_payload_fingerprint = None  # type: int
+        self._ingest_stats = ScoreIngestStats()
+        self._view_cache_matches = {}  # type: dict[int, MatchInfo]
+        self._view_cache_match_times = []  # type: list[int]
+        self._view_cache_matches_list = None  # type: list[MatchInfo]
+        self._view_cache_matches_loaded = False
+        self._view_cache_matches_stale = set()  # type: set[int]
+        self._view_cache_match_count = None  # type: int | None
+        self._view_cache_scores = LRUCache(
+            size_of=len, get_pinned=self._get_pinned_matches
+        )  # type: LRUCache
+        self._view_cache_team_scores = LRUCache(
+            size_of=len, get_pinned=self._get_pinned_matches
+        )  # type: LRUCache
+        self._view_cache_match_results = LRUCache(
+            size_of=len, get_pinned=self._get_pinned_matches
+        )  # type: LRUCache
+        self._standings_cache = StandingsCache()
         self._match_start_notify_list = []
         self._scores_update_notify_list = []
+        self._pending_player_scores = (
+            {}
+        )  # type: dict[tuple[int, str], GenericPlayerScore]
+        self._pending_team_scores = {}  # type: dict[tuple[int, int], GenericTeamScore]
+        self._pending_flush_lock = asyncio.Lock()
+        self._pending_flush_task = None  # type: asyncio.Task
+        # Last score written (or buffered) for each player and team of the
+        # current match. Callbacks only write the entries which differ from it.
+        self._persisted_player_scores = {}  # type: dict[str, GenericPlayerScore]
+        self._persisted_team_scores = {}  # type: dict[int, GenericTeamScore]
+        # Entries changed by the last recorded scores callback, passed on to
+        # the scores update notify methods
+        self._last_changed_team_scores = []  # type: list[GenericTeamScore]
+        self._last_changed_player_scores = []  # type: list[GenericPlayerScore]
+
+        self.setting_write_behind_interval = Setting(
+            "cup_manager_write_behind_interval",
+            "Score Write-Behind Interval",
+            Setting.CAT_BEHAVIOUR,
+            type=int,
+            description="Seconds to hold incoming scores in memory before writing them to the database. Only the latest score of each player is written. Scores are always written at map end. Set to 0 to write every scores callback immediately.",
+            default=0,
+            change_target=self._setting_write_behind_interval_changed,
+        )
+
+        self.setting_score_cache_size = Setting(
+            "cup_manager_score_cache_size",
+            "Score Cache Size",
+            Setting.CAT_BEHAVIOUR,
+            type=int,
+            description="Maximum number of score rows kept in memory for viewing results. Least recently viewed matches are dropped first, the current match and the matches of the active cup are always kept. Set to 0 for no limit.",
+            default=100000,
+            change_target=self._setting_score_cache_size_changed,
+        )
 
         AddRemoveCupMatchesView.set_get_data_method(self.get_data_matches)
 
     async def on_start(self) -> None:
+        await self.context.setting.register(
+            self.setting_write_behind_interval, self.setting_score_cache_size
+        )
+        await self._setting_score_cache_size_changed(
+            None, await self.setting_score_cache_size.get_value()
+        )
+        await self._setting_write_behind_interval_changed(
+            None, await self.setting_write_behind_interval.get_value()
+        )
+
         self.context.signals.listen(tm_signals.scores, self._tm_signals_scores)
         self.context.signals.listen(
             mp_signals.map.map_start, self._mp_signals_map_map_start
@@ -53,6 +148,17 @@ class ResultsCupManager:
             mp_signals.map.map_end, self._mp_signals_map_map_end
         )
         self.context.signals.listen(sm_signals.base.scores, self._tm_signals_scores)
+        self.context.signals.listen(
+            tm_signals.warmup_start, self._tm_signals_warmup_start
+        )
+        self.context.signals.listen(tm_signals.warmup_end, self._tm_signals_warmup_end)
+        self.context.signals.listen(
+            mp_signals.player.player_connect, self._mp_signals_player_player_connect
+        )
+        self.context.signals.listen(
+            mp_signals.player.player_info_changed,
+            self._mp_signals_player_player_info_changed,
+        )
 
         await self.instance.permission_manager.register(
             "results_cup",
@@ -79,6 +185,15 @@ class ResultsCupManager:
                 perms="cup:results_cup",
                 description="Display saved match history.",
             ),
+            Command(
+                command="backfillresults",
+                aliases=[],
+                namespace=self.app.namespace,
+                target=self._command_backfill_results,
+                admin=True,
+                perms="cup:results_cup",
+                description="Compute the per-map results of saved matches which do not have them yet.",
+            ),
         )
 
         ResultsView.add_button("Export", self._button_export, True)
@@ -97,28 +212,196 @@ class ResultsCupManager:
         if scores:
             await self._handle_player_score_update(scores["players"])
 
+    async def on_stop(self) -> None:
+        if self._pending_flush_task:
+            self._pending_flush_task.cancel()
+            self._pending_flush_task = None
+        for backfill_task in list(self._mx_id_backfill_tasks):
+            backfill_task.cancel()
+        await self.flush_scores()
+
+    async def _setting_write_behind_interval_changed(
+        self, old_value, new_value
+    ) -> None:
+        # The flush loop only runs while scores are held back
+        if new_value > 0:
+            if not self._pending_flush_task:
+                self._pending_flush_task = asyncio.ensure_future(
+                    self._flush_scores_loop()
+                )
+        elif self._pending_flush_task:
+            self._pending_flush_task.cancel()
+            self._pending_flush_task = None
+            await self.flush_scores()
+
+    async def _setting_score_cache_size_changed(self, old_value, new_value) -> None:
+        for score_cache in [
+            self._view_cache_scores,
+            self._view_cache_team_scores,
+            self._view_cache_match_results,
+        ]:
+            score_cache.max_size = new_value
+            score_cache.evict()
+
+    def _get_pinned_matches(self) -> "list[int]":
+        pinned_matches = [self._match_start_time]
+        active = getattr(self.app, "active", None)
+        if active and active.cup_active:
+            pinned_matches.extend(active.match_start_times)
+        return pinned_matches
+
     async def _tm_signals_scores(
         self, players, teams, winner_team, use_teams, winner_player, section, **kwargs
     ):
         if section == "PreEndRound":
             # PreEndRound score callback shows round_points before they are added to match_points. For simplicity I only care about match_points.
             return
-        if use_teams:
-            await self._handle_team_score_update(teams)
-        await self._handle_player_score_update(players)
+        self._ingest_stats.received += 1
+        if not self._is_live():
+            # Warm-up rounds and callbacks outside of a map do not count, skip
+            # them before anything is written, invalidated or notified.
+            self._ingest_stats.skipped_non_live += 1
+            logger.debug("Skipped scores outside of live play in _tm_signals_scores")
+            return
+
+        payload_fingerprint = await self._get_payload_fingerprint(
+            players, teams if use_teams else []
+        )
+        if (
+            payload_fingerprint is not None
+            and payload_fingerprint == self._last_payload_fingerprint
+        ):
+            self._ingest_stats.dropped_duplicate += 1
+            logger.debug("Dropped duplicate scores payload in _tm_signals_scores")
+            return
+        self._last_payload_fingerprint = payload_fingerprint
+        self._ingest_stats.processed += 1
+        scores_changed = await self._handle_score_update(
+            teams if use_teams else [], players
+        )
+        if not scores_changed:
+            logger.debug("No score changes in _tm_signals_scores")
+            return
 
         if self._scores_update_notify_list:
             for score_notify in self._scores_update_notify_list:
-                await score_notify(match_start_time=self._match_start_time)
+                await score_notify(
+                    match_start_time=self._match_start_time,
+                    team_scores=self._last_changed_team_scores,
+                    player_scores=self._last_changed_player_scores,
+                )
         logger.debug("Update TM scores complete in _tm_signals_scores")
 
+    async def _tm_signals_warmup_start(self) -> None:
+        self._warmup_active = True
+
+    async def _tm_signals_warmup_end(self) -> None:
+        self._warmup_active = False
+
+    async def _mp_signals_player_player_connect(self, player, **kwargs):
+        if self._score_extractor:
+            self._score_extractor.forget_player(player.login)
+
+    async def _mp_signals_player_player_info_changed(self, player_login, **kwargs):
+        if self._score_extractor:
+            self._score_extractor.forget_player(player_login)
+
+    async def _get_payload_fingerprint(
+        self, players: list, teams: list
+    ) -> "int | None":
+        if not self._score_extractor:
+            await self._resolve_score_extractor()
+        player_fingerprint = self._score_extractor.fingerprint(players)
+        if player_fingerprint is None:
+            return None
+        try:
+            team_fingerprint = tuple((team["id"], team["map_points"]) for team in teams)
+        except Exception:
+            return None
+        return hash((player_fingerprint, team_fingerprint))
+
+    def _is_live(self) -> bool:
+        return self._match_start_time != 0 and not self._warmup_active
+
     async def _mp_signals_map_map_start(self, time, count, restarted, map, **kwargs):
         await self._handle_map_update("MapStart")
 
     async def _mp_signals_map_map_end(self, map, **kwargs):
         await self._handle_map_update("MapEnd")
 
-    async def _handle_team_score_update(self, team_scores: list):
+    async def _handle_score_update(
+        self, team_scores: list, player_scores: list
+    ) -> bool:
+        """
+        Record the team and player scores of a scores callback. Only the
+        entries which differ from the last ones recorded for the current match
+        are written, all of them in one transaction together with the
+        MatchInfo of the match. Returns False when nothing changed or the
+        transaction failed, in which case nothing is recorded as changed.
+        """
+        if self._match_start_time == 0:
+            return False
+        changed_team_scores = self._get_changed_team_scores(team_scores)
+        changed_player_scores = await self._get_changed_player_scores(player_scores)
+        if not changed_team_scores and not changed_player_scores:
+            return False
+        for new_score in changed_team_scores + changed_player_scores:
+            logger.info(new_score)
+
+        map_start_time = self._match_start_time
+        write_behind = await self._write_behind_enabled()
+        match_info_created = self._match_info_created
+        if not match_info_created or not write_behind:
+            try:
+                async with self.instance.db.objects.atomic():
+                    if not match_info_created:
+                        await self._write_match_info()
+                    if not write_behind:
+                        if changed_team_scores:
+                            await self._write_team_scores(
+                                map_start_time, changed_team_scores
+                            )
+                        if changed_player_scores:
+                            await self._write_player_scores(
+                                map_start_time, changed_player_scores
+                            )
+            except Exception as e:
+                logger.error(
+                    "Exception writing scores to database."
+                    + f" map_start_time: {str(map_start_time)}, teams: {str(len(changed_team_scores))},"
+                    + f" players: {str(len(changed_player_scores))}: {str(e)}"
+                )
+                # Let an identical payload retry the write
+                self._last_payload_fingerprint = None
+                return False
+
+        if not match_info_created:
+            await self._on_match_info_created()
+        if write_behind:
+            for new_score in changed_team_scores:
+                self._pending_team_scores[(map_start_time, new_score.id)] = new_score
+            for new_score in changed_player_scores:
+                self._pending_player_scores[(map_start_time, new_score.login)] = (
+                    new_score
+                )
+        for new_score in changed_team_scores:
+            self._persisted_team_scores[new_score.id] = new_score
+        for new_score in changed_player_scores:
+            self._persisted_player_scores[new_score.login] = new_score
+
+        self._last_changed_team_scores = changed_team_scores
+        self._last_changed_player_scores = changed_player_scores
+
+        if changed_team_scores:
+            await self._invalidate_view_cache_team_scores(map_start_time)
+        if changed_player_scores:
+            await self._invalidate_view_cache_scores(map_start_time)
+        return True
+
+    async def _handle_player_score_update(self, player_scores: list) -> bool:
+        return await self._handle_score_update([], player_scores)
+
+    def _get_changed_team_scores(self, team_scores: list) -> "list[GenericTeamScore]":
         new_scores = []
         for team_score in team_scores:
             try:
@@ -135,295 +418,355 @@ class ResultsCupManager:
                 )
                 logger.error(str(e))
 
-        if new_scores:
-            for new_score in new_scores:
-                logger.info(new_score)
-                if self._match_start_time != 0:
-                    await self._create_match_info()
-
-                    if new_score.id in self._match_teams_scored:
-                        await TeamScore.execute(
-                            TeamScore.update(
-                                name=new_score.name,
-                                score=new_score.score,
-                            ).where(
-                                (TeamScore.team_id == new_score.id)
-                                & (TeamScore.map_start_time == self._match_start_time)
-                            )
-                        )
-                    else:
-                        self._match_teams_scored.append(new_score.id)
-                        await TeamScore.execute(
-                            TeamScore.insert(
-                                map_start_time=self._match_start_time,
-                                team_id=new_score.id,
-                                name=new_score.name,
-                                score=new_score.score,
-                            )
-                        )
-                    await self._invalidate_view_cache_team_scores(
-                        self._match_start_time
-                    )
+        return [
+            new_score
+            for new_score in new_scores
+            if self._persisted_team_scores.get(new_score.id) != new_score
+        ]
 
-    async def _handle_player_score_update(self, player_scores: list):
-        current_script_lower = (
-            await self.instance.mode_manager.get_current_script()
-        ).lower()
-        new_scores = []
-        for player_score in player_scores:
-            try:
-                new_score_login = (
-                    player_score["login"]
-                    if "login" in player_score
-                    else player_score["player"].login
-                )
-                new_score_nick = (
-                    player_score["name"]
-                    if "name" in player_score
-                    else player_score["player"].nickname
-                )
+    async def _get_changed_player_scores(
+        self, player_scores: list
+    ) -> "list[GenericPlayerScore]":
+        if not self._score_extractor:
+            await self._resolve_score_extractor()
+        return [
+            new_score
+            for new_score in self._score_extractor.extract_scores(player_scores)
+            if self._persisted_player_scores.get(new_score.login) != new_score
+        ]
 
-                new_score_country = "World"
-                try:
-                    if (
-                        "player" in player_score
-                        and player_score["player"].flow.zone.country != None
-                    ):
-                        new_score_country = player_score["player"].flow.zone.country
-                    else:
-                        logger.warning(
-                            'player.flow.zone.country was None for login "'
-                            + new_score_login
-                            + '" nickname "'
-                            + new_score_nick
-                            + '". Defaulting to '
-                            + str(new_score_country)
-                        )
-                except Exception as e:
-                    logger.error(
-                        'Exception while accessing country for login "'
-                        + new_score_login
-                        + '", nickname "'
-                        + new_score_nick
-                        + '": '
-                        + str(e)
-                    )
+    def _get_mx_api(self):
+        if "mx" in self.app.instance.apps.apps:
+            return self.app.instance.apps.apps["mx"].api
+        return None
 
-                new_score_team = -1
-                try:
-                    if (
-                        "player" in player_score
-                        and player_score["player"].flow.team_id != None
-                    ):
-                        new_score_team = player_score["player"].flow.team_id
-                    else:
-                        logger.warning(
-                            'player.flow.team_id was None for login "'
-                            + new_score_login
-                            + '" nickname "'
-                            + new_score_nick
-                            + '". Defaulting to '
-                            + str(new_score_team)
-                        )
-                except Exception as e:
-                    logger.error(
-                        'Exception while accessing team_id for login "'
-                        + new_score_login
-                        + '", nickname "'
-                        + new_score_nick
-                        + '": '
-                        + str(e)
-                    )
+    async def _resolve_score_extractor(self) -> None:
+        self._match_mode_script = await self.instance.mode_manager.get_current_script()
+        self._score_extractor = get_score_extractor(self._match_mode_script)
 
-                if "timeattack" in current_script_lower:
-                    new_score_score = (
-                        player_score["best_race_time"]
-                        if "best_race_time" in player_score
-                        else player_score["bestracetime"]
-                    )
-                    if new_score_score != -1:
-                        new_scores.append(
-                            GenericPlayerScore(
-                                new_score_login,
-                                new_score_nick,
-                                new_score_country,
-                                new_score_score,
-                                score2=0,
-                                team=new_score_team,
-                            )
-                        )
+    async def _write_behind_enabled(self) -> bool:
+        return await self.setting_write_behind_interval.get_value() > 0
 
-                elif "laps" in current_script_lower:
-                    new_score_score = (
-                        player_score["best_race_time"]
-                        if "best_race_time" in player_score
-                        else player_score["bestracetime"]
-                    )
-                    new_score_score2 = (
-                        len(player_score["best_race_checkpoints"])
-                        if "best_race_checkpoints" in player_score
-                        else len(player_score["bestracecheckpoints"])
-                    )
-                    if new_score_score != -1:
-                        new_scores.append(
-                            GenericPlayerScore(
-                                new_score_login,
-                                new_score_nick,
-                                new_score_country,
-                                new_score_score,
-                                score2=new_score_score2,
-                                team=new_score_team,
-                            )
-                        )
+    async def _flush_scores_loop(self) -> None:
+        while True:
+            await asyncio.sleep(
+                max(await self.setting_write_behind_interval.get_value(), 1)
+            )
+            try:
+                await self.flush_scores()
+            except Exception as e:
+                logger.error(f"Exception while flushing pending scores: {str(e)}")
+
+    async def flush_scores(self) -> None:
+        """
+        Write all scores held back by the write-behind mode to the database.
+        Only the latest score of each player and team is written, snapshots
+        that were replaced in the meantime never reach the database.
+        """
+        async with self._pending_flush_lock:
+            # Work on a snapshot, entries only leave the buffer once they are
+            # written so that reads never miss a score during the flush.
+            pending_team_scores = dict(self._pending_team_scores)
+            pending_player_scores = dict(self._pending_player_scores)
+
+            team_scores_by_match = {}  # type: dict[int, list[GenericTeamScore]]
+            for (map_start_time, team_id), team_score in pending_team_scores.items():
+                team_scores_by_match.setdefault(map_start_time, []).append(team_score)
+            for map_start_time, team_scores in team_scores_by_match.items():
+                if await self._save_team_scores(map_start_time, team_scores):
+                    for team_score in team_scores:
+                        key = (map_start_time, team_score.id)
+                        if self._pending_team_scores.get(key) is team_score:
+                            del self._pending_team_scores[key]
+
+            player_scores_by_match = {}  # type: dict[int, list[GenericPlayerScore]]
+            for (map_start_time, login), player_score in pending_player_scores.items():
+                player_scores_by_match.setdefault(map_start_time, []).append(
+                    player_score
+                )
+            for map_start_time, player_scores in player_scores_by_match.items():
+                if await self._save_player_scores(map_start_time, player_scores):
+                    for player_score in player_scores:
+                        key = (map_start_time, player_score.login)
+                        if self._pending_player_scores.get(key) is player_score:
+                            del self._pending_player_scores[key]
+
+    async def _save_team_scores(
+        self, map_start_time: int, new_scores: "list[GenericTeamScore]"
+    ) -> bool:
+        """
+        Upsert team scores in their own transaction. Returns False if the
+        scores could not be written.
+        """
+        try:
+            async with self.instance.db.objects.atomic():
+                await self._write_team_scores(map_start_time, new_scores)
+        except Exception as e:
+            logger.error(
+                "Exception writing TeamScore to database."
+                + f" map_start_time: {str(map_start_time)}: {str(e)}"
+            )
+            return False
+        return True
 
-                else:
-                    new_score_score = (
-                        player_score["map_points"]
-                        if "map_points" in player_score
-                        else player_score["mappoints"]
-                    )
-                    if new_score_score != -1:
-                        new_scores.append(
-                            GenericPlayerScore(
-                                new_score_login,
-                                new_score_nick,
-                                new_score_country,
-                                new_score_score,
-                                score2=0,
-                                team=new_score_team,
-                            )
-                        )
+    async def _write_team_scores(
+        self, map_start_time: int, new_scores: "list[GenericTeamScore]"
+    ) -> None:
+        """
+        Upsert the team scores of one match, must be called inside a
+        transaction. Rows which already exist for the match are found through
+        the unique (map_start_time, team_id) index.
+        """
+        scores_by_id = {}  # type: dict[int, GenericTeamScore]
+        for new_score in new_scores:
+            scores_by_id[new_score.id] = new_score
+
+        existing_ids = set(
+            row.team_id
+            for row in await TeamScore.execute(
+                TeamScore.select(TeamScore.team_id).where(
+                    (TeamScore.map_start_time == map_start_time)
+                    & (TeamScore.team_id.in_(list(scores_by_id.keys())))
+                )
+            )
+        )
+        update_scores = [s for s in scores_by_id.values() if s.id in existing_ids]
+        insert_scores = [s for s in scores_by_id.values() if s.id not in existing_ids]
+        if update_scores:
+            await TeamScore.execute(
+                TeamScore.update(
+                    name=case(
+                        TeamScore.team_id,
+                        [(s.id, s.name) for s in update_scores],
+                    ),
+                    score=case(
+                        TeamScore.team_id,
+                        [(s.id, s.score) for s in update_scores],
+                    ),
+                ).where(
+                    (TeamScore.map_start_time == map_start_time)
+                    & (TeamScore.team_id.in_([s.id for s in update_scores]))
+                )
+            )
+        if insert_scores:
+            await TeamScore.execute(
+                TeamScore.insert_many(
+                    [
+                        {
+                            "map_start_time": map_start_time,
+                            "team_id": new_score.id,
+                            "name": new_score.name,
+                            "score": new_score.score,
+                        }
+                        for new_score in insert_scores
+                    ]
+                )
+            )
 
-            except Exception as e:
-                logger.error(
-                    f"Exception while recording scores for following player_score object: {str(player_score)}"
+    async def _save_player_scores(
+        self, map_start_time: int, new_scores: "list[GenericPlayerScore]"
+    ) -> bool:
+        """
+        Upsert player scores in their own transaction. Returns False if the
+        scores could not be written.
+        """
+        try:
+            async with self.instance.db.objects.atomic():
+                await self._write_player_scores(map_start_time, new_scores)
+        except Exception as e:
+            logger.error(
+                "Exception writing PlayerScore to database."
+                + f" map_start_time: {str(map_start_time)}, scores: {str(len(new_scores))}: {str(e)}"
+            )
+            return False
+        return True
+
+    async def _write_player_scores(
+        self, map_start_time: int, new_scores: "list[GenericPlayerScore]"
+    ) -> None:
+        """
+        Upsert the player scores of one match, must be called inside a
+        transaction. The logins which already have a row for the match are
+        looked up through the unique (map_start_time, login) index, then they are updated with one
+        CASE based UPDATE and the remaining logins are added with one
+        multi-row INSERT. The number of statements does not grow with the
+        number of players and no in-memory state is needed to avoid duplicates.
+        """
+        scores_by_login = {}  # type: dict[str, GenericPlayerScore]
+        for new_score in new_scores:
+            scores_by_login[new_score.login] = new_score
+        logins = list(scores_by_login.keys())
+
+        existing_logins = set(
+            row.login
+            for row in await PlayerScore.execute(
+                PlayerScore.select(PlayerScore.login).where(
+                    (PlayerScore.map_start_time == map_start_time)
+                    & (PlayerScore.login.in_(logins))
                 )
-                logger.error(str(e))
+            )
+        )
+        update_scores = [
+            s for s in scores_by_login.values() if s.login in existing_logins
+        ]
+        insert_scores = [
+            s for s in scores_by_login.values() if s.login not in existing_logins
+        ]
 
-        if new_scores:
-            for new_score in new_scores:
-                logger.info(new_score)
-                if self._match_start_time != 0:
-                    await self._create_match_info()
-
-                    try:
-                        if new_score.login in self._match_players_scored:
-                            logger.debug("Entry exists, updating score")
-                            await PlayerScore.execute(
-                                PlayerScore.update(
-                                    nickname=new_score.nickname,
-                                    country=new_score.country,
-                                    score=new_score.score,
-                                    score2=new_score.score2,
-                                    team=new_score.team,
-                                ).where(
-                                    (PlayerScore.login == new_score.login)
-                                    & (
-                                        PlayerScore.map_start_time
-                                        == self._match_start_time
-                                    )
-                                )
-                            )
-                        else:
-                            logger.debug("No entry exists, creating score")
-                            self._match_players_scored.append(new_score.login)
-                            await PlayerScore.execute(
-                                PlayerScore.insert(
-                                    map_start_time=self._match_start_time,
-                                    login=new_score.login,
-                                    nickname=new_score.nickname,
-                                    country=new_score.country,
-                                    score=new_score.score,
-                                    score2=new_score.score2,
-                                    team=new_score.team,
-                                )
-                            )
-                    except Exception as e:
-                        logger.error(
-                            "Exception writing PlayerScore to database."
-                            + f" map_start_time: {str(self._match_start_time)}, login: {str(new_score.login)},"
-                            + f" nickname: {str(new_score.nickname)}, country: {str(new_score.country)}, score: {str(new_score.score)},"
-                            + f" score2: {str(new_score.score2)}, team: {str(new_score.team)}"
-                        )
-                    await self._invalidate_view_cache_scores(self._match_start_time)
+        for batch_start in range(0, len(update_scores), SCORE_WRITE_BATCH_SIZE):
+            await PlayerScore.execute(
+                self._player_scores_update_query(
+                    map_start_time,
+                    update_scores[batch_start : batch_start + SCORE_WRITE_BATCH_SIZE],
+                )
+            )
+        for batch_start in range(0, len(insert_scores), SCORE_WRITE_BATCH_SIZE):
+            await PlayerScore.execute(
+                PlayerScore.insert_many(
+                    [
+                        {
+                            "map_start_time": map_start_time,
+                            "login": new_score.login,
+                            "nickname": new_score.nickname,
+                            "country": new_score.country,
+                            "score": new_score.score,
+                            "score2": new_score.score2,
+                            "team": new_score.team,
+                        }
+                        for new_score in insert_scores[
+                            batch_start : batch_start + SCORE_WRITE_BATCH_SIZE
+                        ]
+                    ]
+                )
+            )
+
+    @staticmethod
+    def _player_scores_update_query(
+        map_start_time: int, update_scores: "list[GenericPlayerScore]"
+    ):
+        logins = [update_score.login for update_score in update_scores]
+        return PlayerScore.update(
+            nickname=case(
+                PlayerScore.login, [(s.login, s.nickname) for s in update_scores]
+            ),
+            country=case(
+                PlayerScore.login, [(s.login, s.country) for s in update_scores]
+            ),
+            score=case(PlayerScore.login, [(s.login, s.score) for s in update_scores]),
+            score2=case(
+                PlayerScore.login, [(s.login, s.score2) for s in update_scores]
+            ),
+            team=case(PlayerScore.login, [(s.login, s.team) for s in update_scores]),
+        ).where(
+            (PlayerScore.map_start_time == map_start_time)
+            & (PlayerScore.login.in_(logins))
+        )
 
-    async def _create_match_info(self) -> None:
-        if not self._match_info_created:
-            logger.debug("Current match data does not exist, creating")
-            self._match_info_created = True
+    async def _write_match_info(self) -> None:
+        """
+        Insert the MatchInfo of the current match, must be called inside a
+        transaction. Only an already cached mx_id is used here, unknown maps
+        are looked up in the background once the transaction is committed so
+        the (T)MX API never delays score ingestion.
+        """
+        logger.debug("Current match data does not exist, creating")
+        current_map = self.instance.map_manager.current_map
+        self._match_mx_id = await self._mx_id_resolver.get_cached(current_map.uid)
+        try:
+            await MatchInfo.execute(
+                MatchInfo.insert(
+                    map_start_time=self._match_start_time,
+                    mode_script=self._match_mode_script,
+                    map_name=self._match_map_name,
+                    map_uid=current_map.uid,
+                    mx_id=self._match_mx_id or "",
+                    medal_author=current_map.time_author,
+                    medal_gold=current_map.time_gold,
+                    medal_silver=current_map.time_silver,
+                    medal_bronze=current_map.time_bronze,
+                )
+            )
+        except Exception:
+            logger.error(
+                "Exception while attempting to write map information to database."
+                + f" map_start_time: {str(self._match_start_time)}, mode_script: {str(self._match_mode_script)},"
+                + f" map_name: {str(self._match_map_name)}, map_uid: {str(current_map.uid)}, mx_id: {str(self._match_mx_id)},"
+                + f" medal_author: {str(current_map.time_author)},"
+                + f" medal_gold: {str(current_map.time_gold)},"
+                + f" medal_silver: {str(current_map.time_silver)},"
+                + f" medal_bronze: {str(current_map.time_bronze)}"
+            )
+            raise
+
+    async def _on_match_info_created(self) -> None:
+        self._match_info_created = True
+        await self._invalidate_view_cache_matches(self._match_start_time)
+        if self._view_cache_match_count is not None:
+            self._view_cache_match_count += 1
+        if self._match_mx_id is None:
+            self._backfill_mx_id(
+                self._match_start_time, self.instance.map_manager.current_map.uid
+            )
 
-            current_mode_script = await self.instance.mode_manager.get_current_script()
-            current_map_uid = self.instance.map_manager.current_map.uid
-            current_mx_id = ""
-            if "mx" in self.app.instance.apps.apps:
+    def _backfill_mx_id(self, map_start_time: int, map_uid: str) -> None:
+        async def backfill() -> None:
+            mx_id = await self._mx_id_resolver.resolve(map_uid)
+            if mx_id:
                 try:
-                    mx_info = await self.app.instance.apps.apps["mx"].api.map_info(
-                        current_map_uid
+                    await MatchInfo.execute(
+                        MatchInfo.update(mx_id=mx_id).where(
+                            MatchInfo.map_start_time == map_start_time
+                        )
                     )
-                    if mx_info and len(mx_info) >= 1:
-                        current_mx_id = str(mx_info[0][0])
                 except Exception as e:
                     logger.error(
-                        f"Could not retrieve the map info from (T)MX API for the current map: {str(e)}"
+                        f"Exception while writing mx_id {mx_id} for map_start_time {str(map_start_time)}: {str(e)}"
                     )
+                await self._invalidate_view_cache_matches(map_start_time)
 
-            try:
-                await MatchInfo.execute(
-                    MatchInfo.insert(
-                        map_start_time=self._match_start_time,
-                        mode_script=current_mode_script,
-                        map_name=self._match_map_name,
-                        map_uid=current_map_uid,
-                        mx_id=current_mx_id,
-                        medal_author=self.instance.map_manager.current_map.time_author,
-                        medal_gold=self.instance.map_manager.current_map.time_gold,
-                        medal_silver=self.instance.map_manager.current_map.time_silver,
-                        medal_bronze=self.instance.map_manager.current_map.time_bronze,
-                    )
-                )
-            except Exception as e:
-                logger.error(
-                    "Exception while attempting to write map information to database."
-                    + f" map_start_time: {str(self._match_start_time)}, mode_script: {str(current_mode_script)},"
-                    + f" map_name: {str(self._match_map_name)}, map_uid: {str(current_map_uid)}, mx_id: {str(current_mx_id)},"
-                    + f" medal_author: {str(self.instance.map_manager.current_map.time_author)},"
-                    + f" medal_gold: {str(self.instance.map_manager.current_map.time_gold)},"
-                    + f" medal_silver: {str(self.instance.map_manager.current_map.time_silver)},"
-                    + f" medal_bronze: {str(self.instance.map_manager.current_map.time_bronze)}"
-                )
-            await self._invalidate_view_cache_matches()
+        backfill_task = asyncio.ensure_future(backfill())
+        self._mx_id_backfill_tasks.add(backfill_task)
+        backfill_task.add_done_callback(self._mx_id_backfill_tasks.discard)
 
     async def _handle_map_update(self, section: str):
         if section == "OnStart" or section == "MapStart":
             self._match_start_time = int(datetime.now().timestamp())
             self._match_map_name = self.instance.map_manager.current_map.name
-            self._match_players_scored = []
-            self._match_teams_scored = []
             self._match_info_created = False
+            self._warmup_active = False
+            self._last_payload_fingerprint = None
+            await self._resolve_score_extractor()
+            self._persisted_player_scores = {}
+            self._persisted_team_scores = {}
             if self._match_start_notify_list:
                 for notify_method in self._match_start_notify_list:
                     await notify_method(match_start_time=self._match_start_time)
 
         elif section == "MapEnd":
+            await self.flush_scores()
+            logger.debug(self._ingest_stats)
+            logger.debug(f"Player score cache: {self._view_cache_scores}")
+            logger.debug(f"Team score cache: {self._view_cache_team_scores}")
             ended_map_start_time = self._match_start_time
             ended_map_map_name = self._match_map_name
             self._match_start_time = 0
             self._match_map_name = None
-            self._match_players_scored = []
-            self._match_teams_scored = []
             self._match_info_created = False
-
-            match_data = await self.get_data_matches()
-            for match in match_data:
-                if match.map_start_time == ended_map_start_time:
-                    score_data = await self.get_data_scores(
-                        match.map_start_time,
-                        get_sorting_from_mode(str(match.mode_script)),
-                    )
-                    await self.instance.chat(
-                        f"$ff0Saved $<$fff{str(len(score_data))}$> record(s) from map $<$fff{ended_map_map_name}$>"
-                    )
-                    break
+            self._persisted_player_scores = {}
+            self._persisted_team_scores = {}
+
+            match = await self.get_data_match(ended_map_start_time)
+            if match:
+                score_sorting = get_sorting_from_mode(str(match.mode_script))
+                score_data = await self.get_data_scores(
+                    match.map_start_time, score_sorting
+                )
+                await self._save_match_results(
+                    match.map_start_time, score_sorting, score_data
+                )
+                await self.instance.chat(
+                    f"$ff0Saved $<$fff{str(len(score_data))}$> record(s) from map $<$fff{ended_map_map_name}$>"
+                )
             else:
                 await self.instance.chat(
                     f"$ff0No records saved from map $<$fff{ended_map_map_name}$>"
@@ -437,18 +780,37 @@ class ResultsCupManager:
     async def _command_matches(self, player, data, **kwargs):
         await self.open_view_match_history(player)
 
-    async def _invalidate_view_cache_matches(self):
-        self._view_cache_matches = []
+    async def _command_backfill_results(self, player, data, **kwargs):
+        await self.instance.chat("$ff0Computing the results of saved matches", player)
+        backfilled = await self.backfill_match_results()
+        await self.instance.chat(
+            f"$ff0Saved the results of $<$fff{str(backfilled)}$> match(es)", player
+        )
+
+    async def _invalidate_view_cache_matches(self, map_start_time: int = 0):
+        self._standings_cache.invalidate(map_start_time)
+        if map_start_time == 0:
+            self._view_cache_matches = {}
+            self._view_cache_match_times = []
+            self._view_cache_matches_list = None
+            self._view_cache_matches_loaded = False
+            self._view_cache_matches_stale = set()
+            self._view_cache_match_count = None
+        else:
+            # Only this match is read again on the next access
+            self._view_cache_matches_stale.add(map_start_time)
 
     async def _invalidate_view_cache_scores(self, map_start_time: int = 0):
+        self._standings_cache.invalidate(map_start_time)
         if map_start_time == 0:
-            self._view_cache_scores = {}
+            self._view_cache_scores.clear()
         elif map_start_time in self._view_cache_scores:
             del self._view_cache_scores[map_start_time]
 
     async def _invalidate_view_cache_team_scores(self, map_start_time: int = 0):
+        self._standings_cache.invalidate(map_start_time)
         if map_start_time == 0:
-            self._view_cache_team_scores = {}
+            self._view_cache_team_scores.clear()
         elif map_start_time in self._view_cache_team_scores:
             del self._view_cache_team_scores[map_start_time]
 
@@ -458,17 +820,9 @@ class ResultsCupManager:
                 view.scores_query, view.scores_sorting
             )
 
-            match_info = []  # type: list[MatchInfo]
-            all_match_data = await self.get_data_matches()
-            for match_data_info in all_match_data:
-                if (
-                    isinstance(view.scores_query, int)
-                    and match_data_info.map_start_time == view.scores_query
-                ) or (
-                    isinstance(view.scores_query, list)
-                    and match_data_info.map_start_time in view.scores_query
-                ):
-                    match_info.append(match_data_info)
+            match_info = await self.get_data_specific_matches(
+                view.scores_query
+            )  # type: list[MatchInfo]
 
             text_view = TextResultsView(
                 self.app, player, scores_data, match_info, view.scores_sorting
@@ -498,7 +852,7 @@ class ResultsCupManager:
             self._scores_update_notify_list.append(notify_method)
 
     async def open_view_match_history(self, player) -> None:
-        if await self.get_data_matches():
+        if await self.get_data_match_count():
             view = MatchHistoryView(self.app, player)
             await view.display(player=player.login)
         else:
@@ -521,19 +875,139 @@ class ResultsCupManager:
         view = ScoreModeView(self.app, scoremode_selected)
         await view.display(player=player)
 
+    async def get_ingest_stats(self) -> ScoreIngestStats:
+        return self._ingest_stats
+
+    async def get_score_cache_stats(self) -> "dict[str, LRUCache]":
+        return {
+            "player_scores": self._view_cache_scores,
+            "team_scores": self._view_cache_team_scores,
+            "match_results": self._view_cache_match_results,
+            "standings": self._standings_cache.entries,
+        }
+
     async def get_current_match_start_time(self) -> int:
         return self._match_start_time
 
+    async def _load_matches(self) -> None:
+        """
+        Fill the match cache, indexed by map_start_time with the keys kept in
+        ascending order. After the first load only matches which were
+        invalidated individually are read again.
+        """
+        if not self._view_cache_matches_loaded:
+            self._view_cache_matches_stale = set()
+            map_history_query = await MatchInfo.execute(MatchInfo.select())
+            self._view_cache_matches = {
+                match.map_start_time: match for match in map_history_query
+            }
+            self._view_cache_match_times = sorted(self._view_cache_matches.keys())
+            self._view_cache_matches_list = None
+            self._view_cache_matches_loaded = True
+        elif self._view_cache_matches_stale:
+            stale_matches = list(self._view_cache_matches_stale)
+            self._view_cache_matches_stale = set()
+            for match in await MatchInfo.execute(
+                MatchInfo.select().where(MatchInfo.map_start_time.in_(stale_matches))
+            ):
+                if match.map_start_time not in self._view_cache_matches:
+                    bisect.insort(self._view_cache_match_times, match.map_start_time)
+                self._view_cache_matches[match.map_start_time] = match
+            self._view_cache_matches_list = None
+
     async def get_data_matches(self) -> "list[MatchInfo]":
-        if not self._view_cache_matches:
-            map_history_query = await MatchInfo.execute(
-                MatchInfo.select().order_by(MatchInfo.map_start_time.desc())
+        """
+        All matches, most recent first
+        """
+        await self._load_matches()
+        if self._view_cache_matches_list is None:
+            self._view_cache_matches_list = [
+                self._view_cache_matches[map_start_time]
+                for map_start_time in reversed(self._view_cache_match_times)
+            ]
+        return self._view_cache_matches_list
+
+    async def get_data_match_count(self) -> int:
+        """
+        Number of matches, from the match cache when it is loaded and from a
+        cached COUNT(*) otherwise
+        """
+        if self._view_cache_matches_loaded:
+            await self._load_matches()
+            return len(self._view_cache_match_times)
+        if self._view_cache_match_count is None:
+            count_query = await MatchInfo.execute(
+                MatchInfo.select(fn.COUNT(MatchInfo.id).alias("match_count")).dicts()
+            )
+            self._view_cache_match_count = int(list(count_query)[0]["match_count"])
+        return self._view_cache_match_count
+
+    async def get_data_match_page(
+        self,
+        limit: int,
+        before: "int | None" = None,
+        after: "int | None" = None,
+        offset: int = 0,
+    ) -> "list[MatchInfo]":
+        """
+        One page of matches, most recent first. The page is the limit matches
+        started before the map_start_time before, or the limit matches started
+        after the map_start_time after. Without a key the page starts offset
+        matches from the most recent one, or ends at the oldest match when
+        after is 0.
+
+        Only the page is read from the database unless the match cache is
+        already loaded.
+        """
+        if self._view_cache_matches_loaded:
+            await self._load_matches()
+            match_times = self._view_cache_match_times
+            if after is not None:
+                start = bisect.bisect_right(match_times, after)
+                page_times = match_times[start : start + limit]
+            else:
+                end = (
+                    bisect.bisect_left(match_times, before)
+                    if before is not None
+                    else len(match_times) - offset
+                )
+                page_times = match_times[max(0, end - limit) : max(0, end)]
+            return [
+                self._view_cache_matches[map_start_time]
+                for map_start_time in reversed(page_times)
+            ]
+
+        if after is not None:
+            page_query = await MatchInfo.execute(
+                MatchInfo.select()
+                .where(MatchInfo.map_start_time > after)
+                .order_by(MatchInfo.map_start_time.asc())
+                .limit(limit)
+            )
+            return list(reversed(list(page_query)))
+        page_query = MatchInfo.select()
+        if before is not None:
+            page_query = page_query.where(MatchInfo.map_start_time < before)
+        elif offset:
+            page_query = page_query.offset(offset)
+        return list(
+            await MatchInfo.execute(
+                page_query.order_by(MatchInfo.map_start_time.desc()).limit(limit)
             )
-            if len(map_history_query) > 0:
-                self._view_cache_matches = list(
-                    map_history_query
-                )  # type: list[MatchInfo]
-        return self._view_cache_matches
+        )
+
+    async def get_data_match(self, map_start_time: int) -> "MatchInfo | None":
+        """
+        One match, from the match cache when it is loaded and from a single
+        row query otherwise
+        """
+        if self._view_cache_matches_loaded:
+            await self._load_matches()
+            return self._view_cache_matches.get(map_start_time)
+        match_query = await MatchInfo.execute(
+            MatchInfo.select().where(MatchInfo.map_start_time == map_start_time)
+        )
+        return next(iter(match_query), None)
 
     async def get_data_specific_matches(
         self, matches: "int | list[int]"
@@ -548,61 +1022,176 @@ class ResultsCupManager:
                 f"Unexpected type in get_data_specific_matches: {str(matches)}"
             )
 
-        all_matches = await self.get_data_matches()
+        await self._load_matches()
         return [
-            match for match in all_matches if match.map_start_time in lookup_matches
+            self._view_cache_matches[map_start_time]
+            for map_start_time in sorted(set(lookup_matches), reverse=True)
+            if map_start_time in self._view_cache_matches
         ]
 
     async def get_data_player_scores(self, map_start_time: int) -> "list[PlayerScore]":
-        if not (
-            map_start_time in self._view_cache_scores
-            and self._view_cache_scores[map_start_time]
-        ):
+        player_scores = self._view_cache_scores.get(map_start_time)
+        if player_scores is None:
             scores_query = await PlayerScore.execute(
                 PlayerScore.select().where(
                     PlayerScore.map_start_time.in_([map_start_time])
                 )
             )
-            if len(scores_query) > 0:
-                self._view_cache_scores[map_start_time] = list(scores_query)
-            else:
-                self._view_cache_scores[map_start_time] = []
-        return self._view_cache_scores[map_start_time]
+            player_scores = self._merge_pending_player_scores(
+                map_start_time, list(scores_query)
+            )
+            self._view_cache_scores[map_start_time] = player_scores
+        return player_scores
+
+    def _merge_pending_player_scores(
+        self, map_start_time: int, player_scores: "list[PlayerScore]"
+    ) -> "list[PlayerScore]":
+        pending_scores = {
+            login: pending_score
+            for (
+                start_time,
+                login,
+            ), pending_score in self._pending_player_scores.items()
+            if start_time == map_start_time
+        }  # type: dict[str, GenericPlayerScore]
+        if not pending_scores:
+            return player_scores
+        merged_scores = [
+            player_score
+            for player_score in player_scores
+            if player_score.login not in pending_scores
+        ]
+        for pending_score in pending_scores.values():
+            merged_scores.append(
+                PlayerScore(
+                    map_start_time=map_start_time,
+                    login=pending_score.login,
+                    nickname=pending_score.nickname,
+                    country=pending_score.country,
+                    score=pending_score.score,
+                    score2=pending_score.score2,
+                    team=pending_score.team,
+                )
+            )
+        return merged_scores
 
     async def get_data_team_scores(self, map_start_time: int) -> "list[TeamScore]":
-        if not (
-            map_start_time in self._view_cache_team_scores
-            and self._view_cache_team_scores[map_start_time]
-        ):
+        team_scores = self._view_cache_team_scores.get(map_start_time)
+        if team_scores is None:
             scores_query = await TeamScore.execute(
                 TeamScore.select().where(TeamScore.map_start_time.in_([map_start_time]))
             )
-            if len(scores_query) > 0:
-                self._view_cache_team_scores[map_start_time] = list(scores_query)
-            else:
-                self._view_cache_team_scores[map_start_time] = []
-        return self._view_cache_team_scores[map_start_time]
+            team_scores = self._merge_pending_team_scores(
+                map_start_time, list(scores_query)
+            )
+            self._view_cache_team_scores[map_start_time] = team_scores
+        return team_scores
+
+    def _merge_pending_team_scores(
+        self, map_start_time: int, team_scores: "list[TeamScore]"
+    ) -> "list[TeamScore]":
+        pending_scores = {
+            team_id: pending_score
+            for (
+                start_time,
+                team_id,
+            ), pending_score in self._pending_team_scores.items()
+            if start_time == map_start_time
+        }  # type: dict[int, GenericTeamScore]
+        if not pending_scores:
+            return team_scores
+        merged_scores = [
+            team_score
+            for team_score in team_scores
+            if team_score.team_id not in pending_scores
+        ]
+        for pending_score in pending_scores.values():
+            merged_scores.append(
+                TeamScore(
+                    map_start_time=map_start_time,
+                    team_id=pending_score.id,
+                    name=pending_score.name,
+                    score=pending_score.score,
+                )
+            )
+        return merged_scores
+
+    async def _load_scores(
+        self, map_start_times: "list[int]"
+    ) -> "tuple[dict[int, list[TeamScore]], dict[int, list[PlayerScore]]]":
+        """
+        Returns the team and player scores of all given matches. Matches which
+        are not cached yet are read with one IN query per table and
+        SCORE_READ_BATCH_SIZE matches, grouped in memory and added to the
+        caches.
+        """
+        team_scores = {}  # type: dict[int, list[TeamScore]]
+        missing_team_scores = []  # type: list[int]
+        for start_time in map_start_times:
+            team_scores[start_time] = self._view_cache_team_scores.get(start_time)
+            if team_scores[start_time] is None:
+                missing_team_scores.append(start_time)
+        for batch_start in range(0, len(missing_team_scores), SCORE_READ_BATCH_SIZE):
+            batch = missing_team_scores[
+                batch_start : batch_start + SCORE_READ_BATCH_SIZE
+            ]
+            for start_time in batch:
+                team_scores[start_time] = []
+            for team_score in await TeamScore.execute(
+                TeamScore.select()
+                .where(TeamScore.map_start_time.in_(batch))
+                .order_by(TeamScore.id)
+            ):
+                team_scores[team_score.map_start_time].append(team_score)
+            for start_time in batch:
+                team_scores[start_time] = self._merge_pending_team_scores(
+                    start_time, team_scores[start_time]
+                )
+                self._view_cache_team_scores[start_time] = team_scores[start_time]
+
+        player_scores = {}  # type: dict[int, list[PlayerScore]]
+        missing_player_scores = []  # type: list[int]
+        for start_time in map_start_times:
+            player_scores[start_time] = self._view_cache_scores.get(start_time)
+            if player_scores[start_time] is None:
+                missing_player_scores.append(start_time)
+        for batch_start in range(0, len(missing_player_scores), SCORE_READ_BATCH_SIZE):
+            batch = missing_player_scores[
+                batch_start : batch_start + SCORE_READ_BATCH_SIZE
+            ]
+            for start_time in batch:
+                player_scores[start_time] = []
+            for player_score in await PlayerScore.execute(
+                PlayerScore.select()
+                .where(PlayerScore.map_start_time.in_(batch))
+                .order_by(PlayerScore.id)
+            ):
+                player_scores[player_score.map_start_time].append(player_score)
+            for start_time in batch:
+                player_scores[start_time] = self._merge_pending_player_scores(
+                    start_time, player_scores[start_time]
+                )
+                self._view_cache_scores[start_time] = player_scores[start_time]
 
-    async def get_data_scores(
-        self, map_start_time: "int | list[int]", sorting: ScoreModeBase
-    ) -> "list[TeamPlayerScore]":
-        lookup_matches = []
-        if isinstance(map_start_time, int):
-            lookup_matches.append(map_start_time)
-        elif isinstance(map_start_time, list):
-            lookup_matches = map_start_time
-        else:
-            logger.error("Unexpected type in get_data_scores: " + str(map_start_time))
-        lookup_matches.sort()
+        return team_scores, player_scores
+
+    async def get_data_team_player_scores(
+        self, map_start_times: "list[int]"
+    ) -> "list[list[TeamPlayerScore]]":
+        """
+        Returns the scores of each match with the score and name of the
+        player's team filled in, in the order of map_start_times.
+        """
+        all_team_scores, all_player_scores = await self._load_scores(map_start_times)
 
         matches_scores = []  # type: list[list[TeamPlayerScore]]
-        for start_time in lookup_matches:
-            team_scores = await self.get_data_team_scores(start_time)
+        for start_time in map_start_times:
+            team_scores = all_team_scores[start_time]
             team_lookup = {}  # type: dict[int, TeamScore]
             for team_score in team_scores:
                 team_lookup[team_score.team_id] = team_score
 
-            player_scores = await self.get_data_player_scores(start_time)
+            player_scores = all_player_scores[start_time]
             team_player_scores = []  # type: list[TeamPlayerScore]
             for player_score in player_scores:
                 new_score = TeamPlayerScore.from_player_score(player_score)
@@ -611,13 +1200,361 @@ class ResultsCupManager:
                     new_score.team_score = team_lookup[new_score.team_id].score
                 team_player_scores.append(new_score)
             matches_scores.append(team_player_scores)
+        return matches_scores
+
+    async def get_data_score_matrix(self, map_start_times: "list[int]") -> ScoreMatrix:
+        """
+        Returns the scores of the matches as a ScoreMatrix with one map per
+        match, in the order of map_start_times. The columns are filled from the
+        stored scores without a TeamPlayerScore per player and match.
+        """
+        all_team_scores, all_player_scores = await self._load_scores(map_start_times)
+
+        matrix = ScoreMatrix()
+        for start_time in map_start_times:
+            team_lookup = {}  # type: dict[int, TeamScore]
+            for team_score in all_team_scores[start_time]:
+                team_lookup[team_score.team_id] = team_score
+            matrix.add_map(
+                (
+                    player_score.login,
+                    player_score.nickname,
+                    player_score.country,
+                    player_score.team,
+                    (
+                        team_lookup[player_score.team].name
+                        if player_score.team in team_lookup
+                        else None
+                    ),
+                    (
+                        team_lookup[player_score.team].score
+                        if player_score.team in team_lookup
+                        else 0
+                    ),
+                    player_score.score,
+                    player_score.score2,
+                )
+                for player_score in all_player_scores[start_time]
+            )
+        return matrix
+
+    async def get_data_match_results(
+        self, map_start_times: "list[int]"
+    ) -> "dict[int, dict[str, MatchResult]]":
+        """
+        Returns the stored per-map results of the matches by login. Matches
+        without results, such as the current one, map to an empty dict.
+        """
+        match_results = {}  # type: dict[int, dict[str, MatchResult]]
+        missing_results = []  # type: list[int]
+        for start_time in map_start_times:
+            match_results[start_time] = self._view_cache_match_results.get(start_time)
+            if match_results[start_time] is None:
+                missing_results.append(start_time)
+        for batch_start in range(0, len(missing_results), SCORE_READ_BATCH_SIZE):
+            batch = missing_results[batch_start : batch_start + SCORE_READ_BATCH_SIZE]
+            for start_time in batch:
+                match_results[start_time] = {}
+            for match_result in await MatchResult.execute(
+                MatchResult.select().where(MatchResult.map_start_time.in_(batch))
+            ):
+                match_results[match_result.map_start_time][
+                    match_result.login
+                ] = match_result
+            for start_time in batch:
+                if start_time != self._match_start_time:
+                    self._view_cache_match_results[start_time] = match_results[
+                        start_time
+                    ]
+        return match_results
+
+    async def _save_match_results(
+        self,
+        map_start_time: int,
+        sorting: ScoreModeBase,
+        scores: "list[TeamPlayerScore]",
+    ) -> bool:
+        """
+        Store the final placement of every player of a finished match, as
+        placed by the default score mode of the match. Existing results of the
+        match are replaced.
+        """
+        rows = [
+            {
+                "map_start_time": map_start_time,
+                "login": score.login,
+                "score_mode": sorting.name,
+                "placement": score.placement,
+                "player_count": len(scores),
+                "score": score.player_score,
+                "score2": score.player_score2,
+                "team_score": score.team_score,
+            }
+            for score in scores
+        ]
+        try:
+            async with self.instance.db.objects.atomic():
+                await MatchResult.execute(
+                    MatchResult.delete().where(
+                        MatchResult.map_start_time == map_start_time
+                    )
+                )
+                for batch_start in range(0, len(rows), SCORE_WRITE_BATCH_SIZE):
+                    await MatchResult.execute(
+                        MatchResult.insert_many(
+                            rows[batch_start : batch_start + SCORE_WRITE_BATCH_SIZE]
+                        )
+                    )
+        except Exception as e:
+            logger.error(
+                f"Exception saving results of match {str(map_start_time)}: {str(e)}"
+            )
+            return False
+        self._view_cache_match_results[map_start_time] = {
+            row["login"]: MatchResult(**row) for row in rows
+        }
+        return True
+
+    async def backfill_match_results(self) -> int:
+        """
+        Compute and store the results of saved matches which have scores but
+        no results, the current match is skipped. Returns the number of
+        matches which were backfilled.
+        """
+        stored_matches = set(
+            row.map_start_time
+            for row in await MatchResult.execute(
+                MatchResult.select(MatchResult.map_start_time).distinct()
+            )
+        )
+        missing_matches = [
+            match
+            for match in await self.get_data_matches()
+            if match.map_start_time not in stored_matches
+            and match.map_start_time != self._match_start_time
+        ]
+        backfilled = 0
+        for batch_start in range(0, len(missing_matches), SCORE_READ_BATCH_SIZE):
+            batch = missing_matches[batch_start : batch_start + SCORE_READ_BATCH_SIZE]
+            matches_scores = await self.get_data_team_player_scores(
+                [match.map_start_time for match in batch]
+            )
+            for match, map_scores in zip(batch, matches_scores):
+                if not map_scores:
+                    continue
+                sorting = get_sorting_from_mode(str(match.mode_script))
+                scores = sorting.combine_scores([map_scores], [match])
+                scores = sorting.sort_scores(scores)
+                scores = sorting.update_placements(scores)
+                if await self._save_match_results(
+                    match.map_start_time, sorting, scores
+                ):
+                    backfilled += 1
+        logger.info(f"Backfilled the results of {str(backfilled)} match(es)")
+        return backfilled
+
+    def _can_aggregate_scores(
+        self, map_start_times: "list[int]", sorting: ScoreModeBase
+    ) -> bool:
+        if len(map_start_times) < SQL_AGGREGATION_MIN_MATCHES:
+            return False
+        if not sorting.supports_sql_aggregation():
+            return False
+        # Scores held back by write-behind are not in the database yet
+        lookup_matches = set(map_start_times)
+        return not any(
+            start_time in lookup_matches
+            for start_time, _ in list(self._pending_player_scores.keys())
+            + list(self._pending_team_scores.keys())
+        )
 
-        matches = await self.get_data_specific_matches(lookup_matches)
-        matches = sorted(matches, key=lambda x: (x.map_start_time))
+    def _aggregate_scores_query(
+        self, map_start_times: "list[int]", sorting: ScoreModeBase
+    ):
+        """
+        Sum the scores of each login across the matches with GROUP BY, then join
+        the row of the first match of each login back in for the nickname,
+        country, team and the fields which the score mode does not sum.
+
+        Like the team lookup of get_data_score_matrix only the last team score
+        of each team and match is joined, and only the first row of a login is
+        joined back in, so duplicate rows do not multiply the results.
+
+        Rows are ordered like sum_scores_by_login sees the logins, by their
+        first match and then by the id of their first score, so that the
+        stable sort_scores orders tied players the same on both paths.
+        """
+
+        def last_team_score(team_score):
+            other_team_score = TeamScore.alias()
+            return other_team_score.select(fn.MAX(other_team_score.id)).where(
+                (other_team_score.map_start_time == team_score.map_start_time)
+                & (other_team_score.team_id == team_score.team_id)
+            )
+
+        other_player_score = PlayerScore.alias()
+        first_player_score = other_player_score.select(
+            fn.MIN(other_player_score.id)
+        ).where(
+            (other_player_score.map_start_time == PlayerScore.map_start_time)
+            & (other_player_score.login == PlayerScore.login)
+        )
 
-        scores = sorting.combine_scores(matches_scores, matches)
+        aggregate_columns = [
+            PlayerScore.login,
+            fn.MIN(PlayerScore.map_start_time).alias("first_map_start_time"),
+            fn.SUM(PlayerScore.score).alias("sum_score"),
+            fn.SUM(PlayerScore.score2).alias("sum_score2"),
+            fn.COUNT(PlayerScore.id).alias("map_count"),
+        ]
+        aggregate = PlayerScore.select(*aggregate_columns)
+        if "team_score" in sorting.sum_fields:
+            aggregate = aggregate.select(
+                *aggregate_columns,
+                fn.SUM(fn.COALESCE(TeamScore.score, 0)).alias("sum_team_score"),
+            ).join(
+                TeamScore,
+                JOIN.LEFT_OUTER,
+                on=(
+                    (TeamScore.map_start_time == PlayerScore.map_start_time)
+                    & (TeamScore.team_id == PlayerScore.team)
+                    & (TeamScore.id == last_team_score(TeamScore))
+                ),
+            )
+        aggregate = (
+            aggregate.where(PlayerScore.map_start_time.in_(map_start_times))
+            .group_by(PlayerScore.login)
+            .alias("score_totals")
+        )
+
+        first_team = TeamScore.alias()
+        columns = [
+            PlayerScore.login,
+            PlayerScore.nickname,
+            PlayerScore.country,
+            PlayerScore.team,
+            PlayerScore.score,
+            PlayerScore.score2,
+            first_team.name.alias("team_name"),
+            first_team.score.alias("team_score"),
+        ] + [
+            getattr(aggregate.c, column).alias(column)
+            for field, column in SQL_AGGREGATION_COLUMNS.items()
+            if field in sorting.sum_fields or field == "count"
+        ]
+        return (
+            PlayerScore.select(*columns)
+            .join(
+                aggregate,
+                on=(
+                    (PlayerScore.login == aggregate.c.login)
+                    & (PlayerScore.map_start_time == aggregate.c.first_map_start_time)
+                ),
+            )
+            .switch(PlayerScore)
+            .join(
+                first_team,
+                JOIN.LEFT_OUTER,
+                on=(
+                    (first_team.map_start_time == PlayerScore.map_start_time)
+                    & (first_team.team_id == PlayerScore.team)
+                    & (first_team.id == last_team_score(first_team))
+                ),
+            )
+            .where(PlayerScore.id == first_player_score)
+            .order_by(aggregate.c.first_map_start_time, PlayerScore.id)
+            .dicts()
+        )
+
+    async def _aggregate_scores(
+        self, map_start_times: "list[int]", sorting: ScoreModeBase
+    ) -> "list[TeamPlayerScore]":
+        """
+        Returns the combined scores of the matches as combine_scores of the
+        score mode would, summed by the database. Matches are aggregated in
+        batches of SCORE_READ_BATCH_SIZE whose sums are added up here.
+        """
+        combined_scores = {}  # type: dict[str, TeamPlayerScore]
+        for batch_start in range(0, len(map_start_times), SCORE_READ_BATCH_SIZE):
+            batch = map_start_times[batch_start : batch_start + SCORE_READ_BATCH_SIZE]
+            for row in await PlayerScore.execute(
+                self._aggregate_scores_query(batch, sorting)
+            ):
+                combined_score = combined_scores.get(row["login"])
+                if combined_score is None:
+                    combined_score = TeamPlayerScore(
+                        row["login"],
+                        row["nickname"],
+                        row["country"],
+                        row["team"],
+                        row["team_name"],
+                        row["team_score"] or 0,
+                        row["score"],
+                        row["score2"],
+                    )
+                    for field in sorting.sum_fields:
+                        setattr(combined_score, field, 0)
+                    if sorting.count_maps:
+                        combined_score.count = 0
+                    combined_scores[row["login"]] = combined_score
+                for field in sorting.sum_fields:
+                    setattr(
+                        combined_score,
+                        field,
+                        getattr(combined_score, field)
+                        + int(row[SQL_AGGREGATION_COLUMNS[field]] or 0),
+                    )
+                if sorting.count_maps:
+                    combined_score.count += row["map_count"]
+        return list(combined_scores.values())
+
+    async def get_data_scores(
+        self, map_start_time: "int | list[int]", sorting: ScoreModeBase
+    ) -> "tuple[TeamPlayerScore]":
+        """
+        Returns the combined, sorted and placed scores of the matches. Results
+        are memoized per set of matches and score mode until the scores of one
+        of the matches change, they are shared and therefore read-only.
+        """
+        lookup_matches = []
+        if isinstance(map_start_time, int):
+            lookup_matches.append(map_start_time)
+        elif isinstance(map_start_time, list):
+            lookup_matches = map_start_time
+        else:
+            logger.error("Unexpected type in get_data_scores: " + str(map_start_time))
+        lookup_matches.sort()
+
+        cached_scores = self._standings_cache.get(lookup_matches, sorting)
+        if cached_scores is not None:
+            return cached_scores
+        cache_version = self._standings_cache.version
+
+        scores = None  # type: list[TeamPlayerScore]
+        if self._can_aggregate_scores(lookup_matches, sorting):
+            try:
+                scores = await self._aggregate_scores(lookup_matches, sorting)
+                sorting.update_display_state(scores)
+            except Exception as e:
+                logger.error(
+                    f"Exception aggregating scores in the database, combining them in memory instead: {str(e)}"
+                )
+                scores = None
+
+        if scores is None:
+            matches_scores = await self.get_data_score_matrix(lookup_matches)
+
+            matches = await self.get_data_specific_matches(lookup_matches)
+            matches = sorted(matches, key=lambda x: (x.map_start_time))
+
+            combine_kwargs = {}
+            if sorting.uses_match_results:
+                combine_kwargs["match_results"] = await self.get_data_match_results(
+                    lookup_matches
+                )
+            scores = sorting.combine_scores(matches_scores, matches, **combine_kwargs)
         scores = sorting.sort_scores(scores)
         scores = sorting.update_placements(scores)
         scores = sorting.update_score_is_time(scores)
 
-        return scores
+        return self._standings_cache.put(lookup_matches, sorting, scores, cache_version)
@@ -0,0 +1,75 @@
+import logging
+
+from peewee import fn
+
+from .models import CupInfo, CupMatch, PlayerScore, TeamScore
+
+logger = logging.getLogger(__name__)
+
+# Indexes added to tables after their first release as (model, columns,
+# unique, keep). Rows which would break a unique index are deleted first,
+# keeping the row selected by keep for each key.
+#
+# pyplanet skips all pending migrations of the app when one of its tables has
+# to be created, so these are also checked on every start and not only by the
+# migrations which introduced them.
+SCHEMA_INDEXES = [
+    (PlayerScore, ("map_start_time", "login"), True, fn.MAX),
+    (TeamScore, ("map_start_time", "team_id"), True, fn.MAX),
+    (CupMatch, ("cup_start_time", "map_start_time"), True, fn.MIN),
+    (CupInfo, ("cup_key", "cup_start_time"), False, None),
+]
+
+
+def delete_duplicates(model, columns: "tuple[str, ...]", keep) -> int:
+    """
+    Delete the rows which share the values of columns with another row, the
+    row whose id is picked by keep (fn.MIN or fn.MAX) is kept. Returns the
+    number of deleted rows.
+    """
+    key_fields = [getattr(model, column) for column in columns]
+    duplicates_query = (
+        model.select(*key_fields, keep(model.id).alias("keep_id"))
+        .group_by(*key_fields)
+        .having(fn.COUNT(model.id) > 1)
+    )
+    deleted = 0
+    for duplicate in list(duplicates_query):
+        delete_condition = model.id != duplicate.keep_id
+        for key_field in key_fields:
+            delete_condition &= key_field == getattr(duplicate, key_field.name)
+        deleted += model.delete().where(delete_condition).execute()
+    if deleted:
+        logger.info(
+            f"Removed {str(deleted)} duplicate row(s) from {model._meta.db_table}"
+        )
+    return deleted
+
+
+def has_index(model, columns: "tuple[str, ...]", unique: bool) -> bool:
+    for index in model._meta.database.get_indexes(model._meta.db_table):
+        if tuple(index.columns) == tuple(columns) and (index.unique or not unique):
+            return True
+    return False
+
+
+def ensure_indexes(models: "list | None" = None) -> "list[str]":
+    """
+    Add the SCHEMA_INDEXES of models, or of all models, which are missing and
+    remove the duplicate rows in their way. Tables whose indexes exist are not
+    touched. Returns the names of the tables which were changed.
+
+    Runs synchronous queries, the caller has to allow them.
+    """
+    changed_tables = []  # type: list[str]
+    for model, columns, unique, keep in SCHEMA_INDEXES:
+        if models is not None and model not in models:
+            continue
+        if has_index(model, columns, unique):
+            continue
+        if unique:
+            delete_duplicates(model, columns, keep)
+        model._meta.database.create_index(model, list(columns), unique)
+        logger.info(f"Added index on {', '.join(columns)} to {model._meta.db_table}")
+        changed_tables.append(model._meta.db_table)
+    return changed_tables
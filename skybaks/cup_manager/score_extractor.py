@@ -0,0 +1,185 @@
+import logging
+
+from .app_types import GenericPlayerScore
+
+logger = logging.getLogger(__name__)
+
+
+class ScoreExtractorBase:
+    """
+    Converts the player entries of a scores callback into GenericPlayerScore
+    objects. One extractor is resolved per map with get_score_extractor, so the
+    mode script is not inspected again for every callback.
+
+    Two payload shapes are handled. The scores signal passes the pyplanet
+    player object under "player" and uses snake_case keys, the raw
+    Trackmania.GetScores/Shootmania.GetScores response passes login and name
+    and uses lowercase keys. The shape is detected once per payload.
+
+    The nickname, country and team of each login are resolved from the player
+    object once per map and cached, see forget_player.
+    """
+
+    # (signal key, raw GetScores key)
+    score_keys = ("map_points", "mappoints")
+    score2_keys = None  # type: tuple[str, str]
+
+    def __init__(self) -> None:
+        # Nickname, country and team of the players seen on this map
+        self._identities = {}  # type: dict[str, tuple[str, str, str, int]]
+        # Logins which already got a warning about missing zone or team
+        self._warned = set()  # type: set[tuple[str, str]]
+
+    def extract_scores(self, player_scores: list) -> "list[GenericPlayerScore]":
+        new_scores = []  # type: list[GenericPlayerScore]
+        if not player_scores:
+            return new_scores
+
+        is_signal = "player" in player_scores[0]
+        key_index = 0 if is_signal else 1
+        score_key = self.score_keys[key_index]
+        score2_key = self.score2_keys[key_index] if self.score2_keys else None
+        read_identity = (
+            self._read_signal_identity if is_signal else self._read_raw_identity
+        )
+
+        for player_score in player_scores:
+            try:
+                new_score_score = player_score[score_key]
+                new_score_score2 = len(player_score[score2_key]) if score2_key else 0
+                if new_score_score == -1:
+                    continue
+                (
+                    new_score_login,
+                    new_score_nick,
+                    new_score_country,
+                    new_score_team,
+                ) = read_identity(player_score)
+                new_scores.append(
+                    GenericPlayerScore(
+                        new_score_login,
+                        new_score_nick,
+                        new_score_country,
+                        new_score_score,
+                        score2=new_score_score2,
+                        team=new_score_team,
+                    )
+                )
+            except Exception as e:
+                logger.error(
+                    f"Exception while recording scores for following player_score object: {str(player_score)}"
+                )
+                logger.error(str(e))
+        return new_scores
+
+    def fingerprint(self, player_scores: list) -> "int | None":
+        """
+        Cheap hash over the login and score fields of every entry. Payloads
+        with the same fingerprint produce the same scores. Returns None if the
+        payload could not be read.
+        """
+        if not player_scores:
+            return hash(())
+
+        is_signal = "player" in player_scores[0]
+        key_index = 0 if is_signal else 1
+        score_key = self.score_keys[key_index]
+        score2_key = self.score2_keys[key_index] if self.score2_keys else None
+        try:
+            return hash(
+                tuple(
+                    (
+                        (
+                            player_score["player"].login
+                            if is_signal
+                            else player_score["login"]
+                        ),
+                        player_score[score_key],
+                        len(player_score[score2_key]) if score2_key else 0,
+                    )
+                    for player_score in player_scores
+                )
+            )
+        except Exception:
+            return None
+
+    def forget_player(self, login: str) -> None:
+        """
+        Drop the cached identity of a player, it is resolved again from the
+        player object on the next callback.
+        """
+        self._identities.pop(login, None)
+
+    def _read_signal_identity(self, player_score: dict) -> "tuple[str, str, str, int]":
+        player = player_score["player"]
+        login = player.login
+        identity = self._identities.get(login)
+        if identity is None:
+            identity = self._resolve_identity(player)
+            self._identities[login] = identity
+        return identity
+
+    def _resolve_identity(self, player) -> "tuple[str, str, str, int]":
+        login = player.login
+        nickname = player.nickname
+
+        country = "World"
+        try:
+            if player.flow.zone.country != None:
+                country = player.flow.zone.country
+            elif (login, "country") not in self._warned:
+                self._warned.add((login, "country"))
+                logger.warning(
+                    f'player.flow.zone.country was None for login "{login}" nickname "{nickname}". Defaulting to {country}'
+                )
+        except Exception as e:
+            logger.error(
+                f'Exception while accessing country for login "{login}", nickname "{nickname}": {str(e)}'
+            )
+
+        team = -1
+        try:
+            if player.flow.team_id != None:
+                team = player.flow.team_id
+            elif (login, "team") not in self._warned:
+                self._warned.add((login, "team"))
+                logger.warning(
+                    f'player.flow.team_id was None for login "{login}" nickname "{nickname}". Defaulting to {str(team)}'
+                )
+        except Exception as e:
+            logger.error(
+                f'Exception while accessing team_id for login "{login}", nickname "{nickname}": {str(e)}'
+            )
+
+        return login, nickname, country, team
+
+    @staticmethod
+    def _read_raw_identity(player_score: dict) -> "tuple[str, str, str, int]":
+        # The raw GetScores response carries no zone or team information
+        return player_score["login"], player_score["name"], "World", -1
+
+
+class ScoreExtractorPoints(ScoreExtractorBase):
+    score_keys = ("map_points", "mappoints")
+
+
+class ScoreExtractorTimeAttack(ScoreExtractorBase):
+    score_keys = ("best_race_time", "bestracetime")
+
+
+class ScoreExtractorLaps(ScoreExtractorBase):
+    score_keys = ("best_race_time", "bestracetime")
+    score2_keys = ("best_race_checkpoints", "bestracecheckpoints")
+
+
+def get_score_extractor(mode_script: str) -> ScoreExtractorBase:
+    """
+    Returns the score extractor matching the mode script
+    """
+    mode_name = str(mode_script).lower()
+    if "timeattack" in mode_name:
+        return ScoreExtractorTimeAttack()
+    elif "laps" in mode_name:
+        return ScoreExtractorLaps()
+    else:
+        return ScoreExtractorPoints()
@@ -1,8 +1,9 @@
 import logging
 from abc import ABC, abstractmethod
 
-from ..app_types import TeamPlayerScore
+from ..app_types import ScoreMatrix, TeamPlayerScore, TieGroups
 from ..models import MatchInfo
+from . import vectorized
 
 from pyplanet.utils import times
 
@@ -22,6 +23,18 @@ class ScoreModeBase(ABC):
     Sorting: None
     """
 
+    # TeamPlayerScore attributes which combine_scores sums across maps. Modes
+    # which combine scores in any other way leave this empty.
+    sum_fields = ()  # type: tuple[str, ...]
+    # Whether combine_scores counts the maps each player has a score on
+    count_maps = False
+    # TeamPlayerScore attributes sort_scores orders by, a "-" prefix sorts
+    # the attribute in descending order
+    sort_fields = ()  # type: tuple[str, ...]
+    # Whether combine_scores takes the per-map placements stored in the
+    # MatchResult table, passed as the match_results keyword argument
+    uses_match_results = False
+
     def __init__(self) -> None:
         self.name = "score_mode_base"
         self.display_name = "Score-Mode Base (Abstract)"
@@ -39,7 +52,7 @@ class ScoreModeBase(ABC):
     @abstractmethod
     def combine_scores(
         self,
-        scores: "list[list[TeamPlayerScore]]",
+        scores: "ScoreMatrix | list[list[TeamPlayerScore]]",
         maps: "list[MatchInfo]" = [],
         **kwargs,
     ) -> "list[TeamPlayerScore]":
@@ -55,18 +68,176 @@ class ScoreModeBase(ABC):
     ) -> "list[TeamPlayerScore]":
         pass
 
+    def sum_scores_by_login(
+        self,
+        scores: "ScoreMatrix | list[list[TeamPlayerScore]]",
+        sum_fields: "tuple[str, ...] | None" = None,
+        count_maps: "bool | None" = None,
+    ) -> "list[TeamPlayerScore]":
+        """
+        Combine the scores of all maps per login along the rows of the score
+        matrix, in O(maps * players). Each player gets a new score built from
+        their first score, in the order players are first seen, with the
+        sum_fields of all their scores added up. With count_maps the number of
+        maps of each player is stored in count. Both default to the attributes
+        declared by the score mode.
+        """
+        if sum_fields is None:
+            sum_fields = self.sum_fields
+        if count_maps is None:
+            count_maps = self.count_maps
+        matrix = ScoreMatrix.from_scores(scores)
+        if vectorized.available(matrix.score_count()):
+            vectorized_scores = vectorized.sum_scores_by_login(
+                matrix, sum_fields, count_maps
+            )
+            if vectorized_scores is not None:
+                return vectorized_scores
+        first_scores = [None] * len(matrix.logins)  # type: list[tuple[int, int]]
+        order = []  # type: list[int]
+        counts = [0] * len(matrix.logins)
+        totals = {field: [0] * len(matrix.logins) for field in sum_fields}
+        for map_index, map_rows in enumerate(matrix.map_rows):
+            for index, row in enumerate(map_rows):
+                if first_scores[row] is None:
+                    first_scores[row] = (map_index, index)
+                    order.append(row)
+                counts[row] += 1
+            for field in sum_fields:
+                field_totals = totals[field]
+                for row, value in zip(map_rows, matrix.columns[field][map_index]):
+                    field_totals[row] += value
+
+        combined_scores = []  # type: list[TeamPlayerScore]
+        for row in order:
+            combined_score = matrix.get_score(*first_scores[row])
+            for field in sum_fields:
+                setattr(combined_score, field, totals[field][row])
+            if count_maps:
+                combined_score.count = counts[row]
+            combined_scores.append(combined_score)
+        return combined_scores
+
+    def place_map_scores(
+        self, matrix: ScoreMatrix, map_index: int
+    ) -> "list[tuple[int, int]]":
+        """
+        Sort and place the scores of one map of the matrix like sort_scores and
+        update_placements. Returns the index and placement of each score of the
+        map in standings order. Modes ordered by sort_fields are placed from
+        the columns of the matrix without building a TeamPlayerScore per score.
+        """
+        score_count = len(matrix.map_rows[map_index])
+        key_names = [field.lstrip("-") for field in self.sort_fields]
+        if not key_names or any(
+            name not in ScoreMatrix.COLUMNS and name != "count" for name in key_names
+        ):
+            map_scores = matrix.map_scores(map_index)
+            indexes = {
+                id(map_score): index for index, map_score in enumerate(map_scores)
+            }
+            map_scores = self.update_placements(self.sort_scores(map_scores))
+            return [
+                (indexes[id(map_score)], map_score.placement)
+                for map_score in map_scores
+            ]
+
+        key_columns = []  # type: list[list[int]]
+        for field, name in zip(self.sort_fields, key_names):
+            if name == "count":
+                # Every score of a single map counts once
+                column = [1] * score_count
+            else:
+                column = matrix.columns[name][map_index]
+            if field[0] == "-":
+                column = [-value for value in column]
+            key_columns.append(column)
+        keys = list(zip(*key_columns))
+        placed_scores = []  # type: list[tuple[int, int]]
+        for position, index in enumerate(
+            sorted(range(score_count), key=keys.__getitem__)
+        ):
+            if position > 0 and keys[index] == keys[placed_scores[-1][0]]:
+                placement = placed_scores[-1][1]
+            else:
+                placement = position + 1
+            placed_scores.append((index, placement))
+        return placed_scores
+
+    def sort_key(self, score: TeamPlayerScore) -> tuple:
+        """
+        Key which sort_scores orders by, built from sort_fields. Scores with
+        equal keys share a placement.
+        """
+        return tuple(
+            -getattr(score, field[1:]) if field[0] == "-" else getattr(score, field)
+            for field in self.sort_fields
+        )
+
+    def sort_scores_by_key(
+        self, scores: "list[TeamPlayerScore]"
+    ) -> "list[TeamPlayerScore]":
+        """
+        Order the scores by sort_key, vectorized for large standings
+        """
+        if vectorized.available(len(scores)):
+            sorted_scores = vectorized.sort_scores(scores, self.sort_fields)
+            if sorted_scores is not None:
+                return sorted_scores
+        return sorted(scores, key=self.sort_key)
+
+    def update_placements_by_key(
+        self, scores: "list[TeamPlayerScore]"
+    ) -> "list[TeamPlayerScore]":
+        """
+        Place scores ordered by sort_key. Scores with equal keys share the
+        placement, the next score is placed by its position.
+        """
+        if vectorized.available(len(scores)):
+            placed_scores = vectorized.update_placements(scores, self.sort_fields)
+            if placed_scores is not None:
+                return placed_scores
+        previous_key = None
+        for index, score in enumerate(scores):
+            key = self.sort_key(score)
+            if index > 0 and key == previous_key:
+                score.placement = scores[index - 1].placement
+            else:
+                score.placement = index + 1
+            previous_key = key
+        return scores
+
+    def supports_sql_aggregation(self) -> bool:
+        """
+        Whether the combined scores can be aggregated inside the database. This
+        holds for modes whose combine_scores only sums sum_fields (and counts
+        maps) per login and whose order is given by sort_fields.
+        """
+        return bool(self.sum_fields and self.sort_fields)
+
+    def update_display_state(self, scores: "list[TeamPlayerScore]") -> None:
+        """
+        Adjust the display flags to the combined scores, called by
+        combine_scores and for scores aggregated in the database.
+        """
+        pass
+
+    def get_tie_groups(self, scores: "list[TeamPlayerScore]") -> TieGroups:
+        return TieGroups(scores)
+
     def get_ties(
         self, scores: "list[TeamPlayerScore]"
     ) -> "dict[str, list[TeamPlayerScore]]":
+        """
+        The other players tied with each tied login. Prefer get_tie_groups,
+        this builds one list per tied player.
+        """
+        tie_groups = self.get_tie_groups(scores)
         ties_by_login = {}  # type: dict[str, list[TeamPlayerScore]]
-        for score in scores:
-            tied_scores = [
-                s
-                for s in scores
-                if s.placement == score.placement and s.login != score.login
-            ]
-            if len(tied_scores) > 0:
-                ties_by_login[score.login] = tied_scores
+        for login in tie_groups.by_login:
+            tied_scores = tie_groups.others(login)
+            if tied_scores:
+                ties_by_login[login] = tied_scores
         return ties_by_login
 
     def update_score_is_time(
@@ -78,6 +249,24 @@ class ScoreModeBase(ABC):
             score.team_score_is_time = self.scoreteam_is_time
         return scores
 
+    def get_display_state(self) -> dict:
+        """
+        Returns the flags which combine_scores may adjust to the scores, such as
+        hiding the team score when nobody scored team points.
+        """
+        return {
+            "score1_is_time": self.score1_is_time,
+            "score2_is_time": self.score2_is_time,
+            "scoreteam_is_time": self.scoreteam_is_time,
+            "use_score1": self.use_score1,
+            "use_score2": self.use_score2,
+            "use_scoreteam": self.use_scoreteam,
+        }
+
+    def set_display_state(self, state: dict) -> None:
+        for name, value in state.items():
+            setattr(self, name, value)
+
     def score1_relevant(self) -> bool:
         return self.use_score1
 
@@ -1,6 +1,6 @@
 import logging
 
-from ..app_types import TeamPlayerScore
+from ..app_types import ScoreMatrix, TeamPlayerScore
 from ..models import MatchInfo
 from .score_base import ScoreModeBase
 
@@ -19,6 +19,9 @@ class ScoreModeFallback(ScoreModeBase):
     Sorting: Team score descending, Score descending
     """
 
+    sum_fields = ("team_score", "player_score")
+    sort_fields = ("-team_score", "-player_score")
+
     def __init__(self) -> None:
         super().__init__()
         self.name = "score_mode_fallback"
@@ -35,41 +38,22 @@ class ScoreModeFallback(ScoreModeBase):
 
     def combine_scores(
         self,
-        scores: "list[list[TeamPlayerScore]]",
+        scores: "ScoreMatrix | list[list[TeamPlayerScore]]",
         maps: "list[MatchInfo]" = [],
         **kwargs,
     ) -> "list[TeamPlayerScore]":
-        combined_scores = []  # type: list[TeamPlayerScore]
-        for map_scores in scores:
-            for map_score in map_scores:
-                existing_score = next(
-                    (x for x in combined_scores if x.login == map_score.login), None
-                )
-                if existing_score:
-                    existing_score.team_score += map_score.team_score
-                    existing_score.player_score += map_score.player_score
-                else:
-                    combined_scores.append(map_score)
+        combined_scores = self.sum_scores_by_login(scores)
+        self.update_display_state(combined_scores)
+        return combined_scores
 
+    def update_display_state(self, scores: "list[TeamPlayerScore]") -> None:
         # Hide team scores if there are no team points
-        self.use_scoreteam = any(s.team_score > 0 for s in combined_scores)
-        return combined_scores
+        self.use_scoreteam = any(s.team_score > 0 for s in scores)
 
     def sort_scores(self, scores: "list[TeamPlayerScore]") -> "list[TeamPlayerScore]":
-        return sorted(scores, key=lambda x: (-x.team_score, -x.player_score))
+        return self.sort_scores_by_key(scores)
 
     def update_placements(
         self, scores: "list[TeamPlayerScore]"
     ) -> "list[TeamPlayerScore]":
-        for i in range(0, len(scores)):
-            if i > 0:
-                if (
-                    scores[i - 1].team_score == scores[i].team_score
-                    and scores[i - 1].player_score == scores[i].player_score
-                ):
-                    scores[i].placement = scores[i - 1].placement
-                else:
-                    scores[i].placement = i + 1
-            else:
-                scores[i].placement = i + 1
-        return scores
+        return self.update_placements_by_key(scores)
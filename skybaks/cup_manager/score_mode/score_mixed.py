@@ -1,7 +1,7 @@
 import logging
 
-from ..app_types import TeamPlayerScore
-from ..models import MatchInfo
+from ..app_types import ScoreMatrix, TeamPlayerScore
+from ..models import MatchInfo, MatchResult
 from .score_base import ScoreModeBase
 from .mode_logic_singular import get_sorting_from_mode_singular
 
@@ -25,6 +25,8 @@ class ScoreModeMixed(ScoreModeBase):
     Sorting: Points for each map placement descending
     """
 
+    uses_match_results = True
+
     def __init__(self) -> None:
         super().__init__()
         self.name = "score_mode_mixed"
@@ -40,28 +42,70 @@ class ScoreModeMixed(ScoreModeBase):
 
     def combine_scores(
         self,
-        scores: "list[list[TeamPlayerScore]]",
+        scores: "ScoreMatrix | list[list[TeamPlayerScore]]",
         maps: "list[MatchInfo]" = [],
         **kwargs,
     ) -> "list[TeamPlayerScore]":
-        combined_scores: "list[TeamPlayerScore]" = []
-        for map_scores, map_info in zip(scores, maps):
-            map_sorting = get_sorting_from_mode_singular(map_info.mode_script)
-            map_scores_sorted = map_sorting.sort_scores(map_scores)
-            map_scores_sorted = map_sorting.update_placements(map_scores_sorted)
-            for map_score in map_scores_sorted:
-                map_score.player_score = (
-                    len(map_scores_sorted) - map_score.placement + 1
-                )
-                existing_score = next(
-                    (x for x in combined_scores if x.login == map_score.login), None
-                )
-                if existing_score:
-                    existing_score.player_score += map_score.player_score
-                else:
-                    combined_scores.append(map_score)
+        matrix = ScoreMatrix.from_scores(scores)
+        match_results = kwargs.get("match_results", {})
+        # Map, index and placement of the first placed score of each row
+        first_scores = {}  # type: dict[int, tuple[int, int, int]]
+        points = [0] * len(matrix.logins)
+        for map_index, map_info in zip(range(len(matrix)), maps):
+            placed_scores = self._place_map_scores(
+                matrix, map_index, map_info, match_results
+            )
+            for index, placement in placed_scores:
+                row = matrix.map_rows[map_index][index]
+                if row not in first_scores:
+                    first_scores[row] = (map_index, index, placement)
+                points[row] += self._placement_points(len(placed_scores), placement)
+
+        combined_scores = []  # type: list[TeamPlayerScore]
+        for row, (map_index, index, placement) in first_scores.items():
+            combined_score = matrix.get_score(map_index, index)
+            combined_score.player_score = points[row]
+            combined_score.placement = placement
+            combined_scores.append(combined_score)
         return combined_scores
 
+    def _placement_points(self, score_count: int, placement: int) -> int:
+        return score_count - placement + 1
+
+    def _place_map_scores(
+        self,
+        matrix: ScoreMatrix,
+        map_index: int,
+        map_info: MatchInfo,
+        match_results: "dict[int, dict[str, MatchResult]]",
+    ) -> "list[tuple[int, int]]":
+        """
+        Sort and place the scores of one map with the default score mode of the
+        map, as the index and placement of each score in standings order. The
+        placements stored in the MatchResult rows of a finished map are used
+        instead when they cover every player of the map.
+        """
+        map_sorting = get_sorting_from_mode_singular(map_info.mode_script)
+        map_results = match_results.get(map_info.map_start_time)
+        map_logins = [matrix.logins[row] for row in matrix.map_rows[map_index]]
+        if (
+            map_results
+            and len(map_results) == len(map_logins)
+            and all(
+                login in map_results
+                and map_results[login].score_mode == map_sorting.name
+                for login in map_logins
+            )
+        ):
+            return sorted(
+                (
+                    (index, map_results[login].placement)
+                    for index, login in enumerate(map_logins)
+                ),
+                key=lambda x: (x[1]),
+            )
+        return map_sorting.place_map_scores(matrix, map_index)
+
     def sort_scores(self, scores: "list[TeamPlayerScore]") -> "list[TeamPlayerScore]":
         return sorted(scores, key=lambda x: (-x.player_score))
 
@@ -102,27 +146,8 @@ class ScoreModeMixedGolf(ScoreModeMixed):
         self.display_name = "Mixed Modes Golf-Points"
         self.brief = "Use placement as points, lowest total wins"
 
-    def combine_scores(
-        self,
-        scores: "list[list[TeamPlayerScore]]",
-        maps: "list[MatchInfo]" = [],
-        **kwargs,
-    ) -> "list[TeamPlayerScore]":
-        combined_scores: "list[TeamPlayerScore]" = list()
-        for map_scores, map_info in zip(scores, maps):
-            map_sorting = get_sorting_from_mode_singular(map_info.mode_script)
-            map_scores_sorted = map_sorting.sort_scores(map_scores)
-            map_scores_sorted = map_sorting.update_placements(map_scores_sorted)
-            for map_score in map_scores_sorted:
-                map_score.player_score = map_score.placement
-                existing_score = next(
-                    (x for x in combined_scores if x.login == map_score.login), None
-                )
-                if existing_score:
-                    existing_score.player_score += map_score.player_score
-                else:
-                    combined_scores.append(map_score)
-        return combined_scores
+    def _placement_points(self, score_count: int, placement: int) -> int:
+        return placement
 
     def sort_scores(self, scores: "list[TeamPlayerScore]") -> "list[TeamPlayerScore]":
         return sorted(scores, key=lambda x: (x.player_score))
@@ -1,6 +1,6 @@
 import logging
 
-from ..app_types import TeamPlayerScore
+from ..app_types import ScoreMatrix, TeamPlayerScore
 from ..models import MatchInfo
 from .score_base import ScoreModeBase
 
@@ -20,6 +20,9 @@ class ScoreRoundsDefault(ScoreModeBase):
     Sorting: Points descending
     """
 
+    sum_fields = ("player_score",)
+    sort_fields = ("-player_score",)
+
     def __init__(self) -> None:
         super().__init__()
         self.name = "rounds_default"
@@ -35,34 +38,16 @@ class ScoreRoundsDefault(ScoreModeBase):
 
     def combine_scores(
         self,
-        scores: "list[list[TeamPlayerScore]]",
+        scores: "ScoreMatrix | list[list[TeamPlayerScore]]",
         maps: "list[MatchInfo]" = [],
         **kwargs,
     ) -> "list[TeamPlayerScore]":
-        combined_scores = []  # type: list[TeamPlayerScore]
-        for map_scores in scores:
-            for map_score in map_scores:
-                existing_score = next(
-                    (x for x in combined_scores if x.login == map_score.login), None
-                )
-                if existing_score:
-                    existing_score.player_score += map_score.player_score
-                else:
-                    combined_scores.append(map_score)
-        return combined_scores
+        return self.sum_scores_by_login(scores)
 
     def sort_scores(self, scores: "list[TeamPlayerScore]") -> "list[TeamPlayerScore]":
-        return sorted(scores, key=lambda x: (-x.player_score))
+        return self.sort_scores_by_key(scores)
 
     def update_placements(
         self, scores: "list[TeamPlayerScore]"
     ) -> "list[TeamPlayerScore]":
-        for i in range(0, len(scores)):
-            if i > 0:
-                if scores[i - 1].player_score == scores[i].player_score:
-                    scores[i].placement = scores[i - 1].placement
-                else:
-                    scores[i].placement = i + 1
-            else:
-                scores[i].placement = i + 1
-        return scores
+        return self.update_placements_by_key(scores)
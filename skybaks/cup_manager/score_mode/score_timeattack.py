@@ -1,6 +1,6 @@
 import logging
 
-from ..app_types import TeamPlayerScore
+from ..app_types import ScoreMatrix, TeamPlayerScore
 from ..models import MatchInfo
 from .score_base import ScoreModeBase
 
@@ -22,6 +22,10 @@ class ScoreTimeAttackDefault(ScoreModeBase):
     Sorting: Maps played descending, Summed finish time ascending
     """
 
+    sum_fields = ("player_score",)
+    count_maps = True
+    sort_fields = ("-count", "player_score")
+
     def __init__(self) -> None:
         super().__init__()
         self.name = "timeattack_default"
@@ -37,42 +41,19 @@ class ScoreTimeAttackDefault(ScoreModeBase):
 
     def combine_scores(
         self,
-        scores: "list[list[TeamPlayerScore]]",
+        scores: "ScoreMatrix | list[list[TeamPlayerScore]]",
         maps: "list[MatchInfo]" = [],
         **kwargs,
     ) -> "list[TeamPlayerScore]":
-        combined_scores = []  # type: list[TeamPlayerScore]
-        for map_scores in scores:
-            for map_score in map_scores:
-                existing_score = next(
-                    (x for x in combined_scores if x.login == map_score.login), None
-                )
-                if existing_score:
-                    existing_score.count += 1
-                    existing_score.player_score += map_score.player_score
-                else:
-                    map_score.count = 1
-                    combined_scores.append(map_score)
-        return combined_scores
+        return self.sum_scores_by_login(scores)
 
     def sort_scores(self, scores: "list[TeamPlayerScore]") -> "list[TeamPlayerScore]":
-        return sorted(scores, key=lambda x: (-x.count, x.player_score))
+        return self.sort_scores_by_key(scores)
 
     def update_placements(
         self, scores: "list[TeamPlayerScore]"
     ) -> "list[TeamPlayerScore]":
-        for i in range(len(scores)):
-            if i > 0:
-                if (
-                    scores[i - 1].count == scores[i].count
-                    and scores[i - 1].player_score == scores[i].player_score
-                ):
-                    scores[i].placement = scores[i - 1].placement
-                else:
-                    scores[i].placement = i + 1
-            else:
-                scores[i].placement = i + 1
-        return scores
+        return self.update_placements_by_key(scores)
 
 
 class ScoreTimeAttackPenaltyAuthorPlus15(ScoreTimeAttackDefault):
@@ -90,6 +71,10 @@ class ScoreTimeAttackPenaltyAuthorPlus15(ScoreTimeAttackDefault):
     Sorting: Summed finish time ascending
     """
 
+    # Penalties depend on the maps a player did not finish
+    sum_fields = ()
+    count_maps = False
+
     def __init__(self) -> None:
         super().__init__()
         self.name = "timeattack_penaltyauthorplus15"
@@ -98,38 +83,56 @@ class ScoreTimeAttackPenaltyAuthorPlus15(ScoreTimeAttackDefault):
 
     def combine_scores(
         self,
-        scores: "list[list[TeamPlayerScore]]",
+        scores: "ScoreMatrix | list[list[TeamPlayerScore]]",
         maps: "list[MatchInfo]" = [],
         **kwargs,
     ) -> "list[TeamPlayerScore]":
-        all_players = {}  # type: dict[str, TeamPlayerScore]
-        for map_scores in scores:
-            for player_map_score in map_scores:
-                if player_map_score.login not in all_players:
-                    all_players[player_map_score.login] = TeamPlayerScore(
-                        player_map_score.login,
-                        player_map_score.nickname,
-                        player_map_score.country,
-                        player_map_score.team_id,
-                        player_map_score.team_name,
-                        team_score=0,
-                        player_score=0,
-                        player_score2=0,
-                    )
-        combined_scores = list(all_players.values())  # type: list[TeamPlayerScore]
-        for map_scores, map_info in zip(scores, maps):
+        matrix = ScoreMatrix.from_scores(scores)
+        # Map and index of the first score of each row, in first seen order
+        first_scores = {}  # type: dict[int, tuple[int, int]]
+        for map_index, map_rows in enumerate(matrix.map_rows):
+            for index, row in enumerate(map_rows):
+                if row not in first_scores:
+                    first_scores[row] = (map_index, index)
+
+        finish_times = [0] * len(matrix.logins)
+        map_penalties = []  # type: list[int]
+        for map_index, map_info in zip(range(len(matrix)), maps):
             map_penalty = 15000
             if map_info.medal_author:
                 map_penalty += map_info.medal_author
+            map_penalties.append(map_penalty)
 
-            for combined_player_score in combined_scores:
-                map_player_score = next(
-                    (x for x in map_scores if x.login == combined_player_score.login),
-                    None,
-                )
-                if map_player_score:
-                    combined_player_score.player_score += map_player_score.player_score
-                else:
-                    combined_player_score.player_score += map_penalty
+            # Only the first score of a player on a map counts
+            counted_rows = bytearray(len(matrix.presence[map_index]))
+            for row, finish_time in zip(
+                matrix.map_rows[map_index], matrix.columns["player_score"][map_index]
+            ):
+                if not counted_rows[row]:
+                    counted_rows[row] = 1
+                    finish_times[row] += finish_time
 
+        combined_scores = []  # type: list[TeamPlayerScore]
+        for row, (map_index, index) in first_scores.items():
+            nickname, country, team_id, team_name = matrix.players[
+                matrix.map_players[map_index][index]
+            ]
+            # Maps without the row in their presence mask were not finished
+            missed_penalties = sum(
+                map_penalty
+                for presence, map_penalty in zip(matrix.presence, map_penalties)
+                if row >= len(presence) or not presence[row]
+            )
+            combined_scores.append(
+                TeamPlayerScore(
+                    matrix.logins[row],
+                    nickname,
+                    country,
+                    team_id,
+                    team_name,
+                    team_score=0,
+                    player_score=finish_times[row] + missed_penalties,
+                    player_score2=0,
+                )
+            )
         return combined_scores
@@ -0,0 +1,75 @@
+import random
+
+from ...app_types import TeamPlayerScore
+from ...models import MatchInfo
+
+
+def create_scores(
+    map_count: int, player_count: int, seed: int = 0
+) -> "tuple[list[list[TeamPlayerScore]], list[MatchInfo]]":
+    rng = random.Random(seed)
+    scores = []  # type: list[list[TeamPlayerScore]]
+    maps = []  # type: list[MatchInfo]
+    for map_index in range(map_count):
+        map_scores = []  # type: list[TeamPlayerScore]
+        # Most players play every map, some miss a few
+        for index in range(player_count):
+            if rng.random() < 0.9:
+                map_scores.append(
+                    TeamPlayerScore(
+                        f"p{index:03d}",
+                        f"player {index:03d}",
+                        "France",
+                        index % 2,
+                        "Team",
+                        rng.randint(0, 5),
+                        rng.randint(30000, 60000),
+                        rng.randint(0, 20),
+                    )
+                )
+        rng.shuffle(map_scores)
+        scores.append(map_scores)
+        maps.append(
+            MatchInfo(
+                map_start_time=1000 + map_index,
+                mode_script="Trackmania/TM_TimeAttack_Online.Script.txt",
+                medal_author=40000,
+            )
+        )
+    return scores, maps
+
+
+def combine_penalty_by_search(
+    scores: "list[list[TeamPlayerScore]]", maps: "list[MatchInfo]"
+) -> "list[TeamPlayerScore]":
+    # Previous ScoreTimeAttackPenaltyAuthorPlus15.combine_scores, searching the
+    # map scores of every player on every map
+    all_players = {}  # type: dict[str, TeamPlayerScore]
+    for map_scores in scores:
+        for player_map_score in map_scores:
+            if player_map_score.login not in all_players:
+                all_players[player_map_score.login] = TeamPlayerScore(
+                    player_map_score.login,
+                    player_map_score.nickname,
+                    player_map_score.country,
+                    player_map_score.team_id,
+                    player_map_score.team_name,
+                    team_score=0,
+                    player_score=0,
+                    player_score2=0,
+                )
+    combined_scores = list(all_players.values())  # type: list[TeamPlayerScore]
+    for map_scores, map_info in zip(scores, maps):
+        map_penalty = 15000
+        if map_info.medal_author:
+            map_penalty += map_info.medal_author
+        for combined_player_score in combined_scores:
+            map_player_score = next(
+                (x for x in map_scores if x.login == combined_player_score.login),
+                None,
+            )
+            if map_player_score:
+                combined_player_score.player_score += map_player_score.player_score
+            else:
+                combined_player_score.player_score += map_penalty
+    return combined_scores
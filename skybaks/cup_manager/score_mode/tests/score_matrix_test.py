@@ -0,0 +1,111 @@
+import unittest
+from array import array
+from copy import deepcopy
+
+from ...app_types import ScoreMatrix, TeamPlayerScore
+from .. import (
+    ScoreLapsDefault,
+    ScoreModeFallback,
+    ScoreModeMixed,
+    ScoreModeMixedGolf,
+    ScoreRoundsDefault,
+    ScoreTimeAttackDefault,
+    ScoreTimeAttackPenaltyAuthorPlus15,
+)
+from .helpers import create_scores
+
+
+def create_map_scores() -> "list[list[TeamPlayerScore]]":
+    return [
+        [
+            TeamPlayerScore("p01", "player 01", "France", 1, "Red", 3, 26, 1),
+            TeamPlayerScore("p02", "player 02", "France", 2, "Blu", 4, 19, 2),
+        ],
+        [
+            TeamPlayerScore("p03", "player 03", "France", 1, "Red", 0, 21, 0),
+            TeamPlayerScore("p01", "player 01", "France", 1, "Red", 0, 20, 3),
+        ],
+    ]
+
+
+class ScoreMatrixTest(unittest.TestCase):
+    def test_from_scores(self):
+        matrix = ScoreMatrix.from_scores(create_map_scores())
+        self.assertEqual(2, len(matrix))
+        self.assertEqual(4, matrix.score_count())
+        self.assertEqual(["p01", "p02", "p03"], matrix.logins)
+        self.assertEqual([0, 1], list(matrix.map_rows[0]))
+        self.assertEqual([2, 0], list(matrix.map_rows[1]))
+        self.assertIsInstance(matrix.columns["player_score"][0], array)
+        self.assertEqual([21, 20], list(matrix.columns["player_score"][1]))
+        # Equal player details are stored once
+        self.assertEqual(3, len(matrix.players))
+        self.assertTrue(matrix.has_score(1, "p01"))
+        self.assertFalse(matrix.has_score(1, "p02"))
+        self.assertFalse(matrix.has_score(0, "p03"))
+        self.assertFalse(matrix.has_score(0, "p04"))
+        self.assertEqual(create_map_scores()[1], matrix.map_scores(1))
+        self.assertIs(matrix, ScoreMatrix.from_scores(matrix))
+
+    def test_non_integer_columns(self):
+        map_scores = create_map_scores()
+        map_scores[0][0].player_score = 1.5
+        matrix = ScoreMatrix.from_scores(map_scores)
+        self.assertEqual([1.5, 19], matrix.columns["player_score"][0])
+        self.assertIsInstance(matrix.columns["player_score"][1], array)
+
+    def test_map_slices_share_columns(self):
+        matrix = ScoreMatrix.from_scores(create_map_scores())
+        second_map = matrix[1:]
+        self.assertEqual(1, len(second_map))
+        self.assertIs(matrix.logins, second_map.logins)
+        self.assertIs(matrix.map_rows[1], second_map.map_rows[0])
+        self.assertIs(
+            matrix.columns["player_score"][1], second_map.columns["player_score"][0]
+        )
+        self.assertIs(matrix.presence[1], second_map.presence[0])
+        reordered = matrix.select_maps([1, 0])
+        self.assertIs(matrix.map_rows[1], reordered.map_rows[0])
+        self.assertIs(matrix.map_rows[0], reordered.map_rows[1])
+
+    def test_place_map_scores(self):
+        matrix = ScoreMatrix.from_scores(create_map_scores() + [[]])
+        self.assertEqual(
+            [(0, 1), (1, 2)], ScoreRoundsDefault().place_map_scores(matrix, 0)
+        )
+        self.assertEqual(
+            [(1, 1), (0, 2)], ScoreTimeAttackDefault().place_map_scores(matrix, 1)
+        )
+        self.assertEqual([], ScoreLapsDefault().place_map_scores(matrix, 2))
+        # Modes without sort_fields place TeamPlayerScore objects
+        self.assertEqual(
+            ScoreRoundsDefault().place_map_scores(matrix, 1),
+            ScoreModeMixed().place_map_scores(matrix, 1),
+        )
+
+    def test_score_modes_accept_matrix(self):
+        scores, maps = create_scores(6, 20)
+        matrix = ScoreMatrix.from_scores(scores)
+        for sorting_class in [
+            ScoreRoundsDefault,
+            ScoreTimeAttackDefault,
+            ScoreTimeAttackPenaltyAuthorPlus15,
+            ScoreLapsDefault,
+            ScoreModeFallback,
+            ScoreModeMixed,
+            ScoreModeMixedGolf,
+        ]:
+            sorting = sorting_class()
+            # Standings after each map from a slice of the matrix
+            for map_count in range(len(maps) + 1):
+                with self.subTest(sorting=sorting_class.__name__, maps=map_count):
+                    self.assertEqual(
+                        sorting.combine_scores(
+                            deepcopy(scores[:map_count]), maps[:map_count]
+                        ),
+                        sorting.combine_scores(matrix[:map_count], maps[:map_count]),
+                    )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,8 @@
 import unittest
 
 from ...app_types import TeamPlayerScore
-from ...models import MatchInfo
-from ..score_mixed import ScoreModeMixed
+from ...models import MatchInfo, MatchResult
+from ..score_mixed import ScoreModeMixed, ScoreModeMixedGolf
 
 
 def create_results_rounds() -> "list[TeamPlayerScore]":
@@ -85,6 +85,44 @@ class ScoreModeMixedTest(unittest.TestCase):
         self.assertEqual(2 + 3 + 1, results[5].player_score)
         self.assertEqual(1 + 2 + 5, results[6].player_score)
 
+    def test_combine_scores_match_results(self):
+        maps = [
+            MatchInfo(map_start_time=1000, mode_script="rounds"),
+            MatchInfo(map_start_time=1001, mode_script="timeattack"),
+        ]
+        ta_points = {
+            s.login: s.player_score
+            for s in ScoreModeMixed().combine_scores([create_results_ta()], maps[1:])
+        }
+        match_results = {
+            1000: {
+                s.login: MatchResult(
+                    login=s.login, score_mode="rounds_default", placement=1
+                )
+                for s in create_results_rounds()
+            },
+            1001: {
+                s.login: MatchResult(
+                    login=s.login, score_mode="laps_default", placement=1
+                )
+                for s in create_results_ta()
+            },
+        }
+        results = ScoreModeMixed().combine_scores(
+            [create_results_rounds(), create_results_ta()],
+            maps,
+            match_results=match_results,
+        )
+        # Stored placements are used, results of another score mode are not
+        self.assertEqual(7, len(results))
+        for result in results:
+            self.assertEqual(7 + ta_points.get(result.login, 0), result.player_score)
+
+        results = ScoreModeMixedGolf().combine_scores(
+            [create_results_rounds()], maps[:1], match_results=match_results
+        )
+        self.assertEqual([1] * 7, [s.player_score for s in results])
+
     def test_sort_scores(self):
         sorting = ScoreModeMixed()
         results = sorting.combine_scores(
@@ -108,6 +108,46 @@ class ScoreModeBaseTest(unittest.TestCase):
         self.assertEqual(2, len(ties["p05"]))
         self.assertEqual(2, len(ties["p06"]))
 
+    def test_sum_scores_by_login(self):
+        sorting = ScoreModeBaseImpl()
+        combined = sorting.sum_scores_by_login(
+            [create_results3(), create_results3()[1:], create_results3()[2:]],
+            ("player_score", "team_score"),
+            True,
+        )
+        self.assertEqual(
+            ["p01", "p02", "p03", "p04", "p05"], [s.login for s in combined]
+        )
+        self.assertEqual([26, 38, 57, 63, 57], [s.player_score for s in combined])
+        self.assertEqual([3, 6, 12, 12, 9], [s.team_score for s in combined])
+        self.assertEqual([1, 2, 3, 3, 3], [s.count for s in combined])
+        # Fields default to the ones declared by the score mode
+        self.assertEqual(
+            [26, 19],
+            [
+                s.player_score
+                for s in sorting.sum_scores_by_login([create_results3()[:2]] * 2)
+            ],
+        )
+
+    def test_get_tie_groups(self):
+        results = create_results()
+        sorting = ScoreModeBaseImpl()
+        for result, placement in zip(results, [1, 1, 3, 4, 4, 4, 7]):
+            result.placement = placement
+        tie_groups = sorting.get_tie_groups(results)
+        self.assertEqual([1, 4], sorted(tie_groups.by_placement.keys()))
+        self.assertEqual(["p01", "p02"], tie_groups.logins(1))
+        self.assertEqual(["p04", "p05", "p06"], tie_groups.logins(4))
+        self.assertEqual([], tie_groups.logins(3))
+        self.assertIn("p05", tie_groups)
+        self.assertNotIn("p07", tie_groups)
+        self.assertIs(tie_groups.by_login["p04"], tie_groups.by_login["p06"])
+        self.assertEqual(3, tie_groups.size("p05"))
+        self.assertEqual(1, tie_groups.size("p03"))
+        self.assertEqual(["p04", "p06"], [s.login for s in tie_groups.others("p05")])
+        self.assertEqual([], tie_groups.others("p07"))
+
     def test_update_score_is_time(self):
         results = create_results()
         sorting = ScoreModeBaseImpl()
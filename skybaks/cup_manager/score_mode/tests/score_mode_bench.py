@@ -0,0 +1,149 @@
+import time
+import unittest
+from copy import deepcopy
+from unittest import mock
+
+from ...app_types import ScoreMatrix, TeamPlayerScore
+from .. import (
+    ScoreLapsDefault,
+    ScoreModeBase,
+    ScoreModeFallback,
+    ScoreModeMixed,
+    ScoreRoundsDefault,
+    ScoreTimeAttackDefault,
+    ScoreTimeAttackPenaltyAuthorPlus15,
+)
+from .. import vectorized
+from .helpers import combine_penalty_by_search, create_scores
+
+
+def combine_scores_by_search(
+    sorting: ScoreModeBase, scores: "list[list[TeamPlayerScore]]"
+) -> "list[TeamPlayerScore]":
+    # Previous combine_scores of the summing modes, searching the combined
+    # list for every map score
+    combined_scores = []  # type: list[TeamPlayerScore]
+    for map_scores in scores:
+        for map_score in map_scores:
+            existing_score = next(
+                (x for x in combined_scores if x.login == map_score.login), None
+            )
+            if existing_score:
+                for field in sorting.sum_fields:
+                    setattr(
+                        existing_score,
+                        field,
+                        getattr(existing_score, field) + getattr(map_score, field),
+                    )
+                if sorting.count_maps:
+                    existing_score.count += 1
+            else:
+                if sorting.count_maps:
+                    map_score.count = 1
+                combined_scores.append(map_score)
+    return combined_scores
+
+
+class ScoreModeBench(unittest.TestCase):
+    def test_combine_300_players_30_maps(self):
+        scores, maps = create_scores(30, 300)
+        iterations = 10
+        for sorting_class in [
+            ScoreRoundsDefault,
+            ScoreTimeAttackDefault,
+            ScoreLapsDefault,
+            ScoreModeFallback,
+            ScoreModeMixed,
+        ]:
+            sorting = sorting_class()
+            elapsed = 0.0
+            for _ in range(iterations):
+                scores_copy = deepcopy(scores)
+                start = time.perf_counter()
+                combined = sorting.combine_scores(scores_copy, maps)
+                elapsed += time.perf_counter() - start
+            self.assertEqual(300, len(combined))
+            message = (
+                f"\n{sorting_class.__name__}: {elapsed / iterations * 1000:.2f} ms"
+            )
+
+            if sorting.sum_fields:
+                elapsed_search = 0.0
+                for _ in range(iterations):
+                    scores_copy = deepcopy(scores)
+                    start = time.perf_counter()
+                    combined_search = combine_scores_by_search(sorting, scores_copy)
+                    elapsed_search += time.perf_counter() - start
+                self.assertEqual(combined_search, combined)
+                message += f", searching the combined list {elapsed_search / iterations * 1000:.2f} ms"
+            print(message)
+
+    def test_penalty_250_players_40_maps(self):
+        scores, maps = create_scores(40, 250)
+        sorting = ScoreTimeAttackPenaltyAuthorPlus15()
+        iterations = 10
+        elapsed = 0.0
+        elapsed_search = 0.0
+        for _ in range(iterations):
+            start = time.perf_counter()
+            combined = sorting.combine_scores(scores, maps)
+            elapsed += time.perf_counter() - start
+            start = time.perf_counter()
+            combined_search = combine_penalty_by_search(scores, maps)
+            elapsed_search += time.perf_counter() - start
+        self.assertEqual(combined_search, combined)
+        print(
+            f"\nScoreTimeAttackPenaltyAuthorPlus15: {elapsed / iterations * 1000:.2f} ms, searching the map scores {elapsed_search / iterations * 1000:.2f} ms"
+        )
+
+    def test_standings_after_each_of_30_maps(self):
+        scores, maps = create_scores(30, 300)
+        sorting = ScoreTimeAttackDefault()
+        start = time.perf_counter()
+        standings_lists = [
+            sorting.combine_scores(scores[:map_count], maps[:map_count])
+            for map_count in range(1, len(maps) + 1)
+        ]
+        elapsed_lists = time.perf_counter() - start
+        start = time.perf_counter()
+        matrix = ScoreMatrix.from_scores(scores)
+        standings_matrix = [
+            sorting.combine_scores(matrix[:map_count], maps[:map_count])
+            for map_count in range(1, len(maps) + 1)
+        ]
+        elapsed_matrix = time.perf_counter() - start
+        self.assertEqual(standings_lists, standings_matrix)
+        print(
+            f"\nStandings after each map: map slices of one matrix {elapsed_matrix * 1000:.1f} ms, lists of scores {elapsed_lists * 1000:.1f} ms"
+        )
+
+    @unittest.skipUnless(vectorized.np is not None, "NumPy is not installed")
+    def test_standings_2000_players_100_maps(self):
+        scores, maps = create_scores(100, 2000)
+        # Standings are combined from a matrix filled from the stored scores
+        matrix = ScoreMatrix.from_scores(scores)
+        for sorting_class in [ScoreTimeAttackDefault, ScoreLapsDefault]:
+            sorting = sorting_class()
+            results = {}  # type: dict[str, tuple[float, list[tuple]]]
+            for backend, numpy_module in [("python", None), ("numpy", vectorized.np)]:
+                with mock.patch.object(vectorized, "np", numpy_module):
+                    start = time.perf_counter()
+                    standings = sorting.update_placements(
+                        sorting.sort_scores(sorting.combine_scores(matrix, maps))
+                    )
+                    elapsed = time.perf_counter() - start
+                results[backend] = (
+                    elapsed,
+                    [
+                        (s.login, s.player_score, s.player_score2, s.count, s.placement)
+                        for s in standings
+                    ],
+                )
+            self.assertEqual(results["python"][1], results["numpy"][1])
+            print(
+                f"\n{sorting_class.__name__}: python {results['python'][0] * 1000:.1f} ms, numpy {results['numpy'][0] * 1000:.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
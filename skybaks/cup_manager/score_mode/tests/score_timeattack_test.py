@@ -1,3 +1,4 @@
+import random
 import unittest
 from copy import deepcopy
 
@@ -7,6 +8,7 @@ from ..score_timeattack import (
     ScoreTimeAttackDefault,
     ScoreTimeAttackPenaltyAuthorPlus15,
 )
+from .helpers import combine_penalty_by_search, create_scores
 
 
 def create_results_ta1() -> "list[TeamPlayerScore]":
@@ -181,6 +183,24 @@ class ScoreTimeAttackPenaltyAuthorPlus15Test(unittest.TestCase):
         self.assertEqual(5, results[4].placement)
         self.assertEqual(6, results[5].placement)
 
+    def test_combine_scores_matches_search(self):
+        sorting = ScoreTimeAttackPenaltyAuthorPlus15()
+        for seed in range(20):
+            rng = random.Random(seed)
+            scores, maps = create_scores(rng.randint(1, 12), rng.randint(1, 30), seed)
+            for map_info in maps:
+                map_info.medal_author = rng.choice([None, 0, rng.randint(1, 60000)])
+            # A duplicate score on a map and scores of a map without map info
+            if scores[0]:
+                scores[0].append(deepcopy(scores[0][0]))
+            if rng.random() < 0.3:
+                scores.append(deepcopy(scores[-1]))
+            with self.subTest(seed=seed):
+                self.assertEqual(
+                    combine_penalty_by_search(scores, maps),
+                    sorting.combine_scores(scores, maps),
+                )
+
 
 if __name__ == "__main__":
     unittest.main()
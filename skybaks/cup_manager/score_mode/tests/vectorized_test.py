@@ -0,0 +1,89 @@
+import random
+import unittest
+from copy import deepcopy
+from unittest import mock
+
+from ...app_types import ScoreMatrix, TeamPlayerScore
+from .. import (
+    ScoreLapsDefault,
+    ScoreModeBase,
+    ScoreModeFallback,
+    ScoreModeMixed,
+    ScoreRoundsDefault,
+    ScoreTimeAttackDefault,
+    ScoreTimeAttackPenaltyAuthorPlus15,
+)
+from .. import vectorized
+from .helpers import create_scores
+
+
+def standings(
+    sorting: ScoreModeBase, scores: "list[list[TeamPlayerScore]]", maps
+) -> "list[tuple]":
+    combined = sorting.combine_scores(deepcopy(scores), maps)
+    placed = sorting.update_placements(sorting.sort_scores(combined))
+    return [
+        (
+            score.login,
+            score.nickname,
+            score.team_score,
+            score.player_score,
+            score.player_score2,
+            score.count,
+            score.placement,
+        )
+        for score in placed
+    ]
+
+
+@unittest.skipUnless(vectorized.np is not None, "NumPy is not installed")
+class VectorizedTest(unittest.TestCase):
+    def test_identical_to_python(self):
+        for seed in range(5):
+            scores, maps = create_scores(12, 60, seed)
+            # Narrow score ranges to get ties
+            rng = random.Random(seed)
+            for map_scores in scores:
+                for map_score in map_scores:
+                    map_score.player_score = rng.randint(0, 4)
+            for sorting_class in [
+                ScoreRoundsDefault,
+                ScoreTimeAttackDefault,
+                ScoreTimeAttackPenaltyAuthorPlus15,
+                ScoreLapsDefault,
+                ScoreModeFallback,
+                ScoreModeMixed,
+            ]:
+                with self.subTest(sorting=sorting_class.__name__, seed=seed):
+                    with mock.patch.object(vectorized, "VECTORIZE_MIN_SCORES", 0):
+                        vectorized_standings = standings(sorting_class(), scores, maps)
+                    with mock.patch.object(vectorized, "np", None):
+                        python_standings = standings(sorting_class(), scores, maps)
+                    self.assertEqual(python_standings, vectorized_standings)
+
+    def test_placements(self):
+        np = vectorized.np
+        columns = [np.array([-3, -3, -2, -2, -2, 0]), np.array([1, 1, 5, 5, 6, 0])]
+        self.assertEqual([1, 1, 3, 3, 5, 6], vectorized.placements(columns))
+        self.assertEqual([1, 1, 2, 2, 3, 4], vectorized.placements(columns, True))
+        self.assertEqual([], vectorized.placements([np.array([])]))
+
+    def test_non_integer_scores_fall_back(self):
+        scores = [
+            [TeamPlayerScore("p1", "p1", "", 0, "", 0, 1.5, 0)],
+            [TeamPlayerScore("p1", "p1", "", 0, "", 0, None, 0)],
+        ]
+        self.assertIsNone(
+            vectorized.sum_scores_by_login(
+                ScoreMatrix.from_scores(scores), ("player_score",), False
+            )
+        )
+        self.assertIsNone(vectorized.sort_scores(scores[1], ("player_score",)))
+
+    def test_small_standings_stay_in_python(self):
+        self.assertFalse(vectorized.available(10))
+        self.assertTrue(vectorized.available(vectorized.VECTORIZE_MIN_SCORES))
+
+
+if __name__ == "__main__":
+    unittest.main()
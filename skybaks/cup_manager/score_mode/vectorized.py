@@ -0,0 +1,161 @@
+import logging
+from array import array
+
+from ..app_types import ScoreMatrix, TeamPlayerScore
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# Smallest number of scores handed to NumPy, below it the conversion costs
+# more than the pure Python path
+VECTORIZE_MIN_SCORES = 2000
+
+
+def available(score_count: int = VECTORIZE_MIN_SCORES) -> bool:
+    """
+    Whether NumPy is installed and score_count scores are worth vectorizing
+    """
+    return np is not None and score_count >= VECTORIZE_MIN_SCORES
+
+
+def _int_column(values: list):
+    """
+    Integer array of the values, or None when they are not all integers
+    """
+    column = np.asarray(values)
+    if column.dtype.kind not in "iub":
+        return None
+    return column.astype(np.int64)
+
+
+def _matrix_column(columns: "list[array | list]"):
+    """
+    Integer array of the per map columns of a ScoreMatrix laid end to end.
+    The array columns are read in place, None when a column holds other
+    values than integers.
+    """
+    parts = []
+    for column in columns:
+        if isinstance(column, array):
+            parts.append(np.frombuffer(column, dtype=np.int64))
+        else:
+            part = _int_column(column)
+            if part is None:
+                return None
+            parts.append(part)
+    if not parts:
+        return np.zeros(0, dtype=np.int64)
+    return np.concatenate(parts)
+
+
+def sum_scores_by_login(
+    matrix: ScoreMatrix,
+    sum_fields: "tuple[str, ...]",
+    count_maps: bool,
+) -> "list[TeamPlayerScore] | None":
+    """
+    Vectorized ScoreModeBase.sum_scores_by_login. The rows and columns of all
+    maps are laid end to end and the summed fields added up per row with
+    np.add.at. Returns None when a summed field holds other values than
+    integers.
+    """
+    rows = _matrix_column(matrix.map_rows)
+    if len(rows) == 0:
+        return []
+    totals = {}  # type: dict[str, list[int]]
+    for field in sum_fields:
+        values = _matrix_column(matrix.columns[field])
+        if values is None:
+            return None
+        field_totals = np.zeros(len(matrix.logins), dtype=np.int64)
+        np.add.at(field_totals, rows, values)
+        totals[field] = field_totals.tolist()
+    if count_maps:
+        counts = np.bincount(rows, minlength=len(matrix.logins)).tolist()
+
+    # Players in the order they are first seen, with the map and index of
+    # their first score
+    seen_rows, first_positions = np.unique(rows, return_index=True)
+    order = np.argsort(first_positions)
+    seen_rows = seen_rows[order].tolist()
+    first_positions = first_positions[order]
+    map_offsets = np.cumsum([0] + [len(map_rows) for map_rows in matrix.map_rows])
+    first_maps = np.searchsorted(map_offsets, first_positions, side="right") - 1
+    first_indexes = (first_positions - map_offsets[first_maps]).tolist()
+
+    combined_scores = []  # type: list[TeamPlayerScore]
+    for row, map_index, index in zip(seen_rows, first_maps.tolist(), first_indexes):
+        combined_score = matrix.get_score(map_index, index)
+        for field in sum_fields:
+            setattr(combined_score, field, totals[field][row])
+        if count_maps:
+            combined_score.count = counts[row]
+        combined_scores.append(combined_score)
+    return combined_scores
+
+
+def _key_columns(scores: "list[TeamPlayerScore]", sort_fields: "tuple[str, ...]"):
+    """
+    One integer column per sort field, negated for descending fields. None
+    when a field holds other values than integers.
+    """
+    columns = []
+    for field in sort_fields:
+        column = _int_column([getattr(score, field.lstrip("-")) for score in scores])
+        if column is None:
+            return None
+        columns.append(-column if field[0] == "-" else column)
+    return columns
+
+
+def sort_scores(
+    scores: "list[TeamPlayerScore]", sort_fields: "tuple[str, ...]"
+) -> "list[TeamPlayerScore] | None":
+    """
+    Order the scores by sort_fields with np.lexsort. Like sorted, scores with
+    equal keys keep their order.
+    """
+    columns = _key_columns(scores, sort_fields)
+    if columns is None:
+        return None
+    # lexsort orders by its last key first
+    order = np.lexsort(columns[::-1]).tolist()
+    return [scores[index] for index in order]
+
+
+def placements(columns: list, dense: bool = False) -> "list[int]":
+    """
+    Placements of rows already ordered by the key columns. Tied rows share a
+    placement, the row after a tie is placed by its position ("1, 1, 3")
+    unless dense is set ("1, 1, 2").
+    """
+    row_count = len(columns[0]) if columns else 0
+    if row_count == 0:
+        return []
+    new_key = np.zeros(row_count, dtype=bool)
+    new_key[0] = True
+    for column in columns:
+        new_key[1:] |= column[1:] != column[:-1]
+    if dense:
+        return np.cumsum(new_key).tolist()
+    positions = np.where(new_key, np.arange(1, row_count + 1), 0)
+    return np.maximum.accumulate(positions).tolist()
+
+
+def update_placements(
+    scores: "list[TeamPlayerScore]", sort_fields: "tuple[str, ...]"
+) -> "list[TeamPlayerScore] | None":
+    """
+    Vectorized placements of scores ordered by sort_fields, scores with equal
+    fields share a placement
+    """
+    columns = _key_columns(scores, sort_fields)
+    if columns is None:
+        return None
+    for score, placement in zip(scores, placements(columns)):
+        score.placement = placement
+    return scores
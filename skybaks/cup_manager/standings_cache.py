@@ -0,0 +1,78 @@
+import logging
+
+from .app_types import TeamPlayerScore
+from .score_mode import ScoreModeBase
+from .utils.lru_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of standings kept in memory
+STANDINGS_CACHE_SIZE = 200
+
+
+class StandingsCache:
+    """
+    Memoized results of ResultsCupManager.get_data_scores, keyed by the set of
+    matches and the name of the score mode. Each entry is tracked under every
+    match it was computed from, so a score change only drops the standings
+    which include that match.
+
+    Cached standings are a tuple of read-only TeamPlayerScore objects, the
+    flags the score mode set while combining them are restored on a hit.
+    """
+
+    def __init__(self, max_entries: int = STANDINGS_CACHE_SIZE) -> None:
+        self.entries = LRUCache(max_entries)
+        self._dependents = {}  # type: dict[int, set[tuple[frozenset[int], str]]]
+        self.version = 0
+
+    def __repr__(self) -> str:
+        return f"<StandingsCache {self.entries}>"
+
+    @staticmethod
+    def _key(
+        map_start_times: "list[int]", sorting: ScoreModeBase
+    ) -> "tuple[frozenset[int], str]":
+        return frozenset(map_start_times), sorting.name
+
+    def get(
+        self, map_start_times: "list[int]", sorting: ScoreModeBase
+    ) -> "tuple[TeamPlayerScore] | None":
+        entry = self.entries.get(self._key(map_start_times, sorting))
+        if entry is None:
+            return None
+        scores, display_state = entry
+        sorting.set_display_state(display_state)
+        return scores
+
+    def put(
+        self,
+        map_start_times: "list[int]",
+        sorting: ScoreModeBase,
+        scores: "list[TeamPlayerScore]",
+        version: int,
+    ) -> "tuple[TeamPlayerScore]":
+        """
+        Store standings computed while the cache was at version. Standings whose
+        matches changed in the meantime are returned but not stored.
+        """
+        frozen_scores = tuple(score.freeze() for score in scores)
+        if version == self.version:
+            key = self._key(map_start_times, sorting)
+            self.entries[key] = (frozen_scores, sorting.get_display_state())
+            for map_start_time in key[0]:
+                self._dependents.setdefault(map_start_time, set()).add(key)
+        return frozen_scores
+
+    def invalidate(self, map_start_time: int = 0) -> None:
+        """
+        Drop all standings which include the match, or everything for 0
+        """
+        self.version += 1
+        if map_start_time == 0:
+            self.entries.clear()
+            self._dependents = {}
+            return
+        for key in self._dependents.pop(map_start_time, set()):
+            if key in self.entries:
+                del self.entries[key]
@@ -0,0 +1,151 @@
+import asyncio
+import contextlib
+import logging
+import unittest
+from unittest import mock
+
+from peewee import SqliteDatabase
+from playhouse.test_utils import test_database
+
+from ..active import ActiveCupManager
+from ..models import CupInfo, CupMatch
+
+
+async def run_query(query):
+    # Rows are returned as a list like peewee_async does
+    result = query.execute()
+    return list(result) if hasattr(result, "__iter__") else result
+
+
+@contextlib.contextmanager
+def create_cup_database(cup_map_times: "dict[int, list[int]]"):
+    with test_database(
+        SqliteDatabase(":memory:"), [CupInfo, CupMatch]
+    ), contextlib.ExitStack() as stack:
+        for model in [CupInfo, CupMatch]:
+            stack.enter_context(
+                mock.patch.object(
+                    model, "execute", mock.AsyncMock(side_effect=run_query)
+                )
+            )
+        for cup_start_time, map_start_times in cup_map_times.items():
+            CupInfo.insert(
+                cup_start_time=cup_start_time,
+                cup_key="weekly",
+                cup_name="Weekly",
+                cup_edition=cup_start_time - 100,
+            ).execute()
+            for map_start_time in map_start_times:
+                CupMatch.insert(
+                    cup_start_time=cup_start_time, map_start_time=map_start_time
+                ).execute()
+        yield
+
+
+class ActiveCupSummaryTest(unittest.TestCase):
+    def setUp(self) -> None:
+        logging.disable(logging.CRITICAL)
+
+    def tearDown(self) -> None:
+        logging.disable(logging.NOTSET)
+
+    def test_cup_summaries(self):
+        with create_cup_database({101: [1000, 1001, 1002], 102: [], 103: [1010, 1005]}):
+            active = ActiveCupManager(mock.MagicMock())
+
+            async def run() -> None:
+                summaries = await active.get_data_cup_summaries()
+                self.assertEqual(
+                    [(103, 2, 1005, 1010), (102, 0, 0, 0), (101, 3, 1000, 1002)],
+                    [
+                        (
+                            summary.info.cup_start_time,
+                            summary.map_count,
+                            summary.first_map_start_time,
+                            summary.last_map_start_time,
+                        )
+                        for summary in summaries
+                    ],
+                )
+
+                # Cached: the listing does not query the cup matches again
+                with mock.patch.object(
+                    CupMatch, "execute", mock.AsyncMock(side_effect=AssertionError)
+                ):
+                    await active.get_data_cup_summaries()
+
+            asyncio.run(run())
+
+    def test_membership_change_refreshes_one_cup(self):
+        with create_cup_database({101: [1000], 102: [1001]}):
+            active = ActiveCupManager(mock.MagicMock())
+            active.cup_start_time = 102
+            active.match_start_times = [1001]
+
+            async def map_counts() -> "dict[int, int]":
+                return {
+                    summary.info.cup_start_time: summary.map_count
+                    for summary in await active.get_data_cup_summaries()
+                }
+
+            async def run() -> None:
+                self.assertEqual({101: 1, 102: 1}, await map_counts())
+                with mock.patch.object(
+                    active, "_query_cup_map_stats", wraps=active._query_cup_map_stats
+                ) as query_cup_map_stats:
+                    await active.add_selected_match(1002)
+                    self.assertEqual({101: 1, 102: 2}, await map_counts())
+                    await active.remove_selected_match(1002)
+                    await active.remove_selected_match(1001)
+                    self.assertEqual({101: 1, 102: 0}, await map_counts())
+                self.assertEqual(
+                    [mock.call(102)] * 3, query_cup_map_stats.call_args_list
+                )
+
+            asyncio.run(run())
+
+
+class ActiveCupQueryTest(unittest.TestCase):
+    def setUp(self) -> None:
+        logging.disable(logging.CRITICAL)
+
+    def tearDown(self) -> None:
+        logging.disable(logging.NOTSET)
+
+    def test_previous_edition(self):
+        with create_cup_database({101: [], 102: [], 103: []}):
+            active = ActiveCupManager(mock.MagicMock())
+            active.cup_key_name = "weekly"
+            active.cup_start_time = 103
+            self.assertEqual(2, asyncio.run(active._lookup_previous_edition()))
+            active.cup_key_name = "monthly"
+            self.assertEqual(0, asyncio.run(active._lookup_previous_edition()))
+
+    def test_cup_match_times_cached_per_cup(self):
+        with create_cup_database({101: [1000, 1001], 102: [1002]}):
+            active = ActiveCupManager(mock.MagicMock())
+            active.cup_start_time = 102
+
+            async def run() -> None:
+                self.assertEqual(
+                    [1000, 1001], await active.get_data_cup_match_times(101)
+                )
+                self.assertEqual([1002], await active.get_data_cup_match_times(102))
+                await active.add_selected_match(1003)
+                with mock.patch.object(
+                    CupMatch, "execute", mock.AsyncMock(side_effect=run_query)
+                ) as execute:
+                    self.assertEqual(
+                        [1000, 1001], await active.get_data_cup_match_times(101)
+                    )
+                    self.assertEqual(
+                        [1002, 1003], await active.get_data_cup_match_times(102)
+                    )
+                # Only the changed cup is read again
+                self.assertEqual(1, execute.await_count)
+
+            asyncio.run(run())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+import contextlib
+import random
+from types import SimpleNamespace
+from unittest import mock
+
+from peewee import SqliteDatabase
+from playhouse.test_utils import test_database
+
+from ..models import MapMxId, MatchInfo, MatchResult, PlayerScore, TeamScore
+
+MODELS = [MapMxId, MatchInfo, MatchResult, PlayerScore, TeamScore]
+
+
+async def run_query(query):
+    # Rows are returned as a list like peewee_async does
+    result = query.execute()
+    return list(result) if hasattr(result, "__iter__") else result
+
+
+@contextlib.contextmanager
+def bind_database(models: list = MODELS):
+    """
+    In memory database bound to the models. Model.execute runs the queries
+    synchronously on it through the yielded mock, which counts them.
+    """
+    statements = mock.AsyncMock(side_effect=run_query)
+    with test_database(
+        SqliteDatabase(":memory:"), models
+    ), contextlib.ExitStack() as stack:
+        for model in models:
+            stack.enter_context(mock.patch.object(model, "execute", statements))
+        yield statements
+
+
+def create_payload(player_count: int, points_offset: int = 0) -> "list[dict]":
+    return [
+        {
+            "player": SimpleNamespace(
+                login=f"p{index:03d}",
+                nickname=f"player {index:03d}",
+                flow=SimpleNamespace(
+                    zone=SimpleNamespace(country="France"), team_id=-1
+                ),
+            ),
+            "map_points": index + points_offset,
+        }
+        for index in range(player_count)
+    ]
+
+
+def create_app() -> mock.MagicMock:
+    app = mock.MagicMock()
+    app.instance.apps.apps = {}
+    app.instance.mode_manager.get_current_script = mock.AsyncMock(
+        return_value="Trackmania/TM_Rounds_Online.Script.txt"
+    )
+    app.instance.map_manager.current_map = SimpleNamespace(
+        name="Map",
+        uid="uid",
+        time_author=10000,
+        time_gold=11000,
+        time_silver=12000,
+        time_bronze=13000,
+    )
+    app.instance.chat = mock.AsyncMock()
+    return app
+
+
+@contextlib.contextmanager
+def create_database(
+    map_count: int, player_count: int, seed: int = 0, duplicates: int = 0
+):
+    """
+    In memory database filled with random scores. Model.execute runs the
+    queries synchronously on it. With duplicates the unique score indexes
+    are dropped and that many player and team scores are stored twice, as
+    in databases which were not deduplicated yet.
+    """
+    rng = random.Random(seed)
+    with bind_database():
+        player_rows = []
+        team_rows = []
+        for map_index in range(map_count):
+            map_start_time = 1000 + map_index
+            MatchInfo.insert(
+                map_start_time=map_start_time,
+                map_name=f"map {map_index}",
+                map_uid=f"uid{map_index}",
+                mx_id="",
+                mode_script="Trackmania/TM_Rounds_Online.Script.txt",
+            ).execute()
+            for index in rng.sample(range(player_count * 2), player_count):
+                player_rows.append(
+                    {
+                        "map_start_time": map_start_time,
+                        "login": f"p{index:04d}",
+                        "nickname": f"player {index:04d}",
+                        "country": "France",
+                        "score": rng.randint(0, 10),
+                        "score2": rng.randint(0, 3),
+                        "team": index % 2,
+                    }
+                )
+            for team_id, name in [(0, "Blue"), (1, "Red")]:
+                team_rows.append(
+                    {
+                        "map_start_time": map_start_time,
+                        "team_id": team_id,
+                        "name": name,
+                        "score": rng.randint(0, 3),
+                    }
+                )
+        if duplicates:
+            database = PlayerScore._meta.database
+            for model in [PlayerScore, TeamScore]:
+                for index in database.get_indexes(model._meta.db_table):
+                    if index.unique:
+                        database.execute_sql(f"DROP INDEX {index.name}")
+            player_rows += [
+                dict(row, nickname=f"{row['nickname']} copy", score=row["score"] + 1)
+                for row in rng.sample(player_rows, duplicates)
+            ]
+            team_rows += [
+                dict(row, name=f"{row['name']} copy", score=row["score"] + 1)
+                for row in rng.sample(team_rows, duplicates)
+            ]
+        for start in range(0, len(player_rows), 100):
+            PlayerScore.insert_many(player_rows[start : start + 100]).execute()
+        TeamScore.insert_many(team_rows).execute()
+        yield [1000 + map_index for map_index in range(map_count)]
+
+
+def score_fields(scores) -> "list[tuple]":
+    return [
+        (
+            score.login,
+            score.nickname,
+            score.team_id,
+            score.team_name,
+            score.team_score,
+            score.player_score,
+            score.player_score2,
+            score.count,
+            score.placement,
+        )
+        for score in scores
+    ]
@@ -0,0 +1,223 @@
+import asyncio
+import random
+import unittest
+from copy import deepcopy
+from unittest import mock
+
+from ..active import ActiveCupManager
+from ..app_types import GenericPlayerScore, GenericTeamScore, TeamPlayerScore
+from ..live_standings import LiveStandings
+from ..score_mode import (
+    ScoreLapsDefault,
+    ScoreModeBase,
+    ScoreModeFallback,
+    ScoreRoundsDefault,
+    ScoreTimeAttackDefault,
+    ScoreTimeAttackPenaltyAuthorPlus15,
+)
+
+
+def create_map_scores(
+    rng: random.Random, player_count: int, team_scores: "dict[int, int]"
+) -> "list[TeamPlayerScore]":
+    map_scores = []  # type: list[TeamPlayerScore]
+    for index in rng.sample(range(player_count * 2), player_count):
+        team_id = index % 2
+        map_scores.append(
+            TeamPlayerScore(
+                f"p{index:03d}",
+                f"player {index:03d}",
+                "France",
+                team_id,
+                None,
+                team_scores.get(team_id, 0),
+                rng.randint(0, 5),
+                rng.randint(0, 2),
+            )
+        )
+    return map_scores
+
+
+def full_placements(
+    sorting: ScoreModeBase, matches_scores: "list[list[TeamPlayerScore]]"
+) -> "dict[str, int]":
+    scores = sorting.combine_scores(deepcopy(matches_scores))
+    scores = sorting.sort_scores(scores)
+    scores = sorting.update_placements(scores)
+    return {score.login: score.placement for score in scores}
+
+
+class LiveStandingsTest(unittest.TestCase):
+    def check_against_full(self, sorting: ScoreModeBase, seed: int) -> None:
+        rng = random.Random(seed)
+        finished_scores = [
+            create_map_scores(rng, 20, {0: rng.randint(0, 3), 1: rng.randint(0, 3)})
+            for _ in range(3)
+        ]
+        live = LiveStandings(sorting, [1000, 1001, 1002], 1003)
+        live.load(finished_scores, [])
+        self.assertEqual(full_placements(sorting, finished_scores), live.placements)
+
+        current_scores = {}  # type: dict[str, TeamPlayerScore]
+        current_teams = {0: 0, 1: 0}
+        for _ in range(15):
+            placements_before = dict(live.placements)
+            changed_players = []  # type: list[GenericPlayerScore]
+            for index in rng.sample(range(40), rng.randint(1, 8)):
+                previous = current_scores.get(f"p{index:03d}")
+                changed_players.append(
+                    GenericPlayerScore(
+                        f"p{index:03d}",
+                        f"player {index:03d}",
+                        "France",
+                        (previous.player_score if previous else 0) + rng.randint(0, 5),
+                        score2=rng.randint(0, 2),
+                        team=index % 2,
+                    )
+                )
+            changed_teams = []  # type: list[GenericTeamScore]
+            if rng.random() < 0.3:
+                team_id = rng.randint(0, 1)
+                current_teams[team_id] += 1
+                changed_teams.append(
+                    GenericTeamScore(team_id, "Team", current_teams[team_id])
+                )
+            for player_score in changed_players:
+                current_scores[player_score.login] = TeamPlayerScore(
+                    player_score.login,
+                    player_score.nickname,
+                    player_score.country,
+                    player_score.team,
+                    None,
+                    0,
+                    player_score.score,
+                    player_score.score2,
+                )
+            for current_score in current_scores.values():
+                current_score.team_score = current_teams[current_score.team_id]
+
+            changes = live.update(changed_teams, changed_players)
+
+            expected = full_placements(
+                sorting, finished_scores + [list(current_scores.values())]
+            )
+            self.assertEqual(expected, live.placements)
+            self.assertEqual(
+                {
+                    login: (placements_before.get(login, 0), placement)
+                    for login, placement in expected.items()
+                    if placements_before.get(login, 0) != placement
+                },
+                changes,
+            )
+            self.assertEqual(
+                sorted(expected.values()),
+                [score.placement for score in live.get_scores()],
+            )
+
+    def test_matches_full_standings(self) -> None:
+        for sorting_class in [
+            ScoreRoundsDefault,
+            ScoreTimeAttackDefault,
+            ScoreLapsDefault,
+            ScoreModeFallback,
+        ]:
+            for seed in range(10):
+                with self.subTest(sorting=sorting_class.__name__, seed=seed):
+                    self.check_against_full(sorting_class(), seed)
+
+    def test_next_map_keeps_standings(self) -> None:
+        rng = random.Random(1)
+        sorting = ScoreTimeAttackDefault()
+        finished_scores = [create_map_scores(rng, 10, {}) for _ in range(2)]
+        live = LiveStandings(sorting, [1000], 1001)
+        live.load(finished_scores[:1], finished_scores[1])
+        placements = dict(live.placements)
+
+        live.next_map(1002)
+        self.assertTrue(live.matches(sorting, [1000, 1001], 1002))
+        self.assertEqual({}, live.update([], []))
+        self.assertEqual(placements, live.placements)
+
+        changes = live.update([], [GenericPlayerScore("p000", "player 000", "", 3)])
+        current_scores = [TeamPlayerScore("p000", "player 000", "", 0, None, 0, 3, 0)]
+        self.assertEqual(
+            full_placements(sorting, finished_scores + [current_scores]),
+            live.placements,
+        )
+        self.assertIn("p000", changes)
+
+    def test_supported_modes(self) -> None:
+        self.assertTrue(LiveStandings.supports(ScoreRoundsDefault()))
+        self.assertFalse(LiveStandings.supports(ScoreTimeAttackPenaltyAuthorPlus15()))
+        self.assertFalse(LiveStandings.supports(None))
+
+
+class ActiveLiveStandingsTest(unittest.TestCase):
+    def test_scores_update_announces_placement_changes(self) -> None:
+        app = mock.MagicMock()
+        app.instance.chat = mock.AsyncMock()
+        app.results.get_data_team_player_scores = mock.AsyncMock(
+            return_value=[
+                [
+                    TeamPlayerScore("p1", "player 1", "", 0, None, 0, 10, 0),
+                    TeamPlayerScore("p2", "player 2", "", 0, None, 0, 5, 0),
+                ],
+                [],
+            ]
+        )
+        active = ActiveCupManager(app)
+        active.match_start_times = [1000, 1001]
+        active.score_sorting = ScoreRoundsDefault()
+
+        async def run() -> None:
+            await active._notify_scores_update(1001, team_scores=[], player_scores=[])
+            self.assertEqual({"p1": 1, "p2": 2}, active.live_standings.placements)
+            app.instance.chat.assert_not_awaited()
+
+            await active._notify_scores_update(
+                1001,
+                team_scores=[],
+                player_scores=[GenericPlayerScore("p2", "player 2", "", 6)],
+            )
+            self.assertEqual({"p1": 2, "p2": 1}, active.live_standings.placements)
+            self.assertEqual(2, app.instance.chat.await_count)
+            # Finished maps are only loaded once
+            app.results.get_data_team_player_scores.assert_awaited_once()
+
+        asyncio.run(run())
+
+    def test_fallback_keeps_previous_placements(self) -> None:
+        app = mock.MagicMock()
+        app.instance.chat = mock.AsyncMock()
+        app.results.get_data_team_player_scores = mock.AsyncMock(
+            return_value=[
+                [
+                    TeamPlayerScore("p1", "player 1", "", 0, None, 0, 10, 0),
+                    TeamPlayerScore("p2", "player 2", "", 0, None, 0, 5, 0),
+                ],
+                [],
+            ]
+        )
+        fallback_scores = [
+            TeamPlayerScore("p2", "player 2", "", 0, None, 0, 20, 0),
+            TeamPlayerScore("p1", "player 1", "", 0, None, 0, 10, 0),
+        ]
+        fallback_scores[0].placement = 1
+        fallback_scores[1].placement = 2
+        app.results.get_data_scores = mock.AsyncMock(return_value=fallback_scores)
+        active = ActiveCupManager(app)
+        active.match_start_times = [1000, 1001]
+        active.score_sorting = ScoreRoundsDefault()
+
+        async def run() -> None:
+            await active._notify_scores_update(1001, team_scores=[], player_scores=[])
+            self.assertEqual({"p1": 1, "p2": 2}, active.live_standings.placements)
+
+            # Without the changed scores the standings are combined again
+            await active._notify_scores_update(1001)
+            self.assertIsNone(active.live_standings)
+            self.assertIs(fallback_scores, active.cached_scores)
+            self.assertEqual(2, app.instance.chat.await_count)
+
+        asyncio.run(run())
@@ -0,0 +1,54 @@
+import unittest
+
+from ..utils.lru_cache import LRUCache
+
+
+class LRUCacheTest(unittest.TestCase):
+    def test_entry_budget(self) -> None:
+        cache = LRUCache(max_size=2)
+        cache[1] = "a"
+        cache[2] = "b"
+        self.assertEqual("a", cache.get(1))
+        cache[3] = "c"
+        # 2 was the least recently used entry
+        self.assertNotIn(2, cache)
+        self.assertIn(1, cache)
+        self.assertIn(3, cache)
+        self.assertIsNone(cache.get(2))
+        self.assertEqual((1, 1, 1), (cache.hits, cache.misses, cache.evictions))
+
+    def test_row_budget(self) -> None:
+        cache = LRUCache(max_size=10, size_of=len)
+        cache[1] = [0] * 4
+        cache[2] = [0] * 4
+        self.assertEqual(8, cache.size)
+        cache[1] = [0] * 6
+        self.assertEqual(10, cache.size)
+        cache[3] = [0] * 3
+        self.assertEqual([1, 3], [key for key in [1, 2, 3] if key in cache])
+        self.assertEqual(9, cache.size)
+        del cache[3]
+        self.assertEqual(6, cache.size)
+        cache.clear()
+        self.assertEqual((0, 0), (len(cache), cache.size))
+
+    def test_pinned(self) -> None:
+        pinned = [1, 2]
+        cache = LRUCache(max_size=2, get_pinned=lambda: pinned)
+        for key in range(1, 6):
+            cache[key] = key
+        # The pinned entries use up the budget, so new ones do not stay
+        self.assertEqual([1, 2], [key for key in range(1, 6) if key in cache])
+        self.assertEqual(3, cache.evictions)
+
+        pinned.clear()
+        cache.max_size = 1
+        cache.evict()
+        self.assertEqual([2], [key for key in range(1, 6) if key in cache])
+
+    def test_unlimited(self) -> None:
+        cache = LRUCache()
+        for key in range(1000):
+            cache[key] = key
+        self.assertEqual(1000, len(cache))
+        self.assertEqual(0, cache.evictions)
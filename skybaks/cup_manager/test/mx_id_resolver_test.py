@@ -0,0 +1,136 @@
+import asyncio
+import contextlib
+import logging
+import unittest
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest import mock
+
+from ..models import MapMxId, MatchInfo
+from ..mx_id_resolver import MxIdResolver
+from ..results import ResultsCupManager
+from .helpers import bind_database, create_app, create_payload
+
+
+class LocalMxApi:
+    """
+    Stand-in for the api of the mx app, answers map_info from a dict
+    """
+
+    def __init__(self, maps: "dict[str, int]", delay: float = 0) -> None:
+        self.maps = maps
+        self.delay = delay
+        self.requests = []  # type: list[str]
+
+    async def map_info(self, uid: str):
+        self.requests.append(uid)
+        await asyncio.sleep(self.delay)
+        if uid in self.maps:
+            return [(self.maps[uid], uid)]
+        return []
+
+
+class MxIdResolverTest(unittest.TestCase):
+    def setUp(self) -> None:
+        logging.disable(logging.CRITICAL)
+        self.database = contextlib.ExitStack()
+        self.database.enter_context(bind_database())
+
+    def tearDown(self) -> None:
+        self.database.close()
+        logging.disable(logging.NOTSET)
+
+    def test_found_is_cached(self) -> None:
+        api = LocalMxApi({"uid1": 123})
+        resolver = MxIdResolver(lambda: api)
+
+        async def run() -> None:
+            self.assertIsNone(await resolver.get_cached("uid1"))
+            self.assertEqual("123", await resolver.resolve("uid1"))
+            self.assertEqual("123", await resolver.resolve("uid1"))
+            self.assertEqual("123", await resolver.get_cached("uid1"))
+
+        asyncio.run(run())
+        self.assertEqual(["uid1"], api.requests)
+
+    def test_not_found_is_cached(self) -> None:
+        api = LocalMxApi({})
+        resolver = MxIdResolver(lambda: api)
+
+        async def run() -> None:
+            self.assertEqual("", await resolver.resolve("uid1"))
+            self.assertEqual("", await resolver.resolve("uid1"))
+            self.assertEqual("", await resolver.get_cached("uid1"))
+
+        asyncio.run(run())
+        self.assertEqual(["uid1"], api.requests)
+
+    def test_timeout_is_not_cached(self) -> None:
+        api = LocalMxApi({"uid1": 123}, delay=1)
+        resolver = MxIdResolver(lambda: api, timeout=0.01)
+
+        async def run() -> None:
+            self.assertEqual("", await resolver.resolve("uid1"))
+            self.assertIsNone(await resolver.get_cached("uid1"))
+            api.delay = 0
+            self.assertEqual("123", await resolver.resolve("uid1"))
+
+        asyncio.run(run())
+        self.assertEqual(["uid1", "uid1"], api.requests)
+
+    def test_concurrent_lookups_share_request(self) -> None:
+        api = LocalMxApi({"uid1": 123}, delay=0.01)
+        resolver = MxIdResolver(lambda: api)
+
+        async def run() -> "list[str]":
+            return await asyncio.gather(*[resolver.resolve("uid1") for _ in range(5)])
+
+        self.assertEqual(["123"] * 5, asyncio.run(run()))
+        self.assertEqual(["uid1"], api.requests)
+
+    def test_persistent_cache(self) -> None:
+        api = LocalMxApi({"uid1": 123, "uid2": 456})
+        resolver = MxIdResolver(lambda: api)
+
+        MapMxId.insert(
+            map_uid="uid1", mx_id="999", updated_at=datetime(2000, 1, 1)
+        ).execute()
+        # Expired negative entry
+        MapMxId.insert(
+            map_uid="uid2", mx_id="", updated_at=datetime.now() - timedelta(days=2)
+        ).execute()
+
+        async def run() -> None:
+            self.assertEqual("999", await resolver.resolve("uid1"))
+            self.assertEqual("456", await resolver.resolve("uid2"))
+
+        asyncio.run(run())
+        self.assertEqual(["uid2"], api.requests)
+        self.assertEqual(
+            [("uid1", "999"), ("uid2", "456")],
+            [(row.map_uid, row.mx_id) for row in MapMxId.select()],
+        )
+
+    def test_no_api(self) -> None:
+        resolver = MxIdResolver(lambda: None)
+        self.assertEqual("", asyncio.run(resolver.resolve("uid1")))
+
+    def test_match_info_is_not_delayed(self) -> None:
+        app = create_app()
+        api = LocalMxApi({"uid": 123}, delay=0.05)
+        app.instance.apps.apps = {"mx": SimpleNamespace(api=api)}
+        results = ResultsCupManager(app)
+        results.setting_write_behind_interval.get_value = mock.AsyncMock(return_value=0)
+
+        async def run() -> None:
+            with mock.patch.object(results, "_write_player_scores", mock.AsyncMock()):
+                await results._handle_map_update("MapStart")
+                await results._handle_player_score_update(create_payload(10))
+                # MatchInfo was written without waiting for the lookup
+                self.assertEqual([""], [match.mx_id for match in MatchInfo.select()])
+                self.assertTrue(results._mx_id_backfill_tasks)
+                await asyncio.gather(*results._mx_id_backfill_tasks)
+                self.assertEqual(["123"], [match.mx_id for match in MatchInfo.select()])
+
+        asyncio.run(run())
+        self.assertEqual(["uid"], api.requests)
@@ -0,0 +1,62 @@
+import asyncio
+import logging
+import time
+import unittest
+from unittest import mock
+
+from .. import results as results_module
+from ..results import ResultsCupManager
+from ..score_mode import (
+    ScoreLapsDefault,
+    ScoreModeFallback,
+    ScoreRoundsDefault,
+    ScoreTimeAttackDefault,
+)
+from .helpers import create_app, create_database, score_fields
+
+
+class ResultsAggregationBench(unittest.TestCase):
+    def setUp(self) -> None:
+        logging.disable(logging.CRITICAL)
+
+    def tearDown(self) -> None:
+        logging.disable(logging.NOTSET)
+
+    def test_500_maps_200_players(self):
+        with create_database(500, 200) as map_start_times:
+            results = ResultsCupManager(create_app())
+            for sorting_class in [
+                ScoreRoundsDefault,
+                ScoreTimeAttackDefault,
+                ScoreLapsDefault,
+                ScoreModeFallback,
+            ]:
+                results._standings_cache.invalidate()
+                start = time.perf_counter()
+                sql_scores = asyncio.run(
+                    results.get_data_scores(map_start_times, sorting_class())
+                )
+                sql_elapsed = time.perf_counter() - start
+
+                results._standings_cache.invalidate()
+                results._view_cache_scores.clear()
+                results._view_cache_team_scores.clear()
+                with mock.patch.object(
+                    results_module,
+                    "SQL_AGGREGATION_MIN_MATCHES",
+                    len(map_start_times) + 1,
+                ):
+                    start = time.perf_counter()
+                    python_scores = asyncio.run(
+                        results.get_data_scores(map_start_times, sorting_class())
+                    )
+                    python_elapsed = time.perf_counter() - start
+
+                self.assertEqual(score_fields(python_scores), score_fields(sql_scores))
+                print(
+                    f"\n{sorting_class.__name__}: database {sql_elapsed * 1000:.1f} ms, python {python_elapsed * 1000:.1f} ms"
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
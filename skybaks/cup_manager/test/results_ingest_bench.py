@@ -0,0 +1,88 @@
+import asyncio
+import logging
+import time
+import unittest
+from unittest import mock
+
+from ..results import ResultsCupManager
+from .helpers import bind_database, create_app, create_payload
+
+
+class ResultsIngestBench(unittest.TestCase):
+    def setUp(self) -> None:
+        logging.disable(logging.CRITICAL)
+
+    def tearDown(self) -> None:
+        logging.disable(logging.NOTSET)
+
+    def run_callbacks(self, player_count: int) -> "tuple[int, int, float]":
+        results = ResultsCupManager(create_app())
+        results.setting_write_behind_interval.get_value = mock.AsyncMock(return_value=0)
+        with bind_database() as statements:
+
+            async def run() -> "tuple[int, int, float]":
+                await results._handle_map_update("MapStart")
+                # The first callback creates the rows, the second one updates them
+                await results._handle_player_score_update(create_payload(player_count))
+                statements.reset_mock()
+                start = time.perf_counter()
+                await results._handle_player_score_update(
+                    create_payload(player_count, points_offset=10)
+                )
+                elapsed = time.perf_counter() - start
+                return statements.await_count, player_count, elapsed
+
+            return asyncio.run(run())
+
+    def test_round_trips_per_callback(self):
+        round_trips = []
+        for player_count in [10, 50, 150, 300]:
+            count, players, elapsed = self.run_callbacks(player_count)
+            round_trips.append(count)
+            print(
+                f"\n{players:4d} players: {count:3d} statement(s) per callback, {elapsed * 1000:.2f} ms"
+            )
+        # Statement count must not grow with the amount of players
+        self.assertLessEqual(max(round_trips), 3)
+
+    def test_unchanged_callback_skips_writes(self):
+        results = ResultsCupManager(create_app())
+        results.setting_write_behind_interval.get_value = mock.AsyncMock(return_value=0)
+        notify = mock.AsyncMock()
+        with bind_database() as statements:
+
+            async def run() -> None:
+                await results.register_scores_update_notify(notify)
+                await results._handle_map_update("MapStart")
+                payload = create_payload(200)
+                await results._tm_signals_scores(
+                    payload, [], None, False, None, "EndRound"
+                )
+                self.assertEqual(notify.await_count, 1)
+
+                # Identical payload: no statements and no notifications
+                statements.reset_mock()
+                await results._tm_signals_scores(
+                    create_payload(200), [], None, False, None, "EndRound"
+                )
+                self.assertEqual(statements.await_count, 0)
+                self.assertEqual(notify.await_count, 1)
+
+                # One improved player: only that row is written
+                payload = create_payload(200)
+                payload[7]["map_points"] += 5
+                with mock.patch.object(
+                    results, "_write_player_scores", mock.AsyncMock()
+                ) as write_player_scores:
+                    await results._tm_signals_scores(
+                        payload, [], None, False, None, "EndRound"
+                    )
+                    saved_scores = write_player_scores.await_args.args[1]
+                self.assertEqual([s.login for s in saved_scores], ["p007"])
+                self.assertEqual(notify.await_count, 2)
+
+            asyncio.run(run())
+
+
+if __name__ == "__main__":
+    unittest.main()
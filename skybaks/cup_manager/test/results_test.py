@@ -0,0 +1,725 @@
+import asyncio
+import contextlib
+import logging
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from .. import results as results_module
+from ..app_types import TeamPlayerScore
+from ..models import MapMxId, MatchInfo, MatchResult, PlayerScore, TeamScore
+from ..results import ResultsCupManager
+from ..score_mode import (
+    ScoreLapsDefault,
+    ScoreModeFallback,
+    ScoreRoundsDefault,
+    ScoreTimeAttackDefault,
+)
+from ..score_mode.mode_logic import get_sorting_from_mode
+from .helpers import (
+    bind_database,
+    create_app,
+    create_database,
+    create_payload,
+    run_query,
+    score_fields,
+)
+
+
+def count_queries(statements: mock.AsyncMock, model) -> int:
+    return len(
+        [
+            call
+            for call in statements.await_args_list
+            if call.args[0].model_class is model
+        ]
+    )
+
+
+class FakeTransaction:
+    def __init__(self) -> None:
+        self.active = False
+        self.commits = 0
+        self.rollbacks = 0
+
+    def atomic(self) -> "FakeTransaction":
+        return self
+
+    async def __aenter__(self) -> None:
+        self.active = True
+
+    async def __aexit__(self, exc_type, exc, tb) -> bool:
+        self.active = False
+        if exc_type:
+            self.rollbacks += 1
+        else:
+            self.commits += 1
+        return False
+
+
+class ResultsTransactionTest(unittest.TestCase):
+    def setUp(self) -> None:
+        logging.disable(logging.CRITICAL)
+        self.transaction = FakeTransaction()
+        app = create_app()
+        app.instance.db.objects = self.transaction
+        self.results = ResultsCupManager(app)
+        self.results.setting_write_behind_interval.get_value = mock.AsyncMock(
+            return_value=0
+        )
+        self.writes = []  # type: list[tuple[str, bool]]
+        for write_method in [
+            "_write_match_info",
+            "_write_team_scores",
+            "_write_player_scores",
+        ]:
+            setattr(
+                self.results,
+                write_method,
+                mock.AsyncMock(side_effect=self.record_write(write_method)),
+            )
+        self.patch = mock.patch.object(
+            MapMxId, "execute", mock.AsyncMock(return_value=[])
+        )
+        self.patch.start()
+
+    def tearDown(self) -> None:
+        self.patch.stop()
+        logging.disable(logging.NOTSET)
+
+    def record_write(self, write_method: str):
+        async def write(*args) -> None:
+            self.writes.append((write_method, self.transaction.active))
+
+        return write
+
+    def run_callback(self, player_count: int = 10) -> bool:
+        return asyncio.run(
+            self.results._handle_score_update(
+                [{"id": 0, "name": "Blue", "map_points": 1}],
+                create_payload(player_count),
+            )
+        )
+
+    def test_callback_is_one_transaction(self) -> None:
+        asyncio.run(self.results._handle_map_update("MapStart"))
+        self.assertTrue(self.run_callback())
+        self.assertEqual(
+            [
+                ("_write_match_info", True),
+                ("_write_team_scores", True),
+                ("_write_player_scores", True),
+            ],
+            self.writes,
+        )
+        self.assertEqual(1, self.transaction.commits)
+
+        # Later callbacks of the same match do not write MatchInfo again
+        self.writes.clear()
+        self.assertTrue(self.run_callback(11))
+        self.assertEqual(
+            [("_write_player_scores", True)],
+            self.writes,
+        )
+        self.assertEqual(2, self.transaction.commits)
+
+    def test_failed_transaction_is_retried(self) -> None:
+        asyncio.run(self.results._handle_map_update("MapStart"))
+        self.results._write_player_scores.side_effect = RuntimeError("failed")
+        self.assertFalse(self.run_callback())
+        self.assertEqual(1, self.transaction.rollbacks)
+        self.assertFalse(self.results._match_info_created)
+        self.assertEqual([], self.results._last_changed_player_scores)
+
+        # Nothing was marked as written, the same scores are written again
+        self.results._write_player_scores.side_effect = self.record_write(
+            "_write_player_scores"
+        )
+        self.writes.clear()
+        self.assertTrue(self.run_callback())
+        self.assertEqual(
+            [
+                ("_write_match_info", True),
+                ("_write_team_scores", True),
+                ("_write_player_scores", True),
+            ],
+            self.writes,
+        )
+        self.assertFalse(self.run_callback())
+
+    def test_failed_transaction_is_not_notified(self) -> None:
+        notify = mock.AsyncMock()
+
+        async def run() -> None:
+            await self.results.register_scores_update_notify(notify)
+            await self.results._handle_map_update("MapStart")
+            self.results._write_player_scores.side_effect = RuntimeError("failed")
+            await self.results._tm_signals_scores(
+                create_payload(10), [], None, False, None, "EndRound"
+            )
+
+        asyncio.run(run())
+        notify.assert_not_awaited()
+
+    def test_write_behind_skips_empty_transaction(self) -> None:
+        self.results.setting_write_behind_interval.get_value.return_value = 5
+        asyncio.run(self.results._handle_map_update("MapStart"))
+        self.assertTrue(self.run_callback())
+        self.assertEqual([("_write_match_info", True)], self.writes)
+        self.assertEqual(1, self.transaction.commits)
+
+        # MatchInfo exists and the scores are held back, nothing to write
+        self.assertTrue(self.run_callback(11))
+        self.assertEqual(1, self.transaction.commits)
+
+
+class ResultsWriteBehindTest(unittest.TestCase):
+    def test_flush_loop_follows_setting(self) -> None:
+        results = ResultsCupManager(create_app())
+        results.flush_scores = mock.AsyncMock()
+
+        async def run() -> None:
+            await results._setting_write_behind_interval_changed(None, 0)
+            self.assertIsNone(results._pending_flush_task)
+            await results._setting_write_behind_interval_changed(0, 5)
+            flush_task = results._pending_flush_task
+            self.assertIsNotNone(flush_task)
+            await results._setting_write_behind_interval_changed(5, 10)
+            self.assertIs(flush_task, results._pending_flush_task)
+
+            # Scores held back so far are written when write-behind is turned off
+            await results._setting_write_behind_interval_changed(10, 0)
+            self.assertIsNone(results._pending_flush_task)
+            await asyncio.sleep(0)
+            self.assertTrue(flush_task.cancelled())
+            results.flush_scores.assert_awaited_once()
+
+        asyncio.run(run())
+
+
+class ResultsNonLiveTest(unittest.TestCase):
+    def setUp(self) -> None:
+        logging.disable(logging.CRITICAL)
+        self.results = ResultsCupManager(create_app())
+        self.results._handle_score_update = mock.AsyncMock(return_value=True)
+        self.notify = mock.AsyncMock()
+
+    def tearDown(self) -> None:
+        logging.disable(logging.NOTSET)
+
+    async def send_scores(self) -> None:
+        await self.results._tm_signals_scores(
+            create_payload(10), [], None, False, None, "EndRound"
+        )
+
+    def test_warmup_is_skipped(self) -> None:
+        async def run() -> None:
+            await self.results.register_scores_update_notify(self.notify)
+            # No map running yet
+            await self.send_scores()
+            await self.results._handle_map_update("MapStart")
+            await self.results._tm_signals_warmup_start()
+            await self.send_scores()
+            await self.send_scores()
+            self.results._handle_score_update.assert_not_awaited()
+            self.notify.assert_not_awaited()
+
+            await self.results._tm_signals_warmup_end()
+            await self.send_scores()
+            self.results._handle_score_update.assert_awaited_once()
+            self.notify.assert_awaited_once()
+
+            stats = await self.results.get_ingest_stats()
+            self.assertEqual(4, stats.received)
+            self.assertEqual(3, stats.skipped_non_live)
+
+        asyncio.run(run())
+
+    def test_duplicate_payload_is_dropped(self) -> None:
+        async def run() -> None:
+            await self.results._handle_map_update("MapStart")
+            await self.send_scores()
+            await self.send_scores()
+            await self.send_scores()
+            self.results._handle_score_update.assert_awaited_once()
+
+            changed_payload = create_payload(10)
+            changed_payload[3]["map_points"] += 1
+            await self.results._tm_signals_scores(
+                changed_payload, [], None, False, None, "EndRound"
+            )
+            self.assertEqual(2, self.results._handle_score_update.await_count)
+
+            # A new map starts over
+            await self.results._handle_map_update("MapStart")
+            await self.results._tm_signals_scores(
+                changed_payload, [], None, False, None, "EndRound"
+            )
+            self.assertEqual(3, self.results._handle_score_update.await_count)
+
+            stats = await self.results.get_ingest_stats()
+            self.assertEqual(5, stats.received)
+            self.assertEqual(3, stats.processed)
+            self.assertEqual(2, stats.dropped_duplicate)
+
+        asyncio.run(run())
+
+
+class ResultsBulkLoadTest(unittest.TestCase):
+    def test_one_query_per_table(self) -> None:
+        results = ResultsCupManager(create_app())
+        match_start_times = list(range(1000, 1020))
+
+        async def run() -> None:
+            with bind_database() as statements:
+                PlayerScore.insert_many(
+                    [
+                        {
+                            "map_start_time": start_time,
+                            "login": f"p{index}",
+                            "nickname": f"P{index}",
+                            "country": "France",
+                            "score": index + start_time % 3,
+                            "score2": 0,
+                            "team": index % 2,
+                        }
+                        for start_time in match_start_times
+                        for index in range(5)
+                    ]
+                ).execute()
+                TeamScore.insert_many(
+                    [
+                        {
+                            "map_start_time": start_time,
+                            "team_id": 0,
+                            "name": "Blue",
+                            "score": 3,
+                        }
+                        for start_time in match_start_times
+                    ]
+                ).execute()
+                scores = await results.get_data_scores(
+                    list(match_start_times), get_sorting_from_mode("Rounds")
+                )
+                self.assertEqual(1, count_queries(statements, PlayerScore))
+                self.assertEqual(1, count_queries(statements, TeamScore))
+                self.assertEqual(5, len(scores))
+                self.assertEqual(
+                    sum(start_time % 3 for start_time in match_start_times),
+                    [score for score in scores if score.login == "p0"][0].player_score,
+                )
+                self.assertEqual(
+                    "Blue", [s for s in scores if s.login == "p0"][0].team_name
+                )
+
+                # Cached now
+                await results.get_data_scores(
+                    list(match_start_times), get_sorting_from_mode("Rounds")
+                )
+                self.assertEqual(1, count_queries(statements, PlayerScore))
+                self.assertEqual(1, count_queries(statements, TeamScore))
+                self.assertEqual(5, len(await results.get_data_player_scores(1005)))
+
+        asyncio.run(run())
+
+    def test_empty_matches_are_cached(self) -> None:
+        results = ResultsCupManager(create_app())
+
+        async def run() -> None:
+            with bind_database() as statements:
+                for _ in range(2):
+                    self.assertEqual(
+                        ({1000: []}, {1000: []}), await results._load_scores([1000])
+                    )
+                    self.assertEqual([], await results.get_data_player_scores(1000))
+                    self.assertEqual([], await results.get_data_team_scores(1000))
+                self.assertEqual(1, count_queries(statements, PlayerScore))
+                self.assertEqual(1, count_queries(statements, TeamScore))
+
+        asyncio.run(run())
+
+    def test_score_matrix_matches_team_player_scores(self) -> None:
+        results = ResultsCupManager(create_app())
+
+        async def run() -> None:
+            with bind_database():
+                PlayerScore.insert_many(
+                    [
+                        {
+                            "map_start_time": start_time,
+                            "login": f"p{index}",
+                            "nickname": f"P{index}",
+                            "country": "France",
+                            "score": index * start_time,
+                            "score2": index,
+                            "team": index % 2,
+                        }
+                        for start_time in [1000, 1001]
+                        for index in range(4)
+                    ]
+                ).execute()
+                TeamScore.insert(
+                    map_start_time=1001, team_id=1, name="Red", score=2
+                ).execute()
+                matrix = await results.get_data_score_matrix([1000, 1001])
+                self.assertEqual(
+                    await results.get_data_team_player_scores([1000, 1001]),
+                    [matrix.map_scores(map_index) for map_index in range(len(matrix))],
+                )
+
+        asyncio.run(run())
+
+
+class ResultsMatchCacheTest(unittest.TestCase):
+    def insert_match(self, map_start_time: int, mode_script: str) -> None:
+        MatchInfo.insert(
+            map_start_time=map_start_time, map_uid="uid", mode_script=mode_script
+        ).execute()
+
+    def test_incremental_refresh(self) -> None:
+        results = ResultsCupManager(create_app())
+
+        async def run() -> None:
+            with bind_database() as query:
+                for start_time in [300, 100, 200]:
+                    self.insert_match(start_time, "Rounds")
+                matches = await results.get_data_matches()
+                self.assertEqual(
+                    [300, 200, 100], [match.map_start_time for match in matches]
+                )
+                self.assertEqual(
+                    200, (await results.get_data_match(200)).map_start_time
+                )
+                self.assertIsNone(await results.get_data_match(150))
+                self.assertEqual(
+                    [300, 100],
+                    [
+                        match.map_start_time
+                        for match in await results.get_data_specific_matches(
+                            [100, 300, 400]
+                        )
+                    ],
+                )
+                self.assertEqual(1, query.await_count)
+
+                # A new match only reads that match
+                self.insert_match(250, "TimeAttack")
+                self.insert_match(260, "TimeAttack")
+                await results._invalidate_view_cache_matches(250)
+                matches = await results.get_data_matches()
+                self.assertEqual(2, query.await_count)
+                self.assertEqual(
+                    [300, 250, 200, 100], [match.map_start_time for match in matches]
+                )
+
+        asyncio.run(run())
+
+    def test_single_match_does_not_load_cache(self) -> None:
+        results = ResultsCupManager(create_app())
+
+        async def run() -> None:
+            with bind_database() as query:
+                for start_time in [100, 200]:
+                    self.insert_match(start_time, "Rounds")
+                self.assertEqual(
+                    200, (await results.get_data_match(200)).map_start_time
+                )
+                self.assertIsNone(await results.get_data_match(150))
+                self.assertEqual(2, query.await_count)
+                self.assertFalse(results._view_cache_matches_loaded)
+
+        asyncio.run(run())
+
+
+class ResultsScoreCacheTest(unittest.TestCase):
+    def test_eviction_keeps_pinned_matches(self) -> None:
+        app = create_app()
+        app.active.cup_active = True
+        app.active.match_start_times = [1000, 1001]
+        results = ResultsCupManager(app)
+        results._match_start_time = 1005
+
+        async def run() -> None:
+            await results._setting_score_cache_size_changed(None, 30)
+            with bind_database():
+                PlayerScore.insert_many(
+                    [
+                        {
+                            "map_start_time": start_time,
+                            "login": f"p{index}",
+                            "nickname": f"P{index}",
+                            "score": index,
+                            "score2": 0,
+                            "team": -1,
+                        }
+                        for start_time in range(1000, 1010)
+                        for index in range(10)
+                    ]
+                ).execute()
+                _, player_scores = await results._load_scores(list(range(1000, 1010)))
+            # Everything requested is returned even though it did not fit
+            self.assertEqual(10, len(player_scores[1009]))
+            cache = (await results.get_score_cache_stats())["player_scores"]
+            self.assertEqual(
+                [1000, 1001, 1005],
+                [start_time for start_time in range(1000, 1010) if start_time in cache],
+            )
+            self.assertEqual(7, cache.evictions)
+            self.assertEqual(10, cache.misses)
+
+        asyncio.run(run())
+
+
+class ResultsStandingsCacheTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.results = ResultsCupManager(create_app())
+        self.database = contextlib.ExitStack()
+        self.statements = self.database.enter_context(bind_database())
+        PlayerScore.insert_many(
+            [
+                {
+                    "map_start_time": start_time,
+                    "login": f"p{index}",
+                    "nickname": f"P{index}",
+                    "country": "France",
+                    "score": index,
+                    "score2": 0,
+                    "team": -1,
+                }
+                for start_time in range(1000, 1003)
+                for index in range(5)
+            ]
+        ).execute()
+
+    def tearDown(self) -> None:
+        self.database.close()
+
+    async def get_data_scores(self, map_start_times: "list[int]", sorting):
+        return await self.results.get_data_scores(list(map_start_times), sorting)
+
+    def test_standings_are_memoized(self) -> None:
+        async def run() -> None:
+            scores = await self.get_data_scores([1000, 1001], ScoreModeFallback())
+            self.assertEqual(1, count_queries(self.statements, PlayerScore))
+            self.assertEqual(8, scores[0].player_score)
+            with self.assertRaises(AttributeError):
+                scores[0].player_score = 0
+
+            # Flags set while combining are restored for a new mode instance
+            sorting = ScoreModeFallback()
+            self.assertTrue(sorting.use_scoreteam)
+            self.assertIs(scores, await self.get_data_scores([1001, 1000], sorting))
+            self.assertFalse(sorting.use_scoreteam)
+            self.assertEqual(1, count_queries(self.statements, PlayerScore))
+
+        asyncio.run(run())
+
+    def test_invalidation_drops_dependent_standings(self) -> None:
+        async def run() -> None:
+            sorting = ScoreModeFallback()
+            first = await self.get_data_scores([1000, 1001], sorting)
+            second = await self.get_data_scores([1002], sorting)
+            await self.results._invalidate_view_cache_scores(1001)
+            self.assertIs(second, await self.get_data_scores([1002], sorting))
+            self.assertIsNot(first, await self.get_data_scores([1000, 1001], sorting))
+
+        asyncio.run(run())
+
+    def test_stale_standings_are_not_stored(self) -> None:
+        async def invalidating_query(query):
+            if query.model_class is PlayerScore:
+                await self.results._invalidate_view_cache_scores(1000)
+            return await run_query(query)
+
+        self.statements.side_effect = invalidating_query
+
+        async def run() -> None:
+            sorting = ScoreModeFallback()
+            await self.get_data_scores([1000], sorting)
+            self.assertEqual(
+                0, len((await self.results.get_score_cache_stats())["standings"])
+            )
+
+        asyncio.run(run())
+
+
+class ResultsMatchResultTest(unittest.TestCase):
+    def test_backfill_stores_missing_matches(self) -> None:
+        logging.disable(logging.CRITICAL)
+        self.addCleanup(logging.disable, logging.NOTSET)
+        app = create_app()
+        app.instance.db.objects = FakeTransaction()
+        results = ResultsCupManager(app)
+        results.get_data_matches = mock.AsyncMock(
+            return_value=[
+                SimpleNamespace(map_start_time=1001, mode_script="TimeAttack"),
+                SimpleNamespace(map_start_time=1000, mode_script="Rounds"),
+            ]
+        )
+        results.get_data_team_player_scores = mock.AsyncMock(
+            return_value=[
+                [
+                    TeamPlayerScore("p1", "player 1", "", -1, None, 0, 52000, 0),
+                    TeamPlayerScore("p2", "player 2", "", -1, None, 0, 51000, 0),
+                ]
+            ]
+        )
+
+        async def run() -> None:
+            with bind_database() as statements:
+                MatchResult.insert(
+                    map_start_time=1000,
+                    login="p1",
+                    score_mode="rounds_default",
+                    placement=1,
+                    player_count=1,
+                    score=10,
+                    score2=0,
+                    team_score=0,
+                ).execute()
+                self.assertEqual(1, await results.backfill_match_results())
+                results.get_data_team_player_scores.assert_awaited_once_with([1001])
+                # Delete and insert of the backfilled match
+                self.assertEqual(3, statements.await_count)
+
+                match_results = await results.get_data_match_results([1001])
+                self.assertEqual(3, statements.await_count)
+                self.assertEqual(
+                    [(1000, "p1"), (1001, "p1"), (1001, "p2")],
+                    sorted(
+                        (row.map_start_time, row.login) for row in MatchResult.select()
+                    ),
+                )
+            self.assertEqual(
+                {"p1": 2, "p2": 1},
+                {
+                    login: result.placement
+                    for login, result in match_results[1001].items()
+                },
+            )
+            self.assertEqual(
+                {"timeattack_default"},
+                {result.score_mode for result in match_results[1001].values()},
+            )
+            self.assertEqual(
+                {2}, {result.player_count for result in match_results[1001].values()}
+            )
+
+        asyncio.run(run())
+
+
+class ResultsAggregationTest(unittest.TestCase):
+    def setUp(self) -> None:
+        logging.disable(logging.CRITICAL)
+
+    def tearDown(self) -> None:
+        logging.disable(logging.NOTSET)
+
+    def get_scores(self, map_start_times, sorting, min_matches):
+        results = ResultsCupManager(create_app())
+        with mock.patch.object(
+            results_module, "SQL_AGGREGATION_MIN_MATCHES", min_matches
+        ), mock.patch.object(
+            results, "_aggregate_scores", wraps=results._aggregate_scores
+        ) as aggregate_scores:
+            scores = asyncio.run(results.get_data_scores(map_start_times, sorting))
+        return scores, aggregate_scores.await_count
+
+    def assert_aggregation_matches_python(self, map_start_times):
+        for sorting_class in [
+            ScoreRoundsDefault,
+            ScoreTimeAttackDefault,
+            ScoreLapsDefault,
+            ScoreModeFallback,
+        ]:
+            with self.subTest(sorting=sorting_class.__name__):
+                sql_scores, sql_calls = self.get_scores(
+                    map_start_times, sorting_class(), 1
+                )
+                python_scores, python_calls = self.get_scores(
+                    map_start_times, sorting_class(), 100
+                )
+                self.assertEqual(1, sql_calls)
+                self.assertEqual(0, python_calls)
+                # Tied players are in the same order as well
+                self.assertEqual(score_fields(python_scores), score_fields(sql_scores))
+
+    def test_database_aggregation_matches_python(self):
+        with create_database(12, 15, seed=4) as map_start_times:
+            self.assert_aggregation_matches_python(map_start_times)
+
+    def test_tied_players_match_python(self):
+        with create_database(60, 20, seed=6) as map_start_times:
+            PlayerScore.update(score=0, score2=0).execute()
+            TeamScore.update(score=0).execute()
+            self.assert_aggregation_matches_python(map_start_times)
+
+    def test_duplicate_rows_match_python(self):
+        with create_database(12, 15, seed=5, duplicates=20) as map_start_times:
+            self.assertEqual(12 * 15 + 20, len(list(PlayerScore.select().tuples())))
+            self.assert_aggregation_matches_python(map_start_times)
+
+    def test_pending_scores_use_python(self):
+        with create_database(3, 5) as map_start_times:
+            results = ResultsCupManager(create_app())
+            results._pending_player_scores[(map_start_times[0], "p0000")] = None
+            with mock.patch.object(results_module, "SQL_AGGREGATION_MIN_MATCHES", 1):
+                self.assertFalse(
+                    results._can_aggregate_scores(map_start_times, ScoreRoundsDefault())
+                )
+
+
+class ResultsMatchPageTest(unittest.TestCase):
+    def setUp(self) -> None:
+        logging.disable(logging.CRITICAL)
+
+    def tearDown(self) -> None:
+        logging.disable(logging.NOTSET)
+
+    def check_pages(self, results: ResultsCupManager, expected: "list[int]") -> None:
+        async def page_times(*args, **kwargs) -> "list[int]":
+            return [
+                match.map_start_time
+                for match in await results.get_data_match_page(*args, **kwargs)
+            ]
+
+        async def run() -> None:
+            self.assertEqual(expected[:10], await page_times(10))
+            self.assertEqual(expected[10:20], await page_times(10, before=expected[9]))
+            self.assertEqual(expected[:10], await page_times(10, after=expected[10]))
+            self.assertEqual(expected[20:30], await page_times(10, offset=20))
+            self.assertEqual(expected[-5:], await page_times(5, after=0))
+            self.assertEqual([], await page_times(10, before=expected[-1]))
+
+        asyncio.run(run())
+
+    def test_pages_from_database(self):
+        with create_database(35, 1) as map_start_times:
+            results = ResultsCupManager(create_app())
+            self.assertEqual(35, asyncio.run(results.get_data_match_count()))
+            self.check_pages(results, sorted(map_start_times, reverse=True))
+            # Pages never load the whole match history
+            self.assertFalse(results._view_cache_matches_loaded)
+
+    def test_pages_from_match_cache(self):
+        with create_database(35, 1) as map_start_times:
+            results = ResultsCupManager(create_app())
+            asyncio.run(results.get_data_matches())
+            with mock.patch.object(
+                MatchInfo, "execute", mock.AsyncMock(side_effect=AssertionError)
+            ):
+                self.assertEqual(35, asyncio.run(results.get_data_match_count()))
+                self.check_pages(results, sorted(map_start_times, reverse=True))
+
+    def test_count_is_cached(self):
+        with create_database(3, 1):
+            results = ResultsCupManager(create_app())
+            results._match_start_time = 2000
+            results._match_mx_id = "1"
+            self.assertEqual(3, asyncio.run(results.get_data_match_count()))
+            with mock.patch.object(
+                MatchInfo, "execute", mock.AsyncMock(return_value=[])
+            ) as execute:
+                asyncio.run(results._on_match_info_created())
+                self.assertEqual(4, asyncio.run(results.get_data_match_count()))
+                execute.assert_not_awaited()
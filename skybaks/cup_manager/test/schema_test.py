@@ -0,0 +1,99 @@
+import importlib
+import logging
+import unittest
+from unittest import mock
+
+from peewee import SqliteDatabase
+from playhouse.test_utils import test_database
+
+from ..models import CupInfo, CupMatch, MapMxId, MatchResult, PlayerScore, TeamScore
+from ..schema import SCHEMA_INDEXES, ensure_indexes, has_index
+
+
+class SchemaUpgradeTest(unittest.TestCase):
+    def setUp(self) -> None:
+        logging.disable(logging.CRITICAL)
+        self.database = SqliteDatabase(":memory:")
+        self.models = [CupInfo, CupMatch, PlayerScore, TeamScore]
+        self.test_database = test_database(
+            self.database, self.models + [MapMxId, MatchResult], create_tables=False
+        )
+        self.test_database.__enter__()
+        # Tables as they were before the indexes were added
+        for model in self.models:
+            self.database.create_table(model)
+        for login, score in [("p1", 1), ("p1", 2), ("p2", 3)]:
+            PlayerScore.insert(
+                map_start_time=1000,
+                login=login,
+                nickname=login,
+                score=score,
+                score2=0,
+                team=0,
+            ).execute()
+        for score in [1, 2]:
+            TeamScore.insert(
+                map_start_time=1000, team_id=0, name="Blue", score=score
+            ).execute()
+        for map_start_time in [1000, 1000, 1001]:
+            CupMatch.insert(cup_start_time=900, map_start_time=map_start_time).execute()
+        # New tables are created by pyplanet, which then skips all migrations
+        self.database.create_tables([MapMxId, MatchResult])
+
+    def tearDown(self) -> None:
+        self.test_database.__exit__(None, None, None)
+        logging.disable(logging.NOTSET)
+
+    def test_upgrade_from_baseline(self) -> None:
+        for model, columns, unique, _ in SCHEMA_INDEXES:
+            self.assertFalse(has_index(model, columns, unique))
+
+        self.assertEqual(
+            sorted(model._meta.db_table for model in self.models),
+            sorted(ensure_indexes()),
+        )
+
+        for model, columns, unique, _ in SCHEMA_INDEXES:
+            self.assertTrue(has_index(model, columns, unique))
+        # The last score and the first cup match are kept
+        self.assertEqual(
+            [("p1", 2), ("p2", 3)],
+            sorted((score.login, score.score) for score in PlayerScore.select()),
+        )
+        self.assertEqual([2], [score.score for score in TeamScore.select()])
+        self.assertEqual(
+            [(1, 1000), (3, 1001)],
+            sorted((match.id, match.map_start_time) for match in CupMatch.select()),
+        )
+
+    def test_migrations_add_their_indexes(self) -> None:
+        migrations = __name__.rsplit(".", 2)[0] + ".migrations"
+        importlib.import_module(f"{migrations}.004_unique_score_indexes").upgrade(None)
+        self.assertTrue(has_index(PlayerScore, ("map_start_time", "login"), True))
+        self.assertTrue(has_index(TeamScore, ("map_start_time", "team_id"), True))
+        self.assertFalse(has_index(CupInfo, ("cup_key", "cup_start_time"), False))
+        importlib.import_module(f"{migrations}.005_cup_indexes").upgrade(None)
+        self.assertTrue(has_index(CupInfo, ("cup_key", "cup_start_time"), False))
+        self.assertEqual(
+            1, len(list(CupMatch.select().where(CupMatch.map_start_time == 1000)))
+        )
+
+    def test_existing_indexes_are_kept(self) -> None:
+        ensure_indexes([PlayerScore, TeamScore])
+        self.assertFalse(
+            has_index(CupMatch, ("cup_start_time", "map_start_time"), True)
+        )
+        with mock.patch.object(
+            self.database, "create_index", wraps=self.database.create_index
+        ) as create_index:
+            self.assertEqual(
+                sorted([CupInfo._meta.db_table, CupMatch._meta.db_table]),
+                sorted(ensure_indexes()),
+            )
+            self.assertEqual(2, create_index.call_count)
+            self.assertEqual([], ensure_indexes())
+            self.assertEqual(2, create_index.call_count)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import logging
+import time
+import unittest
+from types import SimpleNamespace
+
+from ..score_extractor import get_score_extractor
+
+
+def create_payload(player_count: int) -> "list[dict]":
+    return [
+        {
+            "player": SimpleNamespace(
+                login=f"p{index:03d}",
+                nickname=f"player {index:03d}",
+                flow=SimpleNamespace(
+                    zone=SimpleNamespace(country="France"), team_id=-1
+                ),
+            ),
+            "best_race_time": 30000 + index,
+            "best_race_checkpoints": [1000, 2000, 30000 + index],
+            "map_points": index,
+        }
+        for index in range(player_count)
+    ]
+
+
+class ScoreExtractorBench(unittest.TestCase):
+    def setUp(self) -> None:
+        logging.disable(logging.CRITICAL)
+
+    def tearDown(self) -> None:
+        logging.disable(logging.NOTSET)
+
+    def test_extract_200_players(self):
+        payload = create_payload(200)
+        iterations = 500
+        for mode_script in [
+            "Trackmania/TM_TimeAttack_Online.Script.txt",
+            "Trackmania/TM_Laps_Online.Script.txt",
+            "Trackmania/TM_Rounds_Online.Script.txt",
+        ]:
+            extractor = get_score_extractor(mode_script)
+            start = time.perf_counter()
+            for _ in range(iterations):
+                scores = extractor.extract_scores(payload)
+            elapsed = time.perf_counter() - start
+            self.assertEqual(len(scores), 200)
+            print(
+                f"\n{mode_script}: {elapsed / iterations * 1000000:.1f} us per 200 player payload"
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
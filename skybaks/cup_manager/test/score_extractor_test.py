@@ -0,0 +1,134 @@
+import logging
+import unittest
+from types import SimpleNamespace
+
+from .. import score_extractor
+from ..app_types import GenericPlayerScore
+from ..score_extractor import (
+    get_score_extractor,
+    ScoreExtractorLaps,
+    ScoreExtractorPoints,
+    ScoreExtractorTimeAttack,
+)
+
+
+def create_player(login: str, country: str = "France", team_id: int = 0):
+    return SimpleNamespace(
+        login=login,
+        nickname=login.upper(),
+        flow=SimpleNamespace(zone=SimpleNamespace(country=country), team_id=team_id),
+    )
+
+
+class ScoreExtractorTest(unittest.TestCase):
+    def setUp(self) -> None:
+        logging.disable(logging.CRITICAL)
+
+    def tearDown(self) -> None:
+        logging.disable(logging.NOTSET)
+
+    def test_get_score_extractor(self) -> None:
+        self.assertIsInstance(
+            get_score_extractor("Trackmania/TM_TimeAttack_Online.Script.txt"),
+            ScoreExtractorTimeAttack,
+        )
+        self.assertIsInstance(
+            get_score_extractor("Trackmania/TM_Laps_Online.Script.txt"),
+            ScoreExtractorLaps,
+        )
+        self.assertIsInstance(
+            get_score_extractor("Trackmania/TM_Rounds_Online.Script.txt"),
+            ScoreExtractorPoints,
+        )
+        self.assertIsInstance(
+            get_score_extractor("Cup.Script.txt"), ScoreExtractorPoints
+        )
+
+    def test_signal_payload(self) -> None:
+        scores = ScoreExtractorTimeAttack().extract_scores(
+            [
+                {"player": create_player("a"), "best_race_time": 12345},
+                {"player": create_player("b", None, None), "best_race_time": 23456},
+                {"player": create_player("c"), "best_race_time": -1},
+            ]
+        )
+        self.assertEqual(
+            [
+                GenericPlayerScore("a", "A", "France", 12345, 0, 0),
+                GenericPlayerScore("b", "B", "World", 23456, 0, -1),
+            ],
+            scores,
+        )
+
+    def test_raw_payload(self) -> None:
+        scores = ScoreExtractorLaps().extract_scores(
+            [
+                {
+                    "login": "a",
+                    "name": "A",
+                    "bestracetime": 54321,
+                    "bestracecheckpoints": [1, 2, 3],
+                },
+                {
+                    "login": "b",
+                    "name": "B",
+                    "bestracetime": -1,
+                    "bestracecheckpoints": [],
+                },
+            ]
+        )
+        self.assertEqual([GenericPlayerScore("a", "A", "World", 54321, 3, -1)], scores)
+
+    def test_invalid_entry(self) -> None:
+        scores = ScoreExtractorPoints().extract_scores(
+            [
+                {"player": create_player("a"), "map_points": 10},
+                {"player": create_player("b")},
+                {"player": create_player("c"), "map_points": 5},
+            ]
+        )
+        self.assertEqual(["a", "c"], [score.login for score in scores])
+        self.assertEqual([], ScoreExtractorPoints().extract_scores([]))
+
+    def test_fingerprint(self) -> None:
+        extractor = ScoreExtractorLaps()
+        payload = [
+            {
+                "player": create_player("a"),
+                "best_race_time": 100,
+                "best_race_checkpoints": [50, 100],
+            },
+            {
+                "player": create_player("b"),
+                "best_race_time": -1,
+                "best_race_checkpoints": [],
+            },
+        ]
+        fingerprint = extractor.fingerprint(payload)
+        self.assertIsNotNone(fingerprint)
+        self.assertEqual(fingerprint, extractor.fingerprint([dict(e) for e in payload]))
+        payload[1]["best_race_time"] = 200
+        payload[1]["best_race_checkpoints"] = [100, 200]
+        self.assertNotEqual(fingerprint, extractor.fingerprint(payload))
+        self.assertIsNone(extractor.fingerprint([{"player": create_player("a")}]))
+
+    def test_identity_cache(self) -> None:
+        extractor = ScoreExtractorPoints()
+        player = create_player("a", None, 1)
+        payload = [{"player": player, "map_points": 1}]
+        logging.disable(logging.NOTSET)
+        with self.assertLogs(score_extractor.logger, "WARNING") as logs:
+            for _ in range(5):
+                scores = extractor.extract_scores(payload)
+        # Only the missing zone is reported, and only once
+        self.assertEqual(1, len(logs.output))
+        self.assertEqual(("World", 1), (scores[0].country, scores[0].team))
+
+        # Cached until the player is refreshed
+        player.flow.zone.country = "France"
+        player.flow.team_id = 0
+        scores = extractor.extract_scores(payload)
+        self.assertEqual(("World", 1), (scores[0].country, scores[0].team))
+        extractor.forget_player("a")
+        scores = extractor.extract_scores(payload)
+        self.assertEqual(("France", 0), (scores[0].country, scores[0].team))
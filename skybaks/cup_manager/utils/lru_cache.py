@@ -0,0 +1,79 @@
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    Dict-like cache which evicts the least recently used entries once the total
+    size of its values goes over max_size. The size of a value is given by
+    size_of, by default every entry counts as 1. Keys returned by get_pinned
+    are never evicted. A max_size of 0 disables eviction.
+    """
+
+    def __init__(self, max_size: int = 0, size_of=None, get_pinned=None) -> None:
+        self.max_size = max_size
+        self._size_of = size_of if size_of else (lambda value: 1)
+        self._get_pinned = get_pinned
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __repr__(self) -> str:
+        return f"<LRUCache entries:{len(self._entries)} size:{self.size} max_size:{self.max_size} hits:{self.hits} misses:{self.misses} evictions:{self.evictions}>"
+
+    def __contains__(self, key) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        """
+        Returns the value of key and marks it as recently used
+        """
+        if key in self._entries:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+        self.misses += 1
+        return default
+
+    def __getitem__(self, key):
+        value = self._entries[key]
+        self._entries.move_to_end(key)
+        return value
+
+    def __setitem__(self, key, value) -> None:
+        if key in self._entries:
+            self.size -= self._sizes[key]
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        self._sizes[key] = self._size_of(value)
+        self.size += self._sizes[key]
+        self.evict()
+
+    def __delitem__(self, key) -> None:
+        del self._entries[key]
+        self.size -= self._sizes.pop(key)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._sizes.clear()
+        self.size = 0
+
+    def evict(self) -> None:
+        """
+        Remove least recently used entries until the cache fits in max_size
+        """
+        if self.max_size <= 0 or self.size <= self.max_size:
+            return
+        pinned = set(self._get_pinned()) if self._get_pinned else set()
+        for key in list(self._entries.keys()):
+            if self.size <= self.max_size:
+                break
+            if key in pinned:
+                continue
+            del self[key]
+            self.evictions += 1
@@ -3,6 +3,7 @@ from datetime import datetime
 
 from pyplanet.views.generics.list import ManualListView
 
+from ..app_types import CupSummary
 from ..models import CupInfo, MatchInfo
 
 logger = logging.getLogger(__name__)
@@ -67,11 +68,11 @@ class CupView(ManualListView):
 
     async def get_data(self) -> "list[dict[str, any]]":
         items = []
-        cups_data = await self.app.active.get_data_cup_info()  # type: list[CupInfo]
-        for cup_data in cups_data:
-            map_start_times = await self.app.active.get_data_cup_match_times(
-                cup_data.cup_start_time
-            )  # type: list[int]
+        cup_summaries = (
+            await self.app.active.get_data_cup_summaries()
+        )  # type: list[CupSummary]
+        for cup_summary in cup_summaries:
+            cup_data = cup_summary.info
             items.append(
                 {
                     # For display
@@ -80,7 +81,7 @@ class CupView(ManualListView):
                     "cup_start_time_str": datetime.fromtimestamp(
                         cup_data.cup_start_time
                     ).strftime("%c"),
-                    "maps_str": str(len(map_start_times)),
+                    "maps_str": str(cup_summary.map_count),
                     "host_str": str(
                         cup_data.cup_host_nickname if cup_data.cup_host_nickname else ""
                     ),
@@ -3,6 +3,7 @@ import logging
 
 from pyplanet.views.generics.list import ManualListView
 
+from ..models import MatchInfo
 from ..score_mode.mode_logic import get_sorting_from_mode
 
 logger = logging.getLogger(__name__)
@@ -24,6 +25,10 @@ class MatchHistoryView(ManualListView):
         self.provide_search = False
         if player.login not in self.selected_map_times:
             self.selected_map_times[player.login] = []
+        # Page number and (newest, oldest) map_start_time of the displayed page
+        self._page_number = 0
+        self._page_keys = None  # type: tuple[int, int] | None
+        self._keep_page = False
 
     async def get_fields(self) -> "list[dict[str, str | bool | int]]":
         fields = [
@@ -79,16 +84,27 @@ class MatchHistoryView(ManualListView):
         ]
         return buttons
 
-    async def get_data(self) -> "list[dict[str, str | bool | int]]":
-        items = []
-        maps = await self.app.results.get_data_matches()
-        for map_data in maps:
-            items.append(
+    async def get_object_data(
+        self,
+    ) -> "dict[str, list[dict[str, str | bool | int]] | int]":
+        """
+        Only the matches of the visible page are read and formatted. A page
+        next to the displayed one is found from its map_start_time instead of
+        an offset, and selecting a match reuses the displayed page.
+        """
+        self.count = await self.app.results.get_data_match_count()
+        self.page = max(1, min(self.page, self.num_pages))
+        if not self._keep_page or self._page_number != self.page:
+            matches = await self._get_page_matches()
+            self._page_number = self.page
+            self._page_keys = (
+                (matches[0].map_start_time, matches[-1].map_start_time)
+                if matches
+                else None
+            )
+            self.objects = [
                 {
-                    "selected": ""
-                    if map_data.map_start_time
-                    in self.selected_map_times[self.player.login]
-                    else "",
+                    "selected": "",
                     "map_start_time_str": datetime.fromtimestamp(
                         map_data.map_start_time
                     ).strftime("%c"),
@@ -98,8 +114,39 @@ class MatchHistoryView(ManualListView):
                     "map_uid": map_data.map_uid,
                     "mx_id": map_data.mx_id,
                 }
+                for map_data in matches
+            ]
+        self._keep_page = False
+        selected_map_times = self.selected_map_times[self.player.login]
+        for item in self.objects:
+            item["selected"] = (
+                "" if item["map_start_time"] in selected_map_times else ""
+            )
+        return {
+            "objects": self.objects,
+            "search": self.search_text,
+            "order": self.order,
+            "count": self.count,
+        }
+
+    async def _get_page_matches(self) -> "list[MatchInfo]":
+        results = self.app.results
+        limit = self.num_per_page
+        if self.page == 1:
+            return await results.get_data_match_page(limit)
+        if self.page == self.num_pages:
+            return await results.get_data_match_page(
+                self.count - (self.page - 1) * limit, after=0
             )
-        return items
+        if self._page_keys:
+            newest, oldest = self._page_keys
+            if self.page == self._page_number:
+                return await results.get_data_match_page(limit, before=newest + 1)
+            elif self.page == self._page_number + 1:
+                return await results.get_data_match_page(limit, before=oldest)
+            elif self.page == self._page_number - 1:
+                return await results.get_data_match_page(limit, after=newest)
+        return await results.get_data_match_page(limit, offset=(self.page - 1) * limit)
 
     async def _action_view_match(self, player, values, instance, **kwargs) -> None:
         scores_query = [instance["map_start_time"]]
@@ -114,6 +161,7 @@ class MatchHistoryView(ManualListView):
             self.selected_map_times[player.login].remove(instance["map_start_time"])
         else:
             self.selected_map_times[player.login].append(instance["map_start_time"])
+        self._keep_page = True
         await self.refresh(player=player)
 
     async def _button_calculate_results(self, player, values, **kwargs) -> None:
@@ -191,6 +191,8 @@ class PayoutsView(OptionsView):
         super().__init__(app, "cup_manager.views.payouts_view_displayed")
         self.score_data = score_data
         self.score_sorting = score_sorting
+        # Shared by every payout computed for these scores
+        self.tie_groups = score_sorting.get_tie_groups(score_data)
         self.apply_option_button_name = "Pay"
 
     async def get_option_fields(self) -> "list[dict]":
@@ -263,7 +265,10 @@ class PayoutsView(OptionsView):
         info_data = []
         if self.selected_option and "name" in self.selected_option:
             payout_score = await self.app.get_data_payout_score(
-                self.selected_option["name"], self.score_data, self.score_sorting
+                self.selected_option["name"],
+                self.score_data,
+                self.score_sorting,
+                self.tie_groups,
             )  # type: list[PaymentScore]
             for payout_item in payout_score:
                 info_data.append(
@@ -284,7 +289,10 @@ class PayoutsView(OptionsView):
     async def button_pressed(self, player, *args, **kwargs):
         if self.selected_option and "name" in self.selected_option:
             payout_score = await self.app.get_data_payout_score(
-                self.selected_option["name"], self.score_data, self.score_sorting
+                self.selected_option["name"],
+                self.score_data,
+                self.score_sorting,
+                self.tie_groups,
             )  # type: list[PaymentScore]
             total_planets = sum([x.payment for x in payout_score])
         cancel = bool(